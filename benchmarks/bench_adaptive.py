@@ -0,0 +1,119 @@
+# ytdowloader\benchmarks\bench_adaptive.py
+#
+# Modo adaptativo contra um servidor HLS local com banda limitada por conexão
+# (throttling de CDN) e no total (enlace do usuário): sondagem da concorrência
+# antes do job, convergência do FragmentTuner ao longo de vários jobs, escolha
+# de qualidade por prazo/tamanho e, com o yt-dlp instalado, o download HLS
+# com 1 fragmento por vez x a concorrência encontrada.
+#
+#   python benchmarks/bench_adaptive.py [--connection-mb 0.5] [--link-mb 2] [--jobs 6]
+
+import argparse
+import json
+import os
+import sys
+import tempfile
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from urllib.request import urlopen
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from benchmarks.fixtures import MediaServer, make_info
+from src.adaptive import FragmentTuner, pick_format, probe_concurrency, probe_targets
+
+VARIANTS = ((800_000, 360), (2_500_000, 720), (5_000_000, 1080))
+
+
+def fetch_segments(urls, concurrency: int) -> float:
+    """Baixa os segmentos com `concurrency` conexões; retorna bytes/s"""
+    lock = threading.Lock()
+    total = [0]
+
+    def fetch(url):
+        with urlopen(url, timeout=30) as response:
+            nbytes = len(response.read())
+        with lock:
+            total[0] += nbytes
+
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        list(pool.map(fetch, urls))
+    return total[0] / (time.perf_counter() - started)
+
+
+def tuner_convergence(urls, jobs: int, segments_per_job: int) -> list:
+    """Jobs consecutivos no mesmo host, cada um com a concorrência sugerida pelo tuner"""
+    tuner = FragmentTuner()
+    history = []
+    for n in range(jobs):
+        concurrency = tuner.concurrency('bench')
+        batch = [urls[(n * segments_per_job + i) % len(urls)] for i in range(segments_per_job)]
+        rate = fetch_segments(batch, concurrency)
+        tuner.report('bench', concurrency, rate)
+        history.append({'job': n + 1, 'concurrency': concurrency, 'mb_per_s': round(rate / 1e6, 2)})
+    return history
+
+
+def ytdlp_hls(url: str, directory: str, fragments: int) -> dict:
+    try:
+        import yt_dlp
+    except ImportError:
+        return {'skipped': 'yt_dlp não instalado'}
+    opts = {'outtmpl': os.path.join(directory, f"%(id)s.{fragments}.%(ext)s"), 'quiet': True,
+            'no_warnings': True, 'noprogress': True, 'format': 'best',
+            'concurrent_fragment_downloads': fragments, 'fixup': 'never'}
+    started = time.perf_counter()
+    with yt_dlp.YoutubeDL(opts) as ydl:
+        ydl.extract_info(url, download=True)
+    return {'concurrent_fragments': fragments, 'seconds': round(time.perf_counter() - started, 3)}
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--connection-mb', type=float, default=0.5, help='limite por conexão (MB/s)')
+    parser.add_argument('--link-mb', type=float, default=2.0, help='limite total do servidor (MB/s)')
+    parser.add_argument('--latency', type=float, default=0.02, help='atraso por requisição (s)')
+    parser.add_argument('--segments', type=int, default=24)
+    parser.add_argument('--segment-seconds', type=float, default=1.0)
+    parser.add_argument('--jobs', type=int, default=6)
+    parser.add_argument('--deadline', type=float, default=60.0, help='prazo (s) para a escolha de qualidade')
+    args = parser.parse_args()
+
+    with MediaServer(latency=args.latency, per_connection_rate=args.connection_mb * 1e6,
+                     total_rate=args.link_mb * 1e6) as server, tempfile.TemporaryDirectory() as directory:
+        master = server.add_hls(variants=VARIANTS, segments=args.segments, segment_duration=args.segment_seconds)
+        media = {'protocol': 'm3u8_native', 'url': server.url('hls/1080p.m3u8')}
+        urls = [url for url, _ in probe_targets(media, args.segments)]
+
+        started = time.perf_counter()
+        probe = probe_concurrency(probe_targets(media, 32))
+        probe_seconds = time.perf_counter() - started
+
+        convergence = tuner_convergence(urls, args.jobs, segments_per_job=8)
+
+        info = make_info(60)
+        quality = {
+            'deadline': args.deadline,
+            'throughput_mb_per_s': round(probe['rate'] / 1e6, 2),
+            'choice': pick_format(info, probe['rate'], deadline=args.deadline),
+            'choice_500mb': pick_format(info, probe['rate'], size_budget=500e6),
+        }
+
+        results = {
+            'probe': {'concurrency': probe['concurrency'], 'seconds': round(probe_seconds, 3),
+                      'mb_per_s': {level: round(rate / 1e6, 2) for level, rate in probe['rates'].items()}},
+            'tuner': convergence,
+            'quality': quality,
+            'ytdlp_sequential': ytdlp_hls(master, directory, 1),
+            'ytdlp_tuned': ytdlp_hls(master, directory, probe['concurrency']),
+        }
+
+    print(json.dumps({'benchmark': 'adaptive', 'connection_mb': args.connection_mb, 'link_mb': args.link_mb,
+                      'expected_concurrency': round(args.link_mb / args.connection_mb), 'results': results}))
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,92 @@
+# ytdowloader\benchmarks\bench_bandwidth.py
+#
+# Verifica se o limite de banda global se mantém com vários downloads
+# simultâneos de prioridades diferentes, inclusive quando o limite muda no
+# meio da transferência. Falha (código de saída 1) se a taxa medida passar do
+# limite configurado além da tolerância ou se um job de prioridade alta
+# terminar depois de um de prioridade baixa.
+#
+#   python benchmarks/bench_bandwidth.py [--rate-mb 4] [--jobs 4] [--tolerance 0.15]
+
+import argparse
+import json
+import os
+import sys
+import tempfile
+import threading
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from benchmarks.fixtures import MediaServer, make_payload
+from src.bandwidth import BandwidthManager
+from src.segmented import SegmentedDownloader
+
+PRIORITIES = ['high', 'normal', 'low']
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--rate-mb', type=float, default=4, help='limite inicial (MB/s)')
+    parser.add_argument('--new-rate-mb', type=float, default=2, help='limite após --switch-after')
+    parser.add_argument('--switch-after', type=float, default=2.0)
+    parser.add_argument('--jobs', type=int, default=4)
+    parser.add_argument('--size-mb', type=float, default=8)
+    parser.add_argument('--tolerance', type=float, default=0.15,
+                        help='folga sobre o limite (rajada inicial dos buckets)')
+    args = parser.parse_args()
+
+    manager = BandwidthManager(rate=args.rate_mb * 1e6)
+    payload = make_payload(int(args.size_mb * 1e6))
+    samples = []
+    per_job = {}
+
+    def job(index, server, directory):
+        priority = PRIORITIES[index % len(PRIORITIES)]
+        with manager.register(f'job{index}', priority) as stream:
+            downloader = SegmentedDownloader(connections=2, segment_size=1_000_000,
+                                             progress_hooks=[stream.progress_hook()])
+            started = time.monotonic()
+            downloader.download(server.url('media.bin'), os.path.join(directory, f'{index}.bin'))
+            per_job[f'job{index}'] = {'priority': priority, 'seconds': round(time.monotonic() - started, 2)}
+
+    with MediaServer({'media.bin': payload}) as server, tempfile.TemporaryDirectory() as directory:
+        threads = [threading.Thread(target=job, args=(i, server, directory)) for i in range(args.jobs)]
+        started = time.monotonic()
+        for thread in threads:
+            thread.start()
+        switched = False
+        while any(t.is_alive() for t in threads):
+            time.sleep(0.5)
+            if not switched and time.monotonic() - started >= args.switch_after:
+                manager.set_rate(args.new_rate_mb * 1e6)
+                switched = True
+            stats = manager.stats()
+            samples.append({'t': round(time.monotonic() - started, 1),
+                            'configured_mb': (stats['configured'] or 0) / 1e6,
+                            'achieved_mb': round(stats['achieved'] / 1e6, 2)})
+        for thread in threads:
+            thread.join()
+        total_seconds = time.monotonic() - started
+
+    failures = [f"{s['achieved_mb']} MB/s em t={s['t']}s (limite {s['configured_mb']} MB/s)" for s in samples
+                if s['configured_mb'] and s['achieved_mb'] > s['configured_mb'] * (1 + args.tolerance)]
+    high = [j['seconds'] for j in per_job.values() if j['priority'] == 'high']
+    low = [j['seconds'] for j in per_job.values() if j['priority'] == 'low']
+    if high and low and max(high) >= min(low):
+        failures.append(f"prioridade alta terminou em {max(high)}s, depois da baixa ({min(low)}s)")
+
+    print(json.dumps({
+        'benchmark': 'bandwidth',
+        'total_mb': args.jobs * args.size_mb,
+        'seconds': round(total_seconds, 2),
+        'average_mb_per_s': round(args.jobs * args.size_mb / total_seconds, 2),
+        'samples': samples,
+        'jobs': per_job,
+        'failures': failures,
+    }))
+    return 1 if failures else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,88 @@
+# ytdowloader\benchmarks\bench_batch.py
+#
+# Extração em lote contra um servidor local que serve info dicts JSON com
+# latência (o "round trip" de uma extração), com falhas injetadas: 429 e 503
+# passageiros (devem ser tentados de novo e dar certo) e URLs inexistentes
+# (404, falha definitiva). Compara URLs/s com 1 extração por vez (como
+# chamar get_video_info em sequência) e com o BatchExtractor em paralelo.
+#
+#   python benchmarks/bench_batch.py [--urls 200] [--latency 0.1] [--workers 1 4 8 16]
+
+import argparse
+import json
+import os
+import sys
+import time
+from urllib.request import urlopen
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from benchmarks.fixtures import MediaServer, make_info
+from src.batch import BatchExtractor, summarize
+from src.records import VideoRecord
+
+
+class JsonInfoDownloader:
+    """get_video_info que busca o info dict no servidor local (no lugar do yt-dlp)"""
+
+    def get_video_info(self, url: str, fresh: bool = False) -> VideoRecord:
+        try:
+            with urlopen(url, timeout=10) as response:
+                info = json.loads(response.read())
+        except Exception as e:
+            raise Exception(f"Erro ao obter informações: {str(e)}") from e
+        return VideoRecord.from_info(info, url)
+
+
+def publish(server: MediaServer, args) -> list:
+    """Publica os info dicts (1 em `missing_every` fica de fora); retorna os nomes das páginas"""
+    names = [f"info/{n:06d}.json" for n in range(args.urls)]
+    for n, name in enumerate(names):
+        if n % args.missing_every:
+            server.files[name] = json.dumps(make_info(args.formats, video_id=f"batch{n:06d}", seed=n)).encode()
+    return names
+
+
+def run(server: MediaServer, names: list, workers: int, args) -> dict:
+    for n in range(0, len(names), args.flaky_every):
+        server.fail(names[n], 429 if n % 2 else 503, times=1)
+    urls = [server.url(name) for name in names]
+    extractor = BatchExtractor(JsonInfoDownloader(), max_workers=workers, timeout=args.timeout,
+                               retries=2, backoff=args.backoff, max_backoff=args.backoff * 4)
+    started = time.perf_counter()
+    first = None
+    results = []
+    for result in extractor.extract(urls):
+        if first is None:
+            first = time.perf_counter() - started
+        results.append(result)
+    seconds = time.perf_counter() - started
+    return {'workers': workers, 'seconds': round(seconds, 3), 'urls_per_s': round(len(urls) / seconds, 1),
+            'first_result_s': round(first or 0, 3), **summarize(results)}
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--urls', type=int, default=200)
+    parser.add_argument('--latency', type=float, default=0.1, help='atraso por requisição (s)')
+    parser.add_argument('--formats', type=int, default=60, help='formatos por info dict (custo do parse)')
+    parser.add_argument('--workers', type=int, nargs='+', default=[1, 4, 8, 16])
+    parser.add_argument('--flaky-every', type=int, default=10, help='1 em N URLs falha uma vez (429/503)')
+    parser.add_argument('--missing-every', type=int, default=25, help='1 em N URLs não existe (404)')
+    parser.add_argument('--timeout', type=float, default=10.0)
+    parser.add_argument('--backoff', type=float, default=0.05)
+    args = parser.parse_args()
+
+    with MediaServer(latency=args.latency) as server:
+        names = publish(server, args)
+        results = [run(server, names, workers, args) for workers in args.workers]
+
+    baseline = results[0]['seconds']
+    for result in results:
+        result['speedup'] = round(baseline / result['seconds'], 2)
+    print(json.dumps({'benchmark': 'batch', 'urls': args.urls, 'latency': args.latency, 'results': results}))
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,108 @@
+# ytdowloader\benchmarks\bench_download.py
+#
+# Throughput de download contra o servidor local: um arquivo por uma
+# conexão, vários arquivos simultâneos e, com o yt-dlp instalado, os
+# manifestos HLS/DASH falsos (fragmentos baixados pelo próprio yt-dlp).
+#
+#   python benchmarks/bench_download.py [--size-mb 16] [--concurrent 4] [--rate-mb 0]
+
+import argparse
+import json
+import os
+import sys
+import tempfile
+import threading
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from benchmarks.fixtures import MediaServer, make_payload
+from src.segmented import SegmentedDownloader
+
+
+def fetch(server: MediaServer, name: str, directory: str) -> int:
+    filename = os.path.join(directory, name)
+    stats = SegmentedDownloader(connections=1).download(server.url(name), filename)
+    with open(filename, 'rb') as f:
+        if f.read() != server.files[name]:
+            raise Exception(f"Conteúdo divergente em {name}")
+    os.remove(filename)
+    return stats['total_bytes']
+
+
+def single(server: MediaServer, directory: str) -> dict:
+    started = time.perf_counter()
+    nbytes = fetch(server, 'file0.bin', directory)
+    elapsed = time.perf_counter() - started
+    return {'files': 1, 'seconds': round(elapsed, 3), 'mb_per_s': round(nbytes / elapsed / 1e6, 2)}
+
+
+def concurrent(server: MediaServer, directory: str, files: int) -> dict:
+    totals = [0] * files
+    errors = []
+
+    def worker(n):
+        try:
+            totals[n] = fetch(server, f"file{n}.bin", directory)
+        except Exception as e:
+            errors.append(str(e))
+
+    started = time.perf_counter()
+    threads = [threading.Thread(target=worker, args=(n,)) for n in range(files)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    elapsed = time.perf_counter() - started
+    return {'files': files, 'seconds': round(elapsed, 3),
+            'mb_per_s': round(sum(totals) / elapsed / 1e6, 2), 'errors': errors}
+
+
+def manifest(server: MediaServer, url: str, directory: str, fragments: int) -> dict:
+    """Baixa um manifesto HLS/DASH com o yt-dlp (pulado se ele não estiver instalado)"""
+    try:
+        import yt_dlp
+    except ImportError:
+        return {'skipped': 'yt_dlp não instalado'}
+    requests_before = server.requests
+    opts = {'outtmpl': os.path.join(directory, '%(id)s.%(format_id)s.%(ext)s'), 'quiet': True,
+            'no_warnings': True, 'noprogress': True, 'format': 'best', 'concurrent_fragment_downloads': fragments,
+            'fixup': 'never'}
+    started = time.perf_counter()
+    with yt_dlp.YoutubeDL(opts) as ydl:
+        info = ydl.extract_info(url, download=True)
+    elapsed = time.perf_counter() - started
+    path = info.get('requested_downloads', [{}])[0].get('filepath')
+    nbytes = os.path.getsize(path) if path and os.path.exists(path) else 0
+    return {'concurrent_fragments': fragments, 'seconds': round(elapsed, 3),
+            'mb_per_s': round(nbytes / elapsed / 1e6, 2), 'requests': server.requests - requests_before}
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--size-mb', type=float, default=16)
+    parser.add_argument('--concurrent', type=int, default=4)
+    parser.add_argument('--rate-mb', type=float, default=0, help='limite por conexão (MB/s; 0 = sem limite)')
+    parser.add_argument('--latency', type=float, default=0.0, help='atraso por requisição (s)')
+    parser.add_argument('--fragments', type=int, default=4, help='fragmentos simultâneos no HLS/DASH')
+    args = parser.parse_args()
+
+    files = {f"file{n}.bin": make_payload(int(args.size_mb * 1e6), seed=n) for n in range(args.concurrent)}
+    with MediaServer(files, latency=args.latency, per_connection_rate=args.rate_mb * 1e6 or None) as server, \
+            tempfile.TemporaryDirectory() as directory:
+        hls_url = server.add_hls(segments=20)
+        dash_url = server.add_dash(segments=20)
+        results = {
+            'single': single(server, directory),
+            'concurrent': concurrent(server, directory, args.concurrent),
+            'hls': manifest(server, hls_url, directory, args.fragments),
+            'dash': manifest(server, dash_url, directory, args.fragments),
+        }
+
+    print(json.dumps({'benchmark': 'download', 'size_mb': args.size_mb, 'rate_mb_per_connection': args.rate_mb,
+                      'latency': args.latency, 'results': results}))
+    return 1 if results['concurrent']['errors'] else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,62 @@
+# ytdowloader\benchmarks\bench_formats.py
+#
+# Mede o processamento de formatos sobre info dicts sintéticos com centenas
+# de formatos: construção da FormatTable, get_available_formats (listas da
+# GUI), consultas de seleção e verificação de expiração das URLs.
+#
+#   python benchmarks/bench_formats.py [--formats 50 300 1000] [--repeat 200]
+
+import argparse
+import json
+import os
+import statistics
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from benchmarks.fixtures import make_info
+from src.downloader import YouTubeDownloader
+from src.formats import FormatTable
+
+
+def timed(function, repeat: int) -> dict:
+    """Tempo por chamada (µs) em `repeat` execuções"""
+    samples = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        function()
+        samples.append((time.perf_counter() - started) * 1e6)
+    return {'median_us': round(statistics.median(samples), 1), 'min_us': round(min(samples), 1)}
+
+
+def run(formats: int, repeat: int) -> dict:
+    info = make_info(formats)
+    downloader = YouTubeDownloader()
+    table = FormatTable.from_info(info)
+    available = downloader.get_available_formats(info)
+    return {
+        'formats': formats,
+        'video_choices': len(available['video']),
+        'audio_choices': len(available['audio']),
+        'format_table': timed(lambda: FormatTable.from_info(info), repeat),
+        'get_available_formats': timed(lambda: downloader.get_available_formats(info), repeat),
+        'best_under_height': timed(lambda: table.best_under_height(720), repeat),
+        'best_audio': timed(lambda: table.best_audio(), repeat),
+        'stream_urls_expired': timed(lambda: downloader.stream_urls_expired(info), repeat),
+    }
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--formats', type=int, nargs='+', default=[50, 300, 1000])
+    parser.add_argument('--repeat', type=int, default=200)
+    args = parser.parse_args()
+
+    results = [run(formats, args.repeat) for formats in args.formats]
+    print(json.dumps({'benchmark': 'formats', 'repeat': args.repeat, 'results': results}))
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
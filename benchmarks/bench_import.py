@@ -0,0 +1,81 @@
+# ytdowloader\benchmarks\bench_import.py
+#
+# Mede o tempo de importação a frio dos pontos de entrada e verifica que o
+# modo headless não carrega módulos da interface gráfica (e que a GUI não
+# importa yt_dlp, PIL nem requests antes da primeira janela).
+#
+#   python benchmarks/bench_import.py [--runs N] [--max-ms MS]
+
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Módulos que o modo headless nunca deve importar
+GUI_MODULES = ('tkinter', 'PIL', 'requests')
+
+# Módulos pesados carregados sob demanda (nunca na importação)
+LAZY_MODULES = ('yt_dlp', 'PIL', 'requests')
+
+PROBE = r'''
+import json, sys, time
+t = time.perf_counter()
+import {module}
+elapsed = time.perf_counter() - t
+print(json.dumps({{
+    "ms": elapsed * 1000,
+    "modules": len(sys.modules),
+    "loaded": sorted(m for m in {watch!r} if m in sys.modules),
+}}))
+'''
+
+
+def measure(module: str, runs: int) -> dict:
+    """Importa `module` em processos novos e resume os tempos"""
+    samples = []
+    for _ in range(runs):
+        out = subprocess.run(
+            [sys.executable, '-c', PROBE.format(module=module, watch=GUI_MODULES + LAZY_MODULES)],
+            cwd=ROOT, capture_output=True, text=True, check=True)
+        samples.append(json.loads(out.stdout))
+    times = [s['ms'] for s in samples]
+    return {
+        'module': module,
+        'runs': runs,
+        'min_ms': round(min(times), 2),
+        'median_ms': round(statistics.median(times), 2),
+        'modules_loaded': samples[-1]['modules'],
+        'loaded': samples[-1]['loaded'],
+    }
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--runs', type=int, default=5)
+    parser.add_argument('--max-ms', type=float, default=None,
+                        help='falha se a mediana do modo headless passar deste valor')
+    args = parser.parse_args()
+
+    cli = measure('src.cli', args.runs)
+    gui = measure('src.gui', args.runs)
+    print(json.dumps({'cli': cli, 'gui': gui}))
+
+    status = 0
+    for name, result, forbidden in (('headless', cli, GUI_MODULES + LAZY_MODULES),
+                                    ('gui', gui, LAZY_MODULES)):
+        loaded = [m for m in result['loaded'] if m in forbidden]
+        if loaded:
+            print(f"ERRO: o modo {name} importou {loaded}", file=sys.stderr)
+            status = 1
+    if args.max_ms is not None and cli['median_ms'] > args.max_ms:
+        print(f"ERRO: importação levou {cli['median_ms']}ms (limite {args.max_ms}ms)", file=sys.stderr)
+        status = 1
+    return status
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,107 @@
+# ytdowloader\benchmarks\bench_memory.py
+#
+# Mede a memória retida por uma fila de N itens (10 mil por padrão): info
+# dicts brutos do yt-dlp, os dicts formatados que get_video_info devolvia
+# antes (com descrição e textos de exibição) e os VideoRecord atuais, além
+# dos DownloadJob da fila. Os info dicts brutos são medidos numa amostra e
+# extrapolados, para não precisar de gigabytes de RAM.
+#
+#   python benchmarks/bench_memory.py [--items 10000] [--formats 60] [--raw-sample 200]
+
+import argparse
+import gc
+import json
+import os
+import sys
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from benchmarks.fixtures import make_info
+from src.download_queue import DownloadJob
+from src.downloader import YouTubeDownloader
+from src.formats import FormatTable
+from src.records import VideoRecord
+
+
+def legacy_video_info(downloader: YouTubeDownloader, info: dict) -> dict:
+    """Dict que get_video_info retornava antes dos registros compactos"""
+    table = FormatTable.from_info(info)
+    formats = {'video': [], 'audio': []}
+    for i in table.video_choices():
+        height = table.height[i]
+        resolution = f"{height}p" if height else (table.note[i] or 'unknown')
+        formats['video'].append({'format_id': table.format_id[i], 'resolution': resolution,
+                                 'height': height, 'ext': table.ext[i],
+                                 'filesize': downloader.format_filesize(table.filesize[i]),
+                                 'quality': f"{resolution} ({table.ext[i]})"})
+    for i in table.audio_choices():
+        abr = int(table.abr[i])
+        formats['audio'].append({'format_id': table.format_id[i], 'abr': abr,
+                                 'quality': f"{abr}kbps ({table.ext[i]})", 'ext': table.ext[i],
+                                 'filesize': downloader.format_filesize(table.filesize[i])})
+    return {
+        'title': info.get('title', 'Desconhecido'),
+        'duration': downloader.format_duration(info.get('duration', 0)),
+        'uploader': info.get('uploader', 'Desconhecido'),
+        'view_count': f"{info.get('view_count', 0):,}",
+        'upload_date': downloader.format_date(info.get('upload_date', '')),
+        'thumbnail': info.get('thumbnail', ''),
+        'description': info.get('description', 'Sem descrição'),
+        'formats': formats,
+    }
+
+
+def retained(build, count: int) -> dict:
+    """Bytes retidos (tracemalloc) por `count` objetos criados por `build(n)`"""
+    gc.collect()
+    tracemalloc.start()
+    baseline = tracemalloc.get_traced_memory()[0]
+    started = time.perf_counter()
+    items = [build(n) for n in range(count)]
+    elapsed = time.perf_counter() - started
+    gc.collect()
+    current = tracemalloc.get_traced_memory()[0] - baseline
+    tracemalloc.stop()
+    del items
+    return {'items': count, 'bytes': current, 'bytes_per_item': round(current / count),
+            'build_seconds': round(elapsed, 3)}
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--items', type=int, default=10000)
+    parser.add_argument('--formats', type=int, default=60, help='formatos por vídeo')
+    parser.add_argument('--raw-sample', type=int, default=200, help='info dicts brutos medidos de fato')
+    args = parser.parse_args()
+
+    downloader = YouTubeDownloader()
+    # Poucos info dicts distintos reaproveitados: a geração não entra na medição
+    infos = [make_info(args.formats, video_id=f"bench{n:06d}", seed=n) for n in range(16)]
+
+    def info_for(n):
+        # Título e descrição próprios por item, como numa playlist real
+        return dict(infos[n % len(infos)], title=f"Vídeo sintético {n}", description=f"{n} " + 'x' * 5000)
+
+    raw = retained(lambda n: make_info(args.formats, video_id=f"bench{n:06d}", seed=n),
+                   min(args.raw_sample, args.items))
+    raw['extrapolated_bytes'] = raw['bytes_per_item'] * args.items
+
+    legacy = retained(lambda n: legacy_video_info(downloader, info_for(n)), args.items)
+    records = retained(lambda n: VideoRecord.from_info(info_for(n), f"https://www.youtube.com/watch?v={n:011d}"),
+                       args.items)
+    jobs = retained(lambda n: DownloadJob(job_id=n, url=f"https://www.youtube.com/watch?v={n:011d}",
+                                          options={'download_type': 'video'}, host='www.youtube.com'),
+                    args.items)
+
+    print(json.dumps({
+        'benchmark': 'memory', 'items': args.items, 'formats': args.formats,
+        'raw_info': raw, 'legacy_video_info': legacy, 'video_record': records, 'download_job': jobs,
+        'record_vs_legacy': round(legacy['bytes'] / max(records['bytes'], 1), 1),
+    }))
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
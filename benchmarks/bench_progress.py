@@ -0,0 +1,136 @@
+# ytdowloader\benchmarks\bench_progress.py
+#
+# Mede o custo dos hooks de progresso por chamada (o yt-dlp chama os hooks a
+# cada bloco recebido) e quantos eventos chegam à interface: agregador,
+# limitador de banda sem limite, cadeia completa da fila (InstrumentedDownloader
+# + DownloadQueue) e, para comparação, uma fila por callback como antes.
+#
+#   python benchmarks/bench_progress.py [--calls 200000] [--jobs 4]
+
+import argparse
+import json
+import os
+import queue
+import sys
+import threading
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.bandwidth import BandwidthManager
+from src.download_queue import DownloadQueue
+from src.metrics import InstrumentedDownloader, Metrics
+from src.progress import ProgressAggregator
+
+CHUNK = 16 * 1024
+
+
+def progress_dicts(calls: int, filename: str = 'video.f137.mp4'):
+    total = calls * CHUNK
+    for n in range(1, calls + 1):
+        yield {'status': 'downloading', 'filename': filename, 'tmpfilename': f"{filename}.part",
+               'downloaded_bytes': n * CHUNK, 'total_bytes': total, 'speed': 1e7, 'eta': 1}
+
+
+def per_call(hook, calls: int) -> dict:
+    items = list(progress_dicts(calls))
+    started = time.perf_counter()
+    for d in items:
+        hook(d)
+    elapsed = time.perf_counter() - started
+    return {'calls': calls, 'ns_per_call': round(elapsed / calls * 1e9, 1)}
+
+
+class _FakeDownloader:
+    """Downloader que só dispara os hooks, como o yt-dlp faria"""
+
+    class cache:
+        @staticmethod
+        def stats():
+            return {}
+
+    def __init__(self, calls: int):
+        self.calls = calls
+
+    def archived_download(self, url):
+        return None
+
+    def extract_info(self, url):
+        return {'title': url}
+
+    def download_video(self, url, options, progress_callback=None, info=None, postprocessor_callback=None):
+        for d in progress_dicts(self.calls, f"{url.rsplit('/', 1)[-1]}.mp4"):
+            progress_callback(d)
+        progress_callback({'status': 'finished', 'filename': f"{url.rsplit('/', 1)[-1]}.mp4",
+                           'downloaded_bytes': self.calls * CHUNK})
+        return {'path': 'reuse'}
+
+
+def queue_chain(calls: int, jobs: int) -> dict:
+    """Cadeia completa: hooks da fila + métricas, com `jobs` downloads simultâneos"""
+    metrics = Metrics()
+    download_queue = DownloadQueue(InstrumentedDownloader(_FakeDownloader(calls), metrics), max_workers=jobs,
+                                   per_host_limit=jobs)
+    events = download_queue.subscribe()
+    started = time.perf_counter()
+    for n in range(jobs):
+        download_queue.submit(f"http://bench.invalid/job{n}", {'download_type': 'video'})
+    download_queue.wait()
+    elapsed = time.perf_counter() - started
+    download_queue.shutdown()
+
+    progress_events = 0
+    while True:
+        try:
+            event = events.get_nowait()
+        except queue.Empty:
+            break
+        progress_events += event.kind == 'progress'
+    return {'calls': calls * jobs, 'jobs': jobs,
+            'ns_per_call': round(elapsed / (calls * jobs) * 1e9, 1),
+            'ui_events': progress_events}
+
+
+def legacy_chain(calls: int) -> dict:
+    """Um evento por callback numa queue.Queue (caminho antigo da GUI), drenado por outra thread"""
+    events = queue.Queue()
+    done = threading.Event()
+    drained = [0]
+
+    def drain():
+        while not (done.is_set() and events.empty()):
+            try:
+                events.get(timeout=0.05)
+                drained[0] += 1
+            except queue.Empty:
+                pass
+
+    consumer = threading.Thread(target=drain)
+    consumer.start()
+    result = per_call(lambda d: events.put(dict(d)), calls)
+    done.set()
+    consumer.join()
+    result['ui_events'] = drained[0]
+    return result
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--calls', type=int, default=200_000, help='callbacks por job')
+    parser.add_argument('--jobs', type=int, default=4)
+    args = parser.parse_args()
+
+    aggregator = ProgressAggregator()
+    stream = BandwidthManager(rate=None).register('bench')
+    results = {
+        'aggregator': per_call(aggregator.progress_hook(1), args.calls),
+        'bandwidth_unlimited': per_call(stream.progress_hook(), args.calls),
+        'legacy_queue_per_callback': legacy_chain(args.calls),
+        'queue_chain': queue_chain(args.calls // args.jobs, args.jobs),
+    }
+    print(json.dumps({'benchmark': 'progress', 'results': results}))
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
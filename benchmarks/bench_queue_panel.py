@@ -0,0 +1,141 @@
+# ytdowloader\benchmarks\bench_queue_panel.py
+#
+# Tabela da fila com N jobs (10 mil por padrão): carga inicial pelos eventos
+# de submit, quadros típicos (progresso de alguns jobs ativos e algumas
+# mudanças de estado por quadro), reordenação e filtro no QueueModel. Com
+# display disponível, mede também o QueuePanel virtualizado (render, rolagem
+# e quadros) contra um Treeview comum com um item por job.
+#
+#   python benchmarks/bench_queue_panel.py [--jobs 10000] [--frames 200] [--active 3]
+
+import argparse
+import json
+import os
+import random
+import statistics
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.download_queue import JobEvent, JobState
+from src.queue_panel import QueueModel
+
+
+def submit_events(jobs: int) -> list:
+    return [JobEvent(n, 'state', JobState.QUEUED, {'url': f"https://www.youtube.com/watch?v={n:011d}"})
+            for n in range(1, jobs + 1)]
+
+
+def frame_batches(jobs: int, frames: int, active: int, seed: int = 1) -> list:
+    """Lotes como os de _poll_queue_events: progresso dos ativos e ~1 mudança de estado por quadro"""
+    rng = random.Random(seed)
+    batches = []
+    progress = {}
+    running = list(range(1, active + 1))
+    next_job = active + 1
+    for _ in range(frames):
+        batch = []
+        if rng.random() < 0.3 and next_job <= jobs:
+            finished = running.pop(0)
+            batch.append(JobEvent(finished, 'state', JobState.DONE))
+            running.append(next_job)
+            batch.append(JobEvent(next_job, 'state', JobState.DOWNLOADING, {'title': f"Vídeo {next_job}"}))
+            next_job += 1
+        for job_id in running:
+            progress[job_id] = min(progress.get(job_id, 0.0) + rng.uniform(0.5, 3.0), 99.0)
+            batch.append(JobEvent(job_id, 'progress', JobState.DOWNLOADING, {'percent': progress[job_id]}))
+        batches.append(batch)
+    return batches
+
+
+def timed(function) -> float:
+    started = time.perf_counter()
+    function()
+    return (time.perf_counter() - started) * 1000
+
+
+def frame_times(apply, batches) -> dict:
+    times = [timed(lambda b=batch: apply(b)) for batch in batches]
+    return {'mean_ms': round(statistics.mean(times), 3), 'max_ms': round(max(times), 3),
+            'p95_ms': round(sorted(times)[int(len(times) * 0.95) - 1], 3)}
+
+
+def bench_model(args) -> dict:
+    model = QueueModel()
+    load_ms = timed(lambda: (model.apply(submit_events(args.jobs)), model.view()))
+    batches = frame_batches(args.jobs, args.frames, args.active)
+
+    def frame(batch):
+        model.apply(batch)
+        model.window(0, 12)
+        model.take_changed()
+
+    results = {'load_ms': round(load_ms, 2), 'frames_by_id': frame_times(frame, batches)}
+    model.sort('progress', reverse=True)
+    results['frames_by_progress'] = frame_times(frame, frame_batches(args.jobs, args.frames, args.active, seed=2))
+    model.sort('title')
+    results['sort_title_ms'] = round(timed(model.view), 2)
+    model.set_filter(JobState.QUEUED)
+    results['filter_ms'] = round(timed(model.view), 2)
+    return results
+
+
+def bench_tk(args) -> dict:
+    import tkinter as tk
+    from tkinter import ttk
+
+    try:
+        root = tk.Tk()
+    except tk.TclError as e:
+        return {'skipped': f"sem display: {e}"}
+    root.withdraw()
+    try:
+        from src.queue_panel import QueuePanel
+
+        panel = QueuePanel(root, download_queue=None)
+        panel.pack()
+        results = {'virtual_load_ms': round(timed(lambda: (panel.apply(submit_events(args.jobs)),
+                                                           root.update())), 2)}
+        results['virtual_scroll_ms'] = round(timed(lambda: [(panel._scroll_by(37), root.update_idletasks())
+                                                            for _ in range(100)]) / 100, 3)
+        results['virtual_frames'] = frame_times(lambda b: (panel.apply(b), root.update_idletasks()),
+                                                frame_batches(args.jobs, args.frames, args.active))
+
+        # Referência: um item do Treeview por job, atualizado por iid
+        tree = ttk.Treeview(root, columns=('state', 'progress', 'title'), show='headings')
+        tree.pack()
+
+        def load_all():
+            for event in submit_events(args.jobs):
+                tree.insert('', tk.END, iid=str(event.job_id), values=('Na fila', '0%', event.data['url']))
+            root.update()
+
+        def naive_frame(batch):
+            for event in batch:
+                tree.set(str(event.job_id), 'progress', f"{event.data.get('percent', 100):.0f}%")
+            root.update_idletasks()
+
+        results['full_load_ms'] = round(timed(load_all), 2)
+        results['full_frames'] = frame_times(naive_frame, frame_batches(args.jobs, args.frames, args.active))
+        results['full_sort_ms'] = round(timed(lambda: [tree.move(iid, '', n) for n, iid in
+                                                       enumerate(reversed(tree.get_children()))]), 2)
+        return results
+    finally:
+        root.destroy()
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--jobs', type=int, default=10000)
+    parser.add_argument('--frames', type=int, default=200)
+    parser.add_argument('--active', type=int, default=3, help='jobs baixando ao mesmo tempo')
+    args = parser.parse_args()
+
+    print(json.dumps({'benchmark': 'queue_panel', 'jobs': args.jobs, 'frames': args.frames,
+                      'model': bench_model(args), 'tk': bench_tk(args)}))
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
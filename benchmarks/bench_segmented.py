@@ -0,0 +1,57 @@
+# ytdowloader\benchmarks\bench_segmented.py
+#
+# Compara o download por uma conexão com o download segmentado contra um
+# servidor local que limita a banda por conexão.
+#
+#   python benchmarks/bench_segmented.py [--size-mb 32] [--rate-mb 8]
+
+import argparse
+import json
+import os
+import sys
+import tempfile
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from benchmarks.fixtures import MediaServer, make_payload
+from src.segmented import SegmentedDownloader
+
+
+def run(server: MediaServer, connections: int, segment_size: int, directory: str) -> dict:
+    filename = os.path.join(directory, f"out_{connections}.bin")
+    stats = SegmentedDownloader(connections=connections, segment_size=segment_size).download(
+        server.url('media.bin'), filename)
+    with open(filename, 'rb') as f:
+        ok = f.read() == server.files['media.bin']
+    os.remove(filename)
+    return {
+        'connections': connections,
+        'seconds': round(stats['elapsed'], 3),
+        'mb_per_s': round(stats['total_bytes'] / stats['elapsed'] / 1e6, 2),
+        'segments': stats['segments'],
+        'ok': ok,
+    }
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--size-mb', type=float, default=32)
+    parser.add_argument('--rate-mb', type=float, default=8, help='limite por conexão (MB/s)')
+    parser.add_argument('--segment-mb', type=float, default=2)
+    parser.add_argument('--connections', type=int, nargs='+', default=[1, 2, 4, 8])
+    args = parser.parse_args()
+
+    payload = make_payload(int(args.size_mb * 1e6))
+    results = []
+    with MediaServer({'media.bin': payload}, per_connection_rate=args.rate_mb * 1e6) as server, \
+            tempfile.TemporaryDirectory() as directory:
+        for connections in args.connections:
+            results.append(run(server, connections, int(args.segment_mb * 1e6), directory))
+
+    print(json.dumps({'benchmark': 'segmented', 'size_mb': args.size_mb,
+                      'rate_mb_per_connection': args.rate_mb, 'results': results}))
+    return 0 if all(r['ok'] for r in results) else 1
+
+
+if __name__ == '__main__':
+    sys.exit(main())
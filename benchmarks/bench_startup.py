@@ -0,0 +1,65 @@
+# ytdowloader\benchmarks\bench_startup.py
+#
+# Mede o tempo até a primeira janela mapeada da GUI, de fora do processo.
+# Funciona com o código-fonte ou com o executável gerado pelo PyInstaller:
+#
+#   python benchmarks/bench_startup.py [--runs N]
+#   python benchmarks/bench_startup.py --exe dist/YouTubeDownloader.exe
+
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def run_once(command: list, timeout: float) -> dict:
+    """Abre a aplicação, espera o relatório da primeira exibição e a encerra"""
+    fd, report_path = tempfile.mkstemp(suffix='.json')
+    os.close(fd)
+    os.remove(report_path)
+    env = dict(os.environ, YTD_STARTUP_REPORT=report_path, YTD_STARTUP_EXIT='1')
+    try:
+        launched_at = time.time()
+        proc = subprocess.Popen(command, cwd=ROOT, env=env)
+        proc.wait(timeout=timeout)
+        with open(report_path, encoding='utf-8') as f:
+            report = json.load(f)
+        return {
+            'wall_ms': (report['mapped_at'] - launched_at) * 1000,
+            'in_process_ms': report['first_map_ms'],
+        }
+    finally:
+        if os.path.exists(report_path):
+            os.remove(report_path)
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--runs', type=int, default=5)
+    parser.add_argument('--exe', help='executável do PyInstaller (padrão: python -m src.main)')
+    parser.add_argument('--timeout', type=float, default=60)
+    args = parser.parse_args()
+
+    command = [args.exe] if args.exe else [sys.executable, '-m', 'src.main']
+    samples = [run_once(command, args.timeout) for _ in range(args.runs)]
+
+    wall = [s['wall_ms'] for s in samples]
+    in_process = [s['in_process_ms'] for s in samples]
+    print(json.dumps({
+        'target': args.exe or 'src.main',
+        'runs': args.runs,
+        'wall_min_ms': round(min(wall), 2),
+        'wall_median_ms': round(statistics.median(wall), 2),
+        'in_process_median_ms': round(statistics.median(in_process), 2),
+    }))
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
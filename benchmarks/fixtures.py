@@ -0,0 +1,302 @@
+# ytdowloader\benchmarks\fixtures.py
+#
+# Fixtures offline para os benchmarks: servidor HTTP local com suporte a
+# Range e latência/limite de banda configuráveis, info dicts sintéticos com
+# centenas de formatos e manifestos HLS/DASH falsos.
+
+import os
+import random
+import re
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+RANGE_RE = re.compile(r'bytes=(\d*)-(\d*)')
+
+CONTENT_TYPES = {
+    '.m3u8': 'application/vnd.apple.mpegurl',
+    '.mpd': 'application/dash+xml',
+    '.ts': 'video/mp2t',
+    '.m4s': 'video/iso.segment',
+    '.mp4': 'video/mp4',
+    '.m4a': 'audio/mp4',
+    '.webm': 'video/webm',
+}
+
+HEIGHTS = (144, 240, 360, 480, 720, 1080, 1440, 2160)
+VIDEO_CODECS = (('avc1.4d401e', 'mp4'), ('vp9', 'webm'), ('av01.0.08M.08', 'mp4'))
+AUDIO_CODECS = (('mp4a.40.2', 'm4a'), ('opus', 'webm'), ('mp4a.40.5', 'm4a'))
+
+
+class _QuietServer(ThreadingHTTPServer):
+    daemon_threads = True
+
+    def handle_error(self, request, client_address):
+        # Clientes que desconectam no meio (retomada, cancelamento) são esperados
+        pass
+
+
+def make_payload(size: int, seed: int = 0) -> bytes:
+    """Conteúdo determinístico de `size` bytes"""
+    block = bytes((i * 31 + seed) % 251 for i in range(4096))
+    return (block * (size // len(block) + 1))[:size]
+
+
+def make_info(formats: int = 300, video_id: str = 'bench000001', seed: int = 0,
+              base_url: Optional[str] = None, expires_in: float = 6 * 3600) -> Dict[str, Any]:
+    """Info dict no formato do yt-dlp com `formats` formatos variados
+
+    Mistura vídeo puro, áudio puro, combinados, HLS/DASH e storyboards (sem
+    vídeo nem áudio), como as páginas reais do YouTube, com valores
+    determinísticos para a `seed`. As URLs apontam para `base_url` (ex.: um
+    MediaServer) ou para um host fictício, com `expire=` no query string.
+    """
+    rng = random.Random(seed)
+    expire = int(time.time() + expires_in)
+    host = base_url or 'https://rr1---sn-bench.googlevideo.invalid'
+    items = []
+    for n in range(formats):
+        format_id = str(100 + n)
+        url = f"{host}/videoplayback?id={video_id}&itag={format_id}&expire={expire}"
+        roll = n % 10
+        duration = 600
+        if roll == 9:
+            items.append({'format_id': f"sb{n}", 'format_note': 'storyboard', 'ext': 'mhtml',
+                          'vcodec': 'none', 'acodec': 'none', 'protocol': 'mhtml', 'url': url,
+                          'width': 48, 'height': 27, 'resolution': '48x27'})
+            continue
+        if roll in (0, 1, 2):
+            acodec, ext = AUDIO_CODECS[rng.randrange(len(AUDIO_CODECS))]
+            abr = rng.choice((48, 64, 96, 128, 160, 192, 256))
+            items.append({'format_id': format_id, 'ext': ext, 'vcodec': 'none', 'acodec': acodec,
+                          'abr': abr, 'tbr': abr, 'asr': 48000, 'audio_channels': 2,
+                          'filesize': abr * 125 * duration, 'protocol': 'https', 'url': url,
+                          'format_note': f"{abr}k", 'resolution': 'audio only',
+                          'http_headers': {'User-Agent': 'bench'}})
+            continue
+        height = HEIGHTS[rng.randrange(len(HEIGHTS))]
+        vcodec, ext = VIDEO_CODECS[rng.randrange(len(VIDEO_CODECS))]
+        fps = rng.choice((24, 30, 60))
+        vbr = height * rng.uniform(2.5, 6.0)
+        fmt = {'format_id': format_id, 'ext': ext, 'vcodec': vcodec, 'acodec': 'none',
+               'width': height * 16 // 9, 'height': height, 'fps': fps, 'vbr': vbr, 'tbr': vbr,
+               'resolution': f"{height * 16 // 9}x{height}", 'format_note': f"{height}p",
+               'protocol': 'https', 'url': url, 'http_headers': {'User-Agent': 'bench'}}
+        if roll == 3:
+            fmt.update(acodec='mp4a.40.2', ext='mp4', abr=128, tbr=vbr + 128)
+        elif roll == 4:
+            fmt.update(protocol='m3u8_native', url=f"{host}/hls/{format_id}/index.m3u8")
+        elif roll == 5:
+            fmt.update(protocol='http_dash_segments', url=f"{host}/dash/manifest.mpd")
+        if fmt['protocol'] == 'https':
+            fmt['filesize'] = int(fmt['tbr'] * 125 * duration)
+        else:
+            fmt['filesize_approx'] = int(fmt['tbr'] * 125 * duration)
+        items.append(fmt)
+    return {
+        'id': video_id, 'title': f"Vídeo sintético {video_id}", 'uploader': 'Bench',
+        'duration': 600, 'view_count': 123456, 'upload_date': '20240101',
+        'description': 'x' * 5000, 'thumbnail': f"{host}/vi/{video_id}/hqdefault.jpg",
+        'webpage_url': f"https://www.youtube.com/watch?v={video_id}",
+        'extractor': 'youtube', 'extractor_key': 'Youtube', 'formats': items,
+    }
+
+
+def make_hls_playlist(segments: Sequence[str], segment_duration: float = 4.0) -> str:
+    """Media playlist HLS (VOD) com os segmentos dados"""
+    lines = ['#EXTM3U', '#EXT-X-VERSION:3', f"#EXT-X-TARGETDURATION:{int(segment_duration + 0.999)}",
+             '#EXT-X-MEDIA-SEQUENCE:0', '#EXT-X-PLAYLIST-TYPE:VOD']
+    for name in segments:
+        lines += [f"#EXTINF:{segment_duration:.3f},", name]
+    lines.append('#EXT-X-ENDLIST')
+    return '\n'.join(lines) + '\n'
+
+
+def make_hls_master(variants: Sequence[Tuple[int, int, str]]) -> str:
+    """Master playlist HLS: [(bandwidth bits/s, altura, uri da media playlist)]"""
+    lines = ['#EXTM3U']
+    for bandwidth, height, uri in variants:
+        lines += [f"#EXT-X-STREAM-INF:BANDWIDTH={bandwidth},RESOLUTION={height * 16 // 9}x{height},"
+                  f"CODECS=\"avc1.4d401f,mp4a.40.2\"", uri]
+    return '\n'.join(lines) + '\n'
+
+
+def make_dash_manifest(representations: Sequence[Tuple[str, int, int, List[str]]],
+                       segment_duration: float = 4.0) -> str:
+    """MPD estático com SegmentList: [(id, bandwidth bits/s, altura, [uris dos segmentos])]"""
+    total = segment_duration * max(len(r[3]) for r in representations)
+    reps = []
+    for rep_id, bandwidth, height, segments in representations:
+        urls = ''.join(f'<SegmentURL media="{uri}"/>' for uri in segments)
+        reps.append(f'<Representation id="{rep_id}" bandwidth="{bandwidth}" width="{height * 16 // 9}" '
+                    f'height="{height}" codecs="avc1.4d401f" mimeType="video/mp4">'
+                    f'<SegmentList timescale="1000" duration="{int(segment_duration * 1000)}">'
+                    f'{urls}</SegmentList></Representation>')
+    return ('<?xml version="1.0" encoding="UTF-8"?>\n'
+            '<MPD xmlns="urn:mpeg:dash:schema:mpd:2011" type="static" '
+            f'mediaPresentationDuration="PT{total:.1f}S" minBufferTime="PT2S" '
+            'profiles="urn:mpeg:dash:profile:isoff-on-demand:2011">'
+            f'<Period><AdaptationSet segmentAlignment="true">{"".join(reps)}</AdaptationSet></Period></MPD>\n')
+
+
+class MediaServer:
+    """Servidor HTTP local que serve blobs em memória.
+
+    - `latency`: atraso (s) antes de cada resposta
+    - `per_connection_rate`: limite de banda (bytes/s) por conexão, para
+      simular o throttling por conexão dos CDNs
+    - `total_rate`: limite de banda (bytes/s) somando todas as conexões,
+      para simular o enlace do usuário
+    - `ranges`: desative para simular servidores sem suporte a Range
+    - `fail(name, status, times)`: as próximas `times` requisições de `name`
+      respondem com `status` (429, 503, ...) antes de servir o conteúdo
+    """
+
+    def __init__(self, files: Optional[Dict[str, bytes]] = None, latency: float = 0.0,
+                 per_connection_rate: Optional[float] = None, ranges: bool = True,
+                 total_rate: Optional[float] = None):
+        self.files = dict(files or {})
+        self.latency = latency
+        self.per_connection_rate = per_connection_rate
+        self.total_rate = total_rate
+        self._link_lock = threading.Lock()
+        self._link_free_at = 0.0
+        self.ranges = ranges
+        self.requests = 0
+        self._failures: Dict[str, List[int]] = {}
+        self._server = _QuietServer(('127.0.0.1', 0), self._handler_class())
+        self._thread = None
+
+    @property
+    def base_url(self) -> str:
+        host, port = self._server.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def url(self, name: str) -> str:
+        return f"{self.base_url}/{name}"
+
+    def add_hls(self, name: str = 'hls', variants: Sequence[Tuple[int, int]] = ((800_000, 360), (2_500_000, 720)),
+                segments: int = 10, segment_duration: float = 4.0) -> str:
+        """Publica um stream HLS falso (master + uma playlist por variante); retorna a URL do master
+
+        O tamanho de cada segmento corresponde à banda declarada da variante.
+        """
+        entries = []
+        for index, (bandwidth, height) in enumerate(variants):
+            segment_size = int(bandwidth / 8 * segment_duration)
+            names = [f"{height}p_{n:05d}.ts" for n in range(segments)]
+            for n, segment in enumerate(names):
+                self.files[f"{name}/{segment}"] = make_payload(segment_size, seed=index + n)
+            self.files[f"{name}/{height}p.m3u8"] = make_hls_playlist(names, segment_duration).encode()
+            entries.append((bandwidth, height, f"{height}p.m3u8"))
+        self.files[f"{name}/master.m3u8"] = make_hls_master(entries).encode()
+        return self.url(f"{name}/master.m3u8")
+
+    def add_dash(self, name: str = 'dash', representations: Sequence[Tuple[int, int]] = ((800_000, 360), (2_500_000, 720)),
+                 segments: int = 10, segment_duration: float = 4.0) -> str:
+        """Publica um stream DASH falso (MPD com SegmentList); retorna a URL do manifesto"""
+        reps = []
+        for index, (bandwidth, height) in enumerate(representations):
+            segment_size = int(bandwidth / 8 * segment_duration)
+            names = [f"{height}p_{n:05d}.m4s" for n in range(segments)]
+            for n, segment in enumerate(names):
+                self.files[f"{name}/{segment}"] = make_payload(segment_size, seed=index + n)
+            reps.append((f"{height}p", bandwidth, height, names))
+        self.files[f"{name}/manifest.mpd"] = make_dash_manifest(reps, segment_duration).encode()
+        return self.url(f"{name}/manifest.mpd")
+
+    def fail(self, name: str, status: int, times: int = 1) -> None:
+        self._failures.setdefault(name, []).extend([status] * times)
+
+    def _pace_link(self, nbytes: int) -> None:
+        """Enlace compartilhado: cada bloco ocupa nbytes/total_rate segundos do enlace"""
+        with self._link_lock:
+            now = time.monotonic()
+            start = max(now, self._link_free_at)
+            self._link_free_at = start + nbytes / self.total_rate
+            wait = self._link_free_at - now
+        if wait > 0:
+            time.sleep(wait)
+
+    def __enter__(self) -> 'MediaServer':
+        self._thread = threading.Thread(target=self._server.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self._server.shutdown()
+        self._server.server_close()
+
+    def _handler_class(self):
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = 'HTTP/1.1'
+
+            def log_message(self, *args):
+                pass
+
+            def do_GET(self):
+                server.requests += 1
+                if server.latency:
+                    time.sleep(server.latency)
+                name = self.path.lstrip('/').split('?')[0]
+                failures = server._failures.get(name)
+                if failures:
+                    self.send_error(failures.pop(0))
+                    return
+                data = server.files.get(name)
+                if data is None:
+                    self.send_error(404)
+                    return
+
+                start, end, status = 0, len(data) - 1, 200
+                match = RANGE_RE.match(self.headers.get('Range', '')) if server.ranges else None
+                if match and (match.group(1) or match.group(2)):
+                    if match.group(1):
+                        start = int(match.group(1))
+                        end = min(int(match.group(2)), end) if match.group(2) else end
+                    else:
+                        start = max(0, len(data) - int(match.group(2)))
+                    if start > end:
+                        self.send_response(416)
+                        self.send_header('Content-Range', f"bytes */{len(data)}")
+                        self.send_header('Content-Length', '0')
+                        self.end_headers()
+                        return
+                    status = 206
+
+                self.send_response(status)
+                self.send_header('Content-Type', CONTENT_TYPES.get(os.path.splitext(name)[1],
+                                                                   'application/octet-stream'))
+                self.send_header('Content-Length', str(end - start + 1))
+                if server.ranges:
+                    self.send_header('Accept-Ranges', 'bytes')
+                if status == 206:
+                    self.send_header('Content-Range', f"bytes {start}-{end}/{len(data)}")
+                self.end_headers()
+                self._send_body(data, start, end)
+
+            def _send_body(self, data, start, end):
+                chunk_size = 16 * 1024
+                rate = server.per_connection_rate
+                sent_started = time.monotonic()
+                sent = 0
+                position = start
+                try:
+                    while position <= end:
+                        chunk = data[position:min(position + chunk_size, end + 1)]
+                        self.wfile.write(chunk)
+                        position += len(chunk)
+                        sent += len(chunk)
+                        if rate:
+                            ahead = sent / rate - (time.monotonic() - sent_started)
+                            if ahead > 0:
+                                time.sleep(ahead)
+                        if server.total_rate:
+                            server._pace_link(len(chunk))
+                except (BrokenPipeError, ConnectionResetError):
+                    pass
+
+        return Handler
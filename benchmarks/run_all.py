@@ -0,0 +1,81 @@
+# ytdowloader\benchmarks\run_all.py
+#
+# Roda todos os benchmarks offline e grava um único JSON (com commit, versão
+# do Python e plataforma) para comparar execuções.
+#
+#   python benchmarks/run_all.py [--output resultados.json] [--only formats progress] [--quick]
+
+import argparse
+import json
+import os
+import platform
+import subprocess
+import sys
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# nome -> (script, argumentos normais, argumentos do --quick)
+BENCHMARKS = {
+    'import': ('bench_import.py', [], ['--runs', '3']),
+    'formats': ('bench_formats.py', [], ['--repeat', '20']),
+    'progress': ('bench_progress.py', [], ['--calls', '20000']),
+    'download': ('bench_download.py', [], ['--size-mb', '4']),
+    'segmented': ('bench_segmented.py', [], ['--size-mb', '8', '--connections', '1', '4']),
+    'memory': ('bench_memory.py', [], ['--items', '2000', '--raw-sample', '50']),
+    'adaptive': ('bench_adaptive.py', [], ['--jobs', '4', '--segments', '12']),
+    'bandwidth': ('bench_bandwidth.py', [], ['--jobs', '3', '--size-mb', '4', '--switch-after', '1']),
+    'queue_panel': ('bench_queue_panel.py', [], ['--jobs', '2000', '--frames', '50']),
+    'batch': ('bench_batch.py', [], ['--urls', '60', '--workers', '1', '8']),
+}
+
+
+def git_commit() -> str:
+    try:
+        out = subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], cwd=ROOT,
+                             capture_output=True, text=True, check=True)
+        return out.stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return ''
+
+
+def run(name: str, quick: bool) -> dict:
+    script, args, quick_args = BENCHMARKS[name]
+    started = time.perf_counter()
+    out = subprocess.run([sys.executable, os.path.join(ROOT, 'benchmarks', script)] + (quick_args if quick else args),
+                         cwd=ROOT, capture_output=True, text=True)
+    result = {'exit_code': out.returncode, 'seconds': round(time.perf_counter() - started, 2)}
+    lines = [line for line in out.stdout.splitlines() if line.startswith('{')]
+    if lines:
+        result['result'] = json.loads(lines[-1])
+    if out.returncode != 0:
+        result['stderr'] = out.stderr.strip()[-2000:]
+    return result
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--output', help='arquivo JSON de saída (padrão: stdout)')
+    parser.add_argument('--only', nargs='+', choices=sorted(BENCHMARKS), help='rodar só estes')
+    parser.add_argument('--quick', action='store_true', help='cargas menores (para CI)')
+    args = parser.parse_args()
+
+    report = {
+        'commit': git_commit(),
+        'timestamp': time.time(),
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'quick': args.quick,
+        'benchmarks': {name: run(name, args.quick) for name in (args.only or BENCHMARKS)},
+    }
+    text = json.dumps(report, ensure_ascii=False, indent=2)
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            f.write(text + '\n')
+    else:
+        print(text)
+    return 1 if any(r['exit_code'] for r in report['benchmarks'].values()) else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
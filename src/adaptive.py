@@ -0,0 +1,256 @@
+# ytdowloader\src\adaptive.py
+
+import threading
+import time
+from typing import Any, Dict, List, Optional, Tuple
+from urllib.parse import urljoin
+
+from . import config
+from .formats import AUDIO_ONLY, VIDEO_ONLY, FormatTable
+
+# Abaixo disso a medição ainda é dominada pela abertura da conexão
+MIN_MEASURE_SECONDS = 0.5
+
+
+class ThroughputMeter:
+    """Mede a vazão nos primeiros `window` segundos de um download (progress hook do yt-dlp)"""
+
+    def __init__(self, window: float = config.ADAPTIVE_MEASURE_SECONDS):
+        self.window = window
+        self.started: Optional[float] = None
+        self.bytes = 0
+        self.elapsed = 0.0
+        self._last: Dict[str, int] = {}
+        self._lock = threading.Lock()
+
+    def hook(self, d: Dict[str, Any]) -> None:
+        if d.get('status') != 'downloading':
+            return
+        now = time.monotonic()
+        key = d.get('tmpfilename') or d.get('filename')
+        downloaded = d.get('downloaded_bytes') or 0
+        with self._lock:
+            if self.started is None:
+                self.started = now
+            delta = downloaded - self._last.get(key, 0)
+            if delta <= 0:
+                return  # snapshot atrasado de outra conexão (download segmentado)
+            self._last[key] = downloaded
+            if now - self.started <= self.window:
+                self.bytes += delta
+                self.elapsed = now - self.started
+
+    @property
+    def rate(self) -> Optional[float]:
+        """Bytes/s medidos (None se o download durou pouco demais para medir)"""
+        with self._lock:
+            if self.elapsed < MIN_MEASURE_SECONDS:
+                return None
+            return self.bytes / self.elapsed
+
+
+class FragmentTuner:
+    """Quantos fragmentos (ou faixas) baixar ao mesmo tempo, ajustado por host entre os jobs.
+
+    Cada host começa com 1 e dobra a cada job enquanto a vazão medida melhora
+    pelo menos `min_gain`; quando para de melhorar, volta ao melhor valor e
+    fica nele. Se a vazão cair pela metade (a conexão mudou), a busca recomeça.
+    """
+
+    def __init__(self, max_concurrency: int = config.ADAPTIVE_MAX_CONCURRENCY,
+                 min_gain: float = config.ADAPTIVE_MIN_GAIN):
+        self.max_concurrency = max_concurrency
+        self.min_gain = min_gain
+        self._lock = threading.Lock()
+        self._hosts: Dict[str, Dict[str, Any]] = {}
+
+    def concurrency(self, host: str) -> int:
+        with self._lock:
+            return self._state(host)['current']
+
+    def throughput(self, host: str) -> Optional[float]:
+        """Última vazão medida para o host (bytes/s)"""
+        with self._lock:
+            state = self._hosts.get(host)
+            return state['rate'] if state else None
+
+    def seed(self, host: str, concurrency: int, rate: float) -> None:
+        """Adota o resultado de uma sondagem (`probe_concurrency`) como ponto de partida já ajustado"""
+        with self._lock:
+            self._hosts[host] = {'current': concurrency, 'best': concurrency, 'best_rate': rate,
+                                 'rate': rate, 'settled': True}
+
+    def report(self, host: str, concurrency: int, rate: float) -> None:
+        """Registra a vazão obtida por um job que usou `concurrency`"""
+        with self._lock:
+            state = self._state(host)
+            state['rate'] = rate
+            if concurrency != state['current']:
+                return  # job iniciado antes do último ajuste
+            best_rate = state['best_rate']
+            if best_rate is None or rate > best_rate * (1 + self.min_gain):
+                state['best'], state['best_rate'] = concurrency, rate
+                if not state['settled'] and concurrency < self.max_concurrency:
+                    state['current'] = min(concurrency * 2, self.max_concurrency)
+                else:
+                    state['settled'] = True
+            elif not state['settled']:
+                state['current'], state['settled'] = state['best'], True
+            elif rate < best_rate / 2:
+                self._hosts[host] = self._initial()
+
+    def stats(self) -> Dict[str, Dict[str, Any]]:
+        with self._lock:
+            return {host: dict(state) for host, state in self._hosts.items()}
+
+    def _state(self, host: str) -> Dict[str, Any]:
+        state = self._hosts.get(host)
+        if state is None:
+            state = self._hosts[host] = self._initial()
+        return state
+
+    @staticmethod
+    def _initial() -> Dict[str, Any]:
+        return {'current': 1, 'best': 1, 'best_rate': None, 'rate': None, 'settled': False}
+
+
+def probe_targets(fmt: Dict[str, Any], count: int, chunk: int = config.ADAPTIVE_PROBE_CHUNK) -> List[Tuple[str, int]]:
+    """Até `count` pedaços (url, início) de um formato para a sondagem
+
+    DASH: fragmentos listados no formato; HLS: segmentos da media playlist;
+    arquivos progressivos: faixas consecutivas de `chunk` bytes.
+    """
+    protocol = fmt.get('protocol') or ''
+    if fmt.get('fragments'):
+        base = fmt.get('fragment_base_url') or fmt.get('url') or ''
+        urls = [f.get('url') or urljoin(base, f.get('path', '')) for f in fmt['fragments']]
+        return [(url, 0) for url in urls[:count]]
+    if protocol.startswith('m3u8'):
+        body, _ = _fetch(fmt['url'], fmt.get('http_headers'), 0, 1024 * 1024)
+        lines = body.decode('utf-8', 'replace').splitlines()
+        urls = [urljoin(fmt['url'], line.strip()) for line in lines if line.strip() and not line.startswith('#')]
+        return [(url, 0) for url in urls[:count]]
+    return [(fmt['url'], n * chunk) for n in range(count)]
+
+
+def probe_concurrency(targets: List[Tuple[str, int]], headers: Optional[Dict[str, str]] = None,
+                      max_concurrency: int = config.ADAPTIVE_MAX_CONCURRENCY,
+                      min_gain: float = config.ADAPTIVE_MIN_GAIN,
+                      chunk: int = config.ADAPTIVE_PROBE_CHUNK) -> Dict[str, Any]:
+    """Sonda a vazão com 1, 2, 4, ... conexões simultâneas até ela parar de melhorar
+
+    Cada nível baixa `chunk` bytes por conexão de pedaços distintos de
+    `targets`. Retorna o nível escolhido, a vazão dele (bytes/s) e a vazão
+    de cada nível testado.
+    """
+    if not targets:
+        raise ValueError("Nada para sondar")
+    rates: Dict[int, float] = {}
+    best, best_rate = 1, 0.0
+    level, offset = 1, 0
+    while level <= max_concurrency:
+        batch = [targets[(offset + n) % len(targets)] for n in range(level)]
+        offset += level
+        rate = _timed_fetch(batch, headers, chunk)
+        rates[level] = rate
+        if best_rate and rate < best_rate * (1 + min_gain):
+            break
+        best, best_rate = level, rate
+        level *= 2
+    return {'concurrency': best, 'rate': best_rate, 'rates': rates}
+
+
+def probe_format(info: Dict[str, Any], **kwargs) -> Dict[str, Any]:
+    """Sonda o formato de vídeo de maior qualidade do info dict (representa a CDN do download)"""
+    formats = [f for f in info.get('formats') or [] if f.get('url') and (f.get('vcodec') or 'none') != 'none']
+    if not formats:
+        raise ValueError("Nenhum formato de vídeo para sondar")
+    fmt = max(formats, key=lambda f: (f.get('height') or 0, f.get('tbr') or 0))
+    max_concurrency = kwargs.get('max_concurrency', config.ADAPTIVE_MAX_CONCURRENCY)
+    targets = probe_targets(fmt, 2 * max_concurrency, kwargs.get('chunk', config.ADAPTIVE_PROBE_CHUNK))
+    result = probe_concurrency(targets, fmt.get('http_headers'), **kwargs)
+    result['format_id'] = fmt.get('format_id')
+    return result
+
+
+def pick_format(info: Dict[str, Any], throughput: Optional[float] = None, deadline: Optional[float] = None,
+                size_budget: Optional[float] = None) -> Optional[Dict[str, Any]]:
+    """Maior qualidade cujo tamanho cabe em `size_budget` (bytes) e cujo download, à vazão
+    `throughput` (bytes/s), termina em `deadline` segundos
+
+    Considera formatos combinados e vídeo puro + melhor áudio ("137+140").
+    Sem nenhum que caiba, retorna o menor. O tamanho vem de filesize, ou é
+    estimado por tbr x duração. Retorna `format`, `estimated_size` e
+    `estimated_seconds`, ou None se nenhum formato tiver tamanho conhecido.
+    """
+    table = FormatTable.from_info(info)
+    duration = info.get('duration') or 0
+
+    def size_of(i):
+        return table.filesize[i] or table.tbr[i] * 125 * duration or table.abr[i] * 125 * duration
+
+    audio = table.best_audio()
+    candidates = []
+    for i in range(len(table)):
+        kind = table.kind[i]
+        if kind == AUDIO_ONLY:
+            continue
+        size, spec = size_of(i), table.format_id[i]
+        if kind == VIDEO_ONLY:
+            if audio is None:
+                continue
+            size += size_of(audio)
+            spec = f"{spec}+{table.format_id[audio]}"
+        if size:
+            candidates.append(((table.height[i], table.fps[i], table.tbr[i]), spec, size))
+    if not candidates:
+        return None
+
+    def fits(size):
+        if size_budget and size > size_budget:
+            return False
+        return not (deadline and throughput and size / throughput > deadline)
+
+    fitting = [c for c in candidates if fits(c[2])]
+    _, spec, size = max(fitting) if fitting else min(candidates, key=lambda c: c[2])
+    return {'format': spec, 'estimated_size': int(size), 'fits': bool(fitting),
+            'estimated_seconds': size / throughput if throughput else None}
+
+
+def _fetch(url: str, headers: Optional[Dict[str, str]], start: int, length: int) -> Tuple[bytes, float]:
+    """Lê até `length` bytes a partir de `start`; retorna os dados e o tempo gasto"""
+    from .segmented import _Connection  # http.client só quando necessário
+
+    conn = _Connection(timeout=config.ADAPTIVE_PROBE_TIMEOUT)
+    started = time.perf_counter()
+    try:
+        _, response = conn.request(url, dict(headers or {}, Range=f"bytes={start}-{start + length - 1}"))
+        if response.status >= 400:
+            raise OSError(f"HTTP {response.status} em {url}")
+        body = response.read(length)
+    finally:
+        conn.close()
+    return body, time.perf_counter() - started
+
+
+def _timed_fetch(batch: List[Tuple[str, int]], headers: Optional[Dict[str, str]], chunk: int) -> float:
+    """Baixa os pedaços em paralelo (uma conexão cada); retorna a vazão agregada em bytes/s"""
+    received = [0] * len(batch)
+    errors = []
+
+    def fetch(n, url, start):
+        try:
+            received[n] = len(_fetch(url, headers, start, chunk)[0])
+        except Exception as e:
+            errors.append(e)
+
+    started = time.perf_counter()
+    threads = [threading.Thread(target=fetch, args=(n, url, start), daemon=True)
+               for n, (url, start) in enumerate(batch)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    if errors and not any(received):
+        raise errors[0]
+    return sum(received) / max(time.perf_counter() - started, 1e-6)
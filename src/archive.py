@@ -0,0 +1,171 @@
+# ytdowloader\src\archive.py
+
+import hashlib
+import json
+import os
+import re
+import sqlite3
+import threading
+import time
+from typing import Any, Dict, Iterable, Optional, Tuple
+
+from . import config
+
+# IDs entre colchetes no nome do arquivo, ex.: "Título [dQw4w9WgXcQ].mp4"
+BRACKET_ID_RE = re.compile(r'\[([0-9A-Za-z_-]{11})\]')
+
+MEDIA_EXTENSIONS = {'.mp4', '.mkv', '.webm', '.m4a', '.mp3', '.ogg', '.opus', '.wav', '.flac', '.aac', '.mov'}
+
+
+def split_key(key: str) -> Tuple[str, str]:
+    """"Youtube:abc" -> ("youtube", "abc")"""
+    extractor, _, video_id = key.partition(':')
+    return extractor.lower(), video_id
+
+
+def file_sha256(path: str, chunk_size: int = 1024 * 1024) -> str:
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(chunk_size), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+class DownloadArchive:
+    """Índice persistente de vídeos já baixados (extrator + ID).
+
+    As chaves ficam também em um set em memória, então a verificação antes
+    da extração é O(1) mesmo com centenas de milhares de entradas; os
+    detalhes (formato, caminho, tamanho, hash) são lidos do SQLite só
+    quando necessários.
+    """
+
+    def __init__(self, path: Optional[str] = None):
+        self.path = path or config.ARCHIVE_PATH
+        self._lock = threading.Lock()
+
+        if self.path != ':memory:':
+            os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+        self._conn = sqlite3.connect(self.path, check_same_thread=False)
+        self._conn.execute(
+            'CREATE TABLE IF NOT EXISTS archive ('
+            ' extractor TEXT NOT NULL,'
+            ' video_id TEXT NOT NULL,'
+            ' format_id TEXT,'
+            ' path TEXT,'
+            ' size INTEGER,'
+            ' sha256 TEXT,'
+            ' added_at REAL NOT NULL,'
+            ' PRIMARY KEY (extractor, video_id)) WITHOUT ROWID'
+        )
+        self._conn.commit()
+        self._keys = {(extractor, video_id) for extractor, video_id
+                      in self._conn.execute('SELECT extractor, video_id FROM archive')}
+
+    def __len__(self) -> int:
+        return len(self._keys)
+
+    def __contains__(self, key: str) -> bool:
+        return split_key(key) in self._keys
+
+    def get(self, key: str) -> Optional[Dict[str, Any]]:
+        """Detalhes da entrada ou None"""
+        extractor, video_id = split_key(key)
+        if (extractor, video_id) not in self._keys:
+            return None
+        with self._lock:
+            row = self._conn.execute(
+                'SELECT format_id, path, size, sha256, added_at FROM archive WHERE extractor = ? AND video_id = ?',
+                (extractor, video_id)
+            ).fetchone()
+        if row is None:
+            return None
+        return {'key': key, 'format_id': row[0], 'path': row[1], 'size': row[2],
+                'sha256': row[3], 'added_at': row[4]}
+
+    def add(self, key: str, format_id: Optional[str] = None, path: Optional[str] = None,
+            size: Optional[int] = None, sha256: Optional[str] = None) -> None:
+        """Registra (ou atualiza) um download"""
+        self.add_many([(key, format_id, path, size, sha256)])
+
+    def add_many(self, records: Iterable[tuple]) -> int:
+        """Registra vários downloads em uma única transação: (key, format_id, path, size, sha256)"""
+        now = time.time()
+        rows = []
+        for key, format_id, path, size, sha256 in records:
+            extractor, video_id = split_key(key)
+            rows.append((extractor, video_id, format_id, path, size, sha256, now))
+        with self._lock:
+            with self._conn:
+                self._conn.executemany(
+                    'INSERT OR REPLACE INTO archive (extractor, video_id, format_id, path, size, sha256, added_at)'
+                    ' VALUES (?, ?, ?, ?, ?, ?, ?)', rows)
+            self._keys.update((row[0], row[1]) for row in rows)
+        return len(rows)
+
+    def remove(self, key: str) -> None:
+        extractor, video_id = split_key(key)
+        with self._lock:
+            with self._conn:
+                self._conn.execute('DELETE FROM archive WHERE extractor = ? AND video_id = ?',
+                                   (extractor, video_id))
+            self._keys.discard((extractor, video_id))
+
+    def import_ytdlp_archive(self, path: str) -> int:
+        """Importa um arquivo do `--download-archive` do yt-dlp ("youtube <id>" por linha)"""
+        records = []
+        with open(path, encoding='utf-8') as f:
+            for line in f:
+                parts = line.split()
+                if len(parts) == 2:
+                    records.append((f"{parts[0]}:{parts[1]}", None, None, None, None))
+        return self.add_many(records)
+
+    def import_directory(self, directory: str, default_extractor: str = 'youtube',
+                         compute_hash: bool = False) -> Dict[str, int]:
+        """Importa uma pasta de downloads existente
+
+        O ID vem do `.info.json` ao lado do arquivo, quando existir, ou de um
+        "[id]" no nome do arquivo (o `config.OUTPUT_TEMPLATE` usado nos
+        downloads inclui o ID). Arquivos sem ID identificável são contados
+        em 'unmatched': é o caso dos baixados por versões anteriores, que
+        salvavam só "%(title)s.%(ext)s"; o título sozinho não identifica o
+        vídeo, então esses precisam ser baixados de novo (o download é
+        registrado ao terminar) ou renomeados com o ID.
+        """
+        records = []
+        unmatched = 0
+        for entry in os.scandir(directory):
+            if not entry.is_file():
+                continue
+            stem, ext = os.path.splitext(entry.name)
+            if ext.lower() not in MEDIA_EXTENSIONS:
+                continue
+
+            key = format_id = None
+            info_path = os.path.join(directory, f"{stem}.info.json")
+            if os.path.exists(info_path):
+                try:
+                    with open(info_path, encoding='utf-8') as f:
+                        info = json.load(f)
+                    if info.get('extractor_key') and info.get('id'):
+                        key = f"{info['extractor_key']}:{info['id']}"
+                        format_id = info.get('format_id')
+                except (OSError, ValueError):
+                    pass
+            if key is None:
+                match = BRACKET_ID_RE.search(stem)
+                if match:
+                    key = f"{default_extractor}:{match.group(1)}"
+            if key is None:
+                unmatched += 1
+                continue
+
+            sha256 = file_sha256(entry.path) if compute_hash else None
+            records.append((key, format_id, entry.path, entry.stat().st_size, sha256))
+
+        return {'imported': self.add_many(records), 'unmatched': unmatched}
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
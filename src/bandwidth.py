@@ -0,0 +1,176 @@
+# ytdowloader\src\bandwidth.py
+
+import collections
+import threading
+import time
+from typing import Any, Dict, Optional
+
+from . import config
+
+
+def priority_class(priority: int) -> str:
+    """Converte a prioridade numérica da fila em classe de banda"""
+    if priority > 0:
+        return 'high'
+    if priority < 0:
+        return 'low'
+    return 'normal'
+
+
+def parse_rate(text: str) -> Optional[float]:
+    """"500K", "2M", "1.5M" ou bytes/s -> bytes/s (vazio/0 = sem limite)"""
+    text = (text or '').strip().upper()
+    if text.endswith('/S'):
+        text = text[:-2]
+    if text.endswith('B'):
+        text = text[:-1]
+    if not text:
+        return None
+    multiplier = 1
+    if text[-1] in 'KMG':
+        multiplier = 1024 ** ('KMG'.index(text[-1]) + 1)
+        text = text[:-1]
+    rate = float(text) * multiplier
+    return rate or None
+
+
+class BandwidthStream:
+    """Fatia da banda global usada por um download"""
+
+    def __init__(self, manager: 'BandwidthManager', name: str, priority: str):
+        self.manager = manager
+        self.name = name
+        self.priority = priority
+        self.tokens = 0.0
+        self.updated = time.monotonic()
+        self.last_used = 0.0
+        self.transferred = 0
+
+    def consume(self, nbytes: int) -> None:
+        """Contabiliza `nbytes` recebidos e bloqueia o tempo necessário para respeitar a fatia"""
+        if nbytes > 0:
+            delay = self.manager._consume(self, nbytes)
+            if delay > 0:
+                time.sleep(delay)
+
+    def progress_hook(self):
+        """Hook de progresso (contrato do yt-dlp) que limita a banda de quem o chama"""
+        last = {}
+        lock = threading.Lock()
+
+        def hook(d):
+            if d.get('status') != 'downloading':
+                return
+            key = d.get('tmpfilename') or d.get('filename')
+            downloaded = d.get('downloaded_bytes') or 0
+            # Chamado por várias conexões ao mesmo tempo (download segmentado): um
+            # snapshot atrasado, menor que o último visto, não conta de novo
+            with lock:
+                delta = downloaded - last.get(key, 0)
+                if delta > 0:
+                    last[key] = downloaded
+            self.consume(delta)
+        return hook
+
+    def close(self) -> None:
+        self.manager._unregister(self)
+
+    def __enter__(self) -> 'BandwidthStream':
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+
+class BandwidthManager:
+    """Limitador de banda global, compartilhado por todos os downloads do processo.
+
+    Cada download registra um `BandwidthStream`; o limite global é dividido
+    entre os streams ativos (que receberam dados no último segundo) na
+    proporção do peso da sua classe de prioridade, e cada stream é limitado
+    por um token bucket com a sua fatia. O limite pode ser alterado com
+    downloads em andamento e passa a valer no próximo bloco recebido.
+    """
+
+    ACTIVE_WINDOW = 1.0   # segundos sem dados para um stream deixar de contar
+    BURST = 0.25          # segundos de fatia acumuláveis
+    STATS_WINDOW = 2.0    # janela da taxa medida
+
+    def __init__(self, rate: Optional[float] = None, weights: Optional[Dict[str, float]] = None):
+        self.rate = rate
+        self.weights = dict(weights or config.BANDWIDTH_WEIGHTS)
+        self._lock = threading.Lock()
+        self._streams = set()
+        self._samples = collections.deque()
+
+    def set_rate(self, rate: Optional[float]) -> None:
+        """Altera o limite global (bytes/s; None = sem limite)"""
+        with self._lock:
+            self.rate = rate or None
+            # A taxa medida recomeça: amostras do limite anterior não confirmam o novo
+            self._samples.clear()
+
+    def register(self, name: str = '', priority: str = 'normal') -> BandwidthStream:
+        stream = BandwidthStream(self, name, priority)
+        with self._lock:
+            self._streams.add(stream)
+        return stream
+
+    def stats(self) -> Dict[str, Any]:
+        """Taxa configurada x taxa medida nos últimos segundos"""
+        now = time.monotonic()
+        with self._lock:
+            self._trim(now)
+            transferred = sum(n for _, n in self._samples)
+            span = min(max(now - self._samples[0][0], 1.0), self.STATS_WINDOW) if self._samples else self.STATS_WINDOW
+            active = [s for s in self._streams if now - s.last_used < self.ACTIVE_WINDOW]
+            by_class = collections.Counter(s.priority for s in active)
+            return {
+                'configured': self.rate,
+                'achieved': transferred / span,
+                'streams': len(self._streams),
+                'active_streams': len(active),
+                'active_by_class': dict(by_class),
+            }
+
+    def _unregister(self, stream: BandwidthStream) -> None:
+        with self._lock:
+            self._streams.discard(stream)
+
+    def _share(self, stream: BandwidthStream, now: float) -> float:
+        """Fatia do limite global para `stream` (com o lock adquirido)"""
+        total_weight = 0.0
+        for other in self._streams:
+            if other is stream or now - other.last_used < self.ACTIVE_WINDOW:
+                total_weight += self.weights.get(other.priority, 1.0)
+        weight = self.weights.get(stream.priority, 1.0)
+        return self.rate * weight / total_weight
+
+    def _consume(self, stream: BandwidthStream, nbytes: int) -> float:
+        """Debita `nbytes` do bucket do stream e retorna quanto esperar"""
+        with self._lock:
+            now = time.monotonic()
+            self._samples.append((now, nbytes))
+            self._trim(now)
+            stream.transferred += nbytes
+
+            if self.rate is None:
+                stream.last_used = now
+                stream.tokens = 0.0
+                stream.updated = now
+                return 0.0
+
+            share = self._share(stream, now)
+            stream.last_used = now
+            stream.tokens = min(stream.tokens + (now - stream.updated) * share, share * self.BURST)
+            stream.updated = now
+            stream.tokens -= nbytes
+            return -stream.tokens / share if stream.tokens < 0 else 0.0
+
+    def _trim(self, now: float) -> None:
+        while self._samples and now - self._samples[0][0] > self.STATS_WINDOW:
+            self._samples.popleft()
+
+
+# Instância compartilhada pelo processo
+manager = BandwidthManager(config.BANDWIDTH_LIMIT)
@@ -0,0 +1,179 @@
+# ytdowloader\src\batch.py
+
+import heapq
+import random
+import re
+import time
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+from dataclasses import dataclass
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Set, Tuple
+
+from . import config
+from .records import VideoRecord
+
+# Classes de falha por URL
+UNAVAILABLE = 'unavailable'    # removido, privado, inexistente, URL não suportada
+GEO = 'geo'                    # bloqueado na região
+RATE_LIMITED = 'rate-limited'  # HTTP 429 / verificação anti-bot
+NETWORK = 'network'            # conexão, DNS, TLS, HTTP 5xx
+TIMEOUT = 'timeout'            # passou do tempo limite por URL
+OTHER = 'other'
+
+# Vale a pena tentar de novo (com espera) nestas
+TRANSIENT_ERRORS = {RATE_LIMITED, NETWORK, TIMEOUT}
+
+GEO_RE = re.compile(r'geo.?restrict|available in your country|blocked it in your country|from your location')
+RATE_LIMIT_RE = re.compile(r"http error 429|too many requests|rate.?limit|confirm you.re not a bot")
+SERVER_ERROR_RE = re.compile(r'http error 5\d\d')
+UNAVAILABLE_RE = re.compile(r'video unavailable|is unavailable|not available|private video|has been removed'
+                            r'|does not exist|http error 40[34]|http error 410|unsupported url|members.only'
+                            r'|account associated with this video has been terminated')
+NETWORK_RE = re.compile(r'unable to download|timed out|connection|name resolution|getaddrinfo|ssl'
+                        r'|network is unreachable|incomplete ?read|remote end closed')
+NETWORK_ERRORS = {'URLError', 'TransportError', 'ConnectionError', 'ConnectionResetError', 'ConnectionRefusedError',
+                  'ConnectionAbortedError', 'RemoteDisconnected', 'IncompleteRead', 'SSLError', 'TimeoutError',
+                  'timeout', 'gaierror'}
+
+
+def classify_error(exc: BaseException) -> str:
+    """Classe de uma falha de extração, olhando a cadeia inteira de exceções
+
+    Atravessa os `Exception("Erro ...")` que embrulham o erro original e o
+    `exc_info` dos DownloadError do yt-dlp, e decide pelo tipo e pela mensagem.
+    """
+    chain: List[BaseException] = []
+    while exc is not None and all(exc is not seen for seen in chain):
+        chain.append(exc)
+        original = (getattr(exc, 'exc_info', None) or (None, None))[1]
+        exc = exc.__cause__ or exc.__context__ or (original if isinstance(original, BaseException) else None)
+    names = {type(e).__name__ for e in chain}
+    text = ' '.join(str(e) for e in chain).lower()
+    if 'GeoRestrictedError' in names or GEO_RE.search(text):
+        return GEO
+    if RATE_LIMIT_RE.search(text):
+        return RATE_LIMITED
+    if SERVER_ERROR_RE.search(text):
+        return NETWORK
+    if UNAVAILABLE_RE.search(text):
+        return UNAVAILABLE
+    if names & NETWORK_ERRORS or NETWORK_RE.search(text):
+        return NETWORK
+    return OTHER
+
+
+@dataclass(slots=True)
+class BatchResult:
+    """Resultado da extração de uma URL do lote"""
+    index: int  # posição da URL na lista de entrada
+    url: str
+    video: Optional[VideoRecord] = None
+    error: Optional[str] = None
+    error_kind: Optional[str] = None
+    attempts: int = 0
+    elapsed: float = 0.0  # segundos desde o início do lote
+
+    @property
+    def ok(self) -> bool:
+        return self.video is not None
+
+
+class BatchExtractor:
+    """Extrai os metadados de muitas URLs em paralelo, devolvendo cada uma assim que termina.
+
+    No máximo `max_workers` extrações rodam ao mesmo tempo. Uma falha não
+    interrompe o lote: vira um `BatchResult` com a classe do erro. Falhas
+    transitórias (rede, 429, tempo esgotado) são tentadas de novo até
+    `retries` vezes, com espera exponencial (com jitter) que começa em
+    `backoff` segundos. Uma extração que passa de `timeout` segundos é dada
+    como esgotada; a thread presa continua ocupando sua vaga até o yt-dlp
+    desistir, e o que ela obtiver ainda vai para o cache de metadados. A
+    nova tentativa depois de um tempo esgotado é uma extração nova
+    (`fresh=True`), e não uma espera pela que travou no single-flight.
+    """
+
+    def __init__(self, downloader, max_workers: int = config.BATCH_WORKERS,
+                 timeout: Optional[float] = config.BATCH_TIMEOUT, retries: int = config.BATCH_RETRIES,
+                 backoff: float = config.BATCH_BACKOFF, max_backoff: float = config.BATCH_MAX_BACKOFF):
+        self.downloader = downloader
+        self.max_workers = max_workers
+        self.timeout = timeout
+        self.retries = retries
+        self.backoff = backoff
+        self.max_backoff = max_backoff
+
+    def extract(self, urls: Iterable[str]) -> Iterator[BatchResult]:
+        """Gera um BatchResult por URL, na ordem em que terminam"""
+        urls = list(urls)
+        started = time.monotonic()
+        # (pronto_em, índice, tentativa, nova extração): URLs esperando vaga ou o fim do backoff
+        waiting: List[Tuple[float, int, int, bool]] = [(started, index, 1, False) for index in range(len(urls))]
+        running: Dict[Future, Tuple[int, int, float]] = {}  # future -> (índice, tentativa, prazo)
+        abandoned: Set[Future] = set()  # esgotadas que ainda ocupam uma thread
+        executor = ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix='batch')
+        try:
+            while waiting or running:
+                now = time.monotonic()
+                abandoned = {future for future in abandoned if not future.done()}
+                while waiting and waiting[0][0] <= now and len(running) + len(abandoned) < self.max_workers:
+                    _, index, attempt, fresh = heapq.heappop(waiting)
+                    if fresh:
+                        future = executor.submit(self.downloader.get_video_info, urls[index], fresh=True)
+                    else:
+                        future = executor.submit(self.downloader.get_video_info, urls[index])
+                    deadline = now + self.timeout if self.timeout else float('inf')
+                    running[future] = (index, attempt, deadline)
+
+                wake_at = [deadline for _, _, deadline in running.values()]
+                if waiting and len(running) + len(abandoned) < self.max_workers:
+                    wake_at.append(waiting[0][0])
+                timeout = max(min(wake_at) - now, 0) if wake_at else None
+                if abandoned and (timeout is None or timeout > 0.1):
+                    timeout = 0.1  # reaproveita logo a vaga de uma thread esgotada que se soltou
+                if running:
+                    done, _ = wait(list(running), timeout=timeout, return_when=FIRST_COMPLETED)
+                else:
+                    done = set()
+                    time.sleep(timeout)  # todas esperando o backoff (ou vagas presas)
+
+                now = time.monotonic()
+                for future, (index, attempt, deadline) in list(running.items()):
+                    if future in done:
+                        error = future.exception()
+                        kind = classify_error(error) if error is not None else None
+                    elif now >= deadline:
+                        abandoned.add(future)
+                        error, kind = TimeoutError(f"Tempo esgotado após {self.timeout:.0f}s"), TIMEOUT
+                    else:
+                        continue
+                    del running[future]
+                    if error is not None and kind in TRANSIENT_ERRORS and attempt <= self.retries:
+                        heapq.heappush(waiting, (now + self._delay(attempt, kind), index, attempt + 1,
+                                                 kind == TIMEOUT))
+                        continue
+                    yield BatchResult(index, urls[index], video=None if error else future.result(),
+                                      error=str(error) if error else None, error_kind=kind,
+                                      attempts=attempt, elapsed=now - started)
+        finally:
+            executor.shutdown(wait=False, cancel_futures=True)
+
+    def extract_all(self, urls: Iterable[str]) -> List[BatchResult]:
+        """Todos os resultados, na ordem das URLs"""
+        return sorted(self.extract(urls), key=lambda result: result.index)
+
+    def _delay(self, attempt: int, kind: str) -> float:
+        """Espera antes da tentativa seguinte: exponencial, com jitter; 429 espera o dobro"""
+        delay = self.backoff * 2 ** (attempt - 1) * (2 if kind == RATE_LIMITED else 1)
+        return min(delay, self.max_backoff) * random.uniform(0.5, 1.0)
+
+
+def summarize(results: Iterable[BatchResult]) -> Dict[str, Any]:
+    """Totais de um lote: sucessos, falhas por classe e tentativas extras"""
+    summary: Dict[str, Any] = {'total': 0, 'ok': 0, 'failed': {}, 'retries': 0}
+    for result in results:
+        summary['total'] += 1
+        summary['retries'] += result.attempts - 1
+        if result.ok:
+            summary['ok'] += 1
+        else:
+            summary['failed'][result.error_kind] = summary['failed'].get(result.error_kind, 0) + 1
+    return summary
@@ -0,0 +1,153 @@
+# ytdowloader\src\cache.py
+
+import json
+import os
+import sqlite3
+import threading
+import time
+import zlib
+from collections import OrderedDict
+from typing import Any, Dict, Optional
+
+from . import config
+
+
+class MetadataCache:
+    """Cache de metadados em duas camadas: LRU em memória na frente de um SQLite em disco.
+
+    As entradas são indexadas pela chave canônica do extrator ("Youtube:<id>"),
+    expiram após `ttl` segundos e o disco é limitado a `max_entries` entradas
+    (as menos acessadas são removidas primeiro). O limite é de número de
+    entradas, não de bytes: um info dict comprimido varia de poucos KB a
+    centenas de KB (playlists, vídeos com muitos formatos).
+
+    O horário de acesso no disco só é regravado quando está mais de
+    `ACCESS_RESOLUTION` segundos atrasado, para que uma leitura do disco não
+    vire uma escrita a cada acerto; a ordem de remoção é aproximada nessa
+    resolução.
+    """
+
+    ACCESS_RESOLUTION = 60.0  # segundos
+
+    def __init__(self, path: Optional[str] = None, ttl: float = config.METADATA_CACHE_TTL,
+                 max_entries: int = config.METADATA_CACHE_MAX_ENTRIES,
+                 memory_entries: int = config.METADATA_CACHE_MEMORY_ENTRIES):
+        self.path = path or config.METADATA_CACHE_PATH
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self.memory_entries = memory_entries
+
+        self._lock = threading.Lock()
+        self._memory: "OrderedDict[str, tuple]" = OrderedDict()
+
+        self.memory_hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+
+        if self.path != ':memory:':
+            os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+        self._conn = sqlite3.connect(self.path, check_same_thread=False)
+        self._conn.execute(
+            'CREATE TABLE IF NOT EXISTS metadata ('
+            ' key TEXT PRIMARY KEY,'
+            ' data BLOB NOT NULL,'
+            ' created_at REAL NOT NULL,'
+            ' accessed_at REAL NOT NULL)'
+        )
+        self._conn.execute('CREATE INDEX IF NOT EXISTS metadata_accessed ON metadata (accessed_at)')
+        self._conn.commit()
+
+    def get(self, key: str) -> Optional[Dict[str, Any]]:
+        """Retorna o info dict em cache ou None (o dict retornado não deve ser alterado)"""
+        now = time.time()
+        with self._lock:
+            entry = self._memory.get(key)
+            if entry is not None:
+                created_at, info = entry
+                if now - created_at < self.ttl:
+                    self._memory.move_to_end(key)
+                    self.memory_hits += 1
+                    return info
+                del self._memory[key]
+
+            row = self._conn.execute(
+                'SELECT data, created_at, accessed_at FROM metadata WHERE key = ?', (key,)
+            ).fetchone()
+            if row is None:
+                self.misses += 1
+                return None
+
+            data, created_at, accessed_at = row
+            if now - created_at >= self.ttl:
+                self._conn.execute('DELETE FROM metadata WHERE key = ?', (key,))
+                self._conn.commit()
+                self.misses += 1
+                return None
+
+            if now - accessed_at >= self.ACCESS_RESOLUTION:
+                self._conn.execute('UPDATE metadata SET accessed_at = ? WHERE key = ?', (now, key))
+                self._conn.commit()
+            info = json.loads(zlib.decompress(data))
+            self._remember(key, created_at, info)
+            self.disk_hits += 1
+            return info
+
+    def put(self, key: str, info: Dict[str, Any]) -> None:
+        """Armazena um info dict (já sanitizado, serializável em JSON)"""
+        now = time.time()
+        data = zlib.compress(json.dumps(info, separators=(',', ':')).encode('utf-8'))
+        with self._lock:
+            self._remember(key, now, info)
+            self._conn.execute(
+                'INSERT OR REPLACE INTO metadata (key, data, created_at, accessed_at) VALUES (?, ?, ?, ?)',
+                (key, data, now, now)
+            )
+            self._evict(now)
+            self._conn.commit()
+
+    def invalidate(self, key: str) -> None:
+        """Remove uma entrada das duas camadas"""
+        with self._lock:
+            self._memory.pop(key, None)
+            self._conn.execute('DELETE FROM metadata WHERE key = ?', (key,))
+            self._conn.commit()
+
+    def clear(self) -> None:
+        """Esvazia o cache"""
+        with self._lock:
+            self._memory.clear()
+            self._conn.execute('DELETE FROM metadata')
+            self._conn.commit()
+
+    def stats(self) -> Dict[str, Any]:
+        """Contadores de acertos/falhas"""
+        with self._lock:
+            hits = self.memory_hits + self.disk_hits
+            total = hits + self.misses
+            return {
+                'hits': hits,
+                'memory_hits': self.memory_hits,
+                'disk_hits': self.disk_hits,
+                'misses': self.misses,
+                'hit_rate': hits / total if total else 0.0,
+                'memory_entries': len(self._memory),
+            }
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
+
+    def _remember(self, key: str, created_at: float, info: Dict[str, Any]) -> None:
+        self._memory[key] = (created_at, info)
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.memory_entries:
+            self._memory.popitem(last=False)
+
+    def _evict(self, now: float) -> None:
+        # Expiradas primeiro, depois as menos acessadas além do limite
+        self._conn.execute('DELETE FROM metadata WHERE created_at <= ?', (now - self.ttl,))
+        self._conn.execute(
+            'DELETE FROM metadata WHERE key IN ('
+            ' SELECT key FROM metadata ORDER BY accessed_at DESC LIMIT -1 OFFSET ?)',
+            (self.max_entries,)
+        )
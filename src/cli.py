@@ -0,0 +1,332 @@
+# ytdowloader\src\cli.py
+#
+# Modo headless: não importa tkinter, PIL nem requests.
+
+import argparse
+import json
+import os
+import queue
+import sys
+import threading
+import time
+from typing import Dict, List, Optional
+
+from .downloader import YouTubeDownloader
+from .download_queue import DownloadQueue, JobState, PlaylistFeeder
+from .bandwidth import parse_rate
+from .postprocess import PostProcessStage
+from .metrics import InstrumentedDownloader, Metrics
+from .journal import JobJournal
+from .batch import BatchExtractor, summarize
+from . import config
+from . import log_sink
+
+
+def read_urls(args: argparse.Namespace) -> List[str]:
+    """Junta as URLs da linha de comando e dos arquivos de lista"""
+    urls = list(args.urls)
+    for path in args.batch_file or []:
+        stream = sys.stdin if path == '-' else open(path, encoding='utf-8')
+        with stream:
+            for line in stream:
+                line = line.strip()
+                if line and not line.startswith(('#', ';')):
+                    urls.append(line)
+    return urls
+
+
+def build_options(args: argparse.Namespace) -> Dict:
+    """Converte os argumentos para as opções de YouTubeDownloader.download_video"""
+    options = {
+        'download_type': 'audio' if args.audio else 'video',
+        'output_template': os.path.join(args.output, config.OUTPUT_TEMPLATE),
+        'quiet': True,
+        'use_archive': not args.no_archive,
+        'hash_files': args.hash,
+    }
+    if args.audio:
+        options['audio_format'] = args.audio_format
+        options['audio_quality'] = args.audio_quality
+    else:
+        options['video_quality'] = args.quality
+        options['segments'] = args.segments
+        if args.adaptive or args.deadline or args.max_size:
+            options['adaptive'] = True
+            options['probe'] = args.probe
+            if args.deadline:
+                options['deadline'] = args.deadline
+            if args.max_size:
+                options['size_budget'] = parse_rate(args.max_size)  # "500M" -> bytes, como nas taxas
+    return options
+
+
+class JsonLinesReporter:
+    """Escreve um objeto JSON por linha para cada evento da fila"""
+
+    def __init__(self, stream=None, progress_interval: float = 0.5):
+        self.stream = stream or sys.stdout
+        self.progress_interval = progress_interval
+        self._last_progress: Dict[int, float] = {}
+
+    def emit(self, record: Dict) -> None:
+        record.setdefault('ts', round(time.time(), 3))
+        self.stream.write(json.dumps(record, ensure_ascii=False) + '\n')
+        self.stream.flush()
+
+    def on_event(self, event) -> None:
+        if event.kind == 'progress':
+            now = time.monotonic()
+            if now - self._last_progress.get(event.job_id, 0) < self.progress_interval:
+                return
+            self._last_progress[event.job_id] = now
+        record = {'event': event.kind, 'job': event.job_id, 'state': event.state.value}
+        record.update({k: v for k, v in event.data.items() if v is not None})
+        self.emit(record)
+
+
+def import_archive(path: str, compute_hash: bool, reporter: 'JsonLinesReporter') -> int:
+    """Importa downloads existentes para o arquivo de downloads"""
+    archive = YouTubeDownloader().archive
+    try:
+        if os.path.isdir(path):
+            result = archive.import_directory(path, compute_hash=compute_hash)
+        else:
+            result = {'imported': archive.import_ytdlp_archive(path), 'unmatched': 0}
+    except OSError as e:
+        reporter.emit({'event': 'error', 'error': f"Erro ao importar: {e}"})
+        return 2
+    reporter.emit({'event': 'archive_import', 'path': path, 'total': len(archive), **result})
+    return 0
+
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(
+        prog='ytdownloader',
+        description='Baixa vídeos/áudios sem interface gráfica, com progresso em JSON lines.')
+    parser.add_argument('urls', nargs='*', help='URLs a baixar')
+    parser.add_argument('-a', '--batch-file', action='append', metavar='ARQUIVO',
+                        help="arquivo com uma URL por linha ('-' para stdin)")
+    parser.add_argument('-o', '--output', default=os.path.join(os.getcwd(), 'downloads'),
+                        help='pasta de destino')
+    parser.add_argument('-q', '--quality', default='best',
+                        help="format_id do vídeo ou 'best' (padrão)")
+    parser.add_argument('-x', '--audio', action='store_true', help='baixar apenas o áudio')
+    parser.add_argument('--audio-format', default='mp3', choices=['mp3', 'm4a', 'opus', 'wav', 'ogg'])
+    parser.add_argument('--audio-quality', default='192', help='bitrate em kbps')
+    parser.add_argument('--segments', type=int, default=config.SEGMENTED_CONNECTIONS,
+                        help='conexões por arquivo progressivo grande (1 desativa)')
+    parser.add_argument('--adaptive', action='store_true',
+                        help='ajustar fragmentos/conexões simultâneos pela vazão medida')
+    parser.add_argument('--probe', action='store_true',
+                        help='no modo adaptativo, sondar a vazão antes de cada download')
+    parser.add_argument('--deadline', type=float, metavar='SEGUNDOS',
+                        help='maior qualidade que termina dentro do prazo (ativa o modo adaptativo)')
+    parser.add_argument('--max-size', metavar='TAMANHO',
+                        help='maior qualidade que cabe no tamanho, ex.: 500M (ativa o modo adaptativo)')
+    parser.add_argument('-r', '--limit-rate', metavar='TAXA',
+                        help='limite de banda global, ex.: 500K, 2M')
+    parser.add_argument('-w', '--workers', type=int, default=config.MAX_CONCURRENT_DOWNLOADS,
+                        help='downloads simultâneos')
+    parser.add_argument('--per-host', type=int, default=config.MAX_DOWNLOADS_PER_HOST,
+                        help='downloads simultâneos por host')
+    parser.add_argument('-p', '--playlist', action='store_true',
+                        help='expandir playlists/canais e baixar conforme as entradas chegam')
+    parser.add_argument('--lookahead', type=int, default=config.PLAYLIST_LOOKAHEAD,
+                        help='entradas de playlist enfileiradas à frente dos downloads')
+    parser.add_argument('--no-archive', action='store_true',
+                        help='baixar mesmo o que já consta no arquivo de downloads')
+    parser.add_argument('--hash', action='store_true',
+                        help='registrar o SHA-256 dos arquivos baixados')
+    parser.add_argument('--check', action='store_true',
+                        help='só extrair os metadados das URLs, em paralelo, e informar as que falharem')
+    parser.add_argument('--check-workers', type=int, default=config.BATCH_WORKERS,
+                        help='extrações simultâneas no --check')
+    parser.add_argument('--import-archive', metavar='CAMINHO',
+                        help='importar uma pasta de downloads ou um --download-archive do yt-dlp e sair')
+    parser.add_argument('--progress-interval', type=float, default=0.5,
+                        help='intervalo mínimo (s) entre eventos de progresso por job')
+    parser.add_argument('--journal', metavar='ARQUIVO',
+                        help='diário de jobs: retoma os downloads interrompidos registrados nele')
+    parser.add_argument('--daemon', action='store_true',
+                        help='manter o processo aberto servindo uma API HTTP local para enviar jobs')
+    parser.add_argument('--host', default=config.DAEMON_HOST, help='endereço da API do daemon')
+    parser.add_argument('--port', type=int, default=config.DAEMON_PORT, help='porta da API do daemon')
+    parser.add_argument('--token', default=config.DAEMON_TOKEN,
+                        help='token exigido em "Authorization: Bearer" (padrão: $YTD_DAEMON_TOKEN)')
+    parser.add_argument('--metrics-json', metavar='ARQUIVO', default=config.METRICS_JSON_PATH,
+                        help='snapshot JSON das métricas (gravado periodicamente e no fim)')
+    parser.add_argument('--metrics-textfile', metavar='ARQUIVO', default=config.METRICS_TEXTFILE_PATH,
+                        help='arquivo .prom para o textfile collector do node_exporter')
+    return parser
+
+
+def check_urls(urls: List[str], workers: int, reporter: 'JsonLinesReporter') -> int:
+    """Extrai os metadados de todas as URLs sem baixar; um evento 'info' por URL, assim que termina"""
+    downloader = YouTubeDownloader()
+    results = []
+    started = time.monotonic()
+    try:
+        for result in BatchExtractor(downloader, max_workers=workers).extract(urls):
+            results.append(result)
+            record = {'event': 'info', 'index': result.index, 'url': result.url, 'attempts': result.attempts}
+            if result.ok:
+                video = result.video
+                record.update(key=video.key, title=video.title, duration=video.duration, uploader=video.uploader)
+            else:
+                record.update(error=result.error, error_kind=result.error_kind)
+            reporter.emit(record)
+    except KeyboardInterrupt:
+        reporter.emit({'event': 'interrupted'})
+        return 130
+    summary = summarize(results)
+    reporter.emit({'event': 'summary', **summary, 'seconds': round(time.monotonic() - started, 2),
+                   'cache': downloader.cache.stats()})
+    return 1 if summary['ok'] < summary['total'] else 0
+
+
+def run_daemon(args, downloader, download_queue, postprocess_stage, options, metrics,
+               reporter, urls, stop_export, journal) -> int:
+    """Modo daemon: API HTTP local até Ctrl+C, com o yt-dlp e as sessões aquecidos"""
+    from .daemon import DaemonServer  # http.server só neste modo
+
+    try:
+        server = DaemonServer(download_queue, options, args.host, args.port, args.token, metrics)
+    except OSError as e:
+        reporter.emit({'event': 'error', 'error': f"Erro ao abrir a API em {args.host}:{args.port}: {e}"})
+        return 2
+    def warm_up():
+        try:
+            downloader.warm_up()
+        except Exception as e:
+            log_sink.logger.warning(f"Falha ao pré-carregar o yt-dlp: {e}")
+
+    threading.Thread(target=warm_up, name='warm-up', daemon=True).start()
+    for url in urls:
+        download_queue.submit(url, dict(options))
+    reporter.emit({'event': 'daemon', 'address': server.address, 'auth': bool(args.token)})
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.shutdown()
+        download_queue.shutdown(wait=False)
+        postprocess_stage.shutdown(wait=False)
+        stop_export.set()
+        metrics.export(args.metrics_json, args.metrics_textfile)
+        if journal is not None:
+            journal.close()
+    reporter.emit({'event': 'summary', 'jobs': download_queue.counts(), 'cache': downloader.cache.stats()})
+    return 0
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    args = build_parser().parse_args(argv)
+    reporter = JsonLinesReporter(progress_interval=args.progress_interval)
+    # stdout é dos eventos JSON; mensagens do yt-dlp vão para o arquivo de log
+    log_sink.setup()
+
+    if args.import_archive:
+        return import_archive(args.import_archive, args.hash, reporter)
+
+    try:
+        urls = read_urls(args)
+    except OSError as e:
+        reporter.emit({'event': 'error', 'error': f"Erro ao ler lista de URLs: {e}"})
+        return 2
+    if args.check:
+        if not urls:
+            reporter.emit({'event': 'error', 'error': 'Nenhuma URL informada'})
+            return 2
+        return check_urls(urls, args.check_workers, reporter)
+    try:
+        journal = JobJournal(args.journal) if args.journal else None
+    except OSError as e:
+        reporter.emit({'event': 'error', 'error': f"Erro ao abrir o diário de jobs: {e}"})
+        return 2
+    if not urls and not args.daemon and not (journal and journal.pending):
+        reporter.emit({'event': 'error', 'error': 'Nenhuma URL informada'})
+        return 2
+
+    try:
+        options = build_options(args)
+    except ValueError:
+        reporter.emit({'event': 'error', 'error': f"Tamanho inválido: {args.max_size}"})
+        return 2
+    metrics = Metrics()
+    downloader = InstrumentedDownloader(YouTubeDownloader(), metrics)
+    try:
+        downloader.bandwidth.set_rate(parse_rate(args.limit_rate))
+    except ValueError:
+        reporter.emit({'event': 'error', 'error': f"Limite de banda inválido: {args.limit_rate}"})
+        return 2
+    postprocess_stage = PostProcessStage()
+    download_queue = DownloadQueue(downloader, max_workers=args.workers, per_host_limit=args.per_host,
+                                   postprocess_stage=postprocess_stage, journal=journal)
+    events = download_queue.subscribe()
+    metrics_watcher = metrics.watch(download_queue)
+    stop_export = metrics.start_exporter(args.metrics_json, args.metrics_textfile)
+
+    resumed = download_queue.resume_journal()
+    if resumed:
+        reporter.emit({'event': 'resumed', 'jobs': [job.job_id for job in resumed]})
+
+    if args.daemon:
+        download_queue.unsubscribe(events)  # a API tem os próprios assinantes
+        return run_daemon(args, downloader, download_queue, postprocess_stage, options, metrics,
+                          reporter, urls, stop_export, journal)
+
+    feeders = []
+    for url in urls:
+        if args.playlist:
+            feeders.append(PlaylistFeeder(download_queue, downloader.iter_playlist_entries(url),
+                                          options, lookahead=args.lookahead))
+        else:
+            download_queue.submit(url, dict(options))
+
+    submitted = finished = failed = 0
+    try:
+        while True:
+            try:
+                event = events.get(timeout=0.5)
+            except queue.Empty:
+                event = None
+            if event is not None:
+                reporter.on_event(event)
+                if event.kind == 'state' and event.state == JobState.QUEUED:
+                    submitted += 1
+                elif event.kind == 'state' and event.state.finished:
+                    finished += 1
+                    if event.state != JobState.DONE:
+                        failed += 1
+            # Terminou quando as playlists foram enumeradas e todos os jobs acabaram
+            if all(f.done.is_set() for f in feeders) and events.empty() and finished == submitted:
+                break
+    except KeyboardInterrupt:
+        for feeder in feeders:
+            feeder.stop()
+        download_queue.shutdown(wait=False)
+        postprocess_stage.shutdown(wait=False)
+        stop_export.set()
+        reporter.emit({'event': 'interrupted'})
+        return 130
+
+    for feeder in feeders:
+        if feeder.error:
+            failed += 1
+            reporter.emit({'event': 'error', 'error': feeder.error})
+
+    download_queue.shutdown()
+    postprocess_stage.shutdown()
+    metrics_watcher.join(timeout=5)
+    stop_export.set()
+    metrics.export(args.metrics_json, args.metrics_textfile)
+    if journal is not None:
+        journal.close()
+    reporter.emit({'event': 'summary', 'total': submitted, 'failed': failed,
+                   'cache': downloader.cache.stats(), 'bandwidth': downloader.bandwidth.stats()})
+    return 1 if failed else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -1,6 +1,93 @@
 # ytdownloader\src\config.py
+import os
+
 DEFAULT_YD_OPTS = {
     'format_sort': ['res:2160', 'res:1440', 'res:1080', 'res:720', 'res:480', 'res:360'],
     'allow_multiple_video_streams': True,
     'allow_multiple_audio_streams': True,
-}
\ No newline at end of file
+}
+
+# Diretório de dados da aplicação (caches, índices, etc.)
+APP_DATA_DIR = os.environ.get('YTD_DATA_DIR', os.path.join(os.path.expanduser('~'), '.ytdownloader'))
+
+# Cache de metadados (get_video_info)
+METADATA_CACHE_PATH = os.path.join(APP_DATA_DIR, 'metadata.sqlite3')
+METADATA_CACHE_TTL = 3600  # segundos
+METADATA_CACHE_MAX_ENTRIES = 2000
+METADATA_CACHE_MEMORY_ENTRIES = 64
+
+# Arquivo (índice) de downloads concluídos
+ARCHIVE_PATH = os.path.join(APP_DATA_DIR, 'archive.sqlite3')
+# Nome dos arquivos baixados; o "[id]" permite reimportar a pasta no arquivo de downloads
+OUTPUT_TEMPLATE = '%(title)s [%(id)s].%(ext)s'
+
+# Fila de downloads
+MAX_CONCURRENT_DOWNLOADS = 3
+MAX_DOWNLOADS_PER_HOST = 2
+PLAYLIST_LOOKAHEAD = 4  # entradas de playlist enfileiradas à frente dos downloads
+PROGRESS_FPS = 10  # eventos de progresso por job por segundo (no máximo)
+
+# Diário de jobs (retomada após queda)
+JOURNAL_PATH = os.path.join(APP_DATA_DIR, 'jobs.journal.jsonl')
+JOURNAL_COMPACT_RECORDS = 10000  # registros acrescentados antes de reescrever o diário
+
+# Prefetch de metadados ao colar/digitar URLs na GUI
+PREFETCH_WORKERS = 2  # extrações especulativas simultâneas (no máximo)
+PREFETCH_MAX_URLS = 20  # URLs agendadas por colagem
+PREFETCH_DELAY_MS = 400  # espera após a última edição antes de agendar
+
+# Thumbnails
+THUMBNAIL_CACHE_DIR = os.path.join(APP_DATA_DIR, 'thumbnails')
+THUMBNAIL_SIZE = (160, 120)
+THUMBNAIL_MEMORY_ENTRIES = 128
+
+# Download segmentado (arquivos progressivos grandes)
+SEGMENTED_CONNECTIONS = 4
+SEGMENT_SIZE = 8 * 1024 * 1024
+SEGMENTED_MIN_SIZE = 32 * 1024 * 1024  # abaixo disso, uma conexão só
+
+# Modo adaptativo: fragmentos/faixas simultâneos ajustados pela vazão medida
+ADAPTIVE_MEASURE_SECONDS = 5  # vazão medida nos primeiros segundos de cada job
+ADAPTIVE_MAX_CONCURRENCY = 16
+ADAPTIVE_MIN_GAIN = 0.1  # melhora mínima (10%) para continuar aumentando
+ADAPTIVE_PROBE_CHUNK = 512 * 1024  # bytes por conexão na sondagem antes do job
+ADAPTIVE_PROBE_TIMEOUT = 10
+
+# Limite de banda global (bytes/s; None = sem limite) e pesos por classe de prioridade
+BANDWIDTH_LIMIT = None
+BANDWIDTH_WEIGHTS = {'high': 4.0, 'normal': 2.0, 'low': 1.0}
+
+# Pós-processamento (conversão de áudio) fora das threads de download
+POSTPROCESS_WORKERS = os.cpu_count() or 2
+POSTPROCESS_MAX_PENDING = 2 * POSTPROCESS_WORKERS  # arquivos brutos aguardando/em conversão antes de pausar os downloads
+
+# Log da aplicação: buffer em memória exibido na GUI e arquivo JSON rotativo
+LOG_PATH = os.path.join(APP_DATA_DIR, 'logs', 'ytdownloader.log')
+LOG_MAX_BYTES = 5 * 1024 * 1024
+LOG_BACKUP_COUNT = 3
+LOG_BUFFER_LINES = 1000  # mensagens mantidas em memória
+LOG_WIDGET_LINES = 1000  # linhas mantidas no widget de log
+LOG_FLUSH_INTERVAL_MS = 250
+
+# Métricas: snapshot JSON e arquivo texto do Prometheus (textfile collector do node_exporter)
+METRICS_JSON_PATH = os.path.join(APP_DATA_DIR, 'metrics.json')
+METRICS_TEXTFILE_PATH = os.environ.get('YTD_METRICS_TEXTFILE')  # ex.: /var/lib/node_exporter/ytdownloader.prom
+METRICS_EXPORT_INTERVAL = 15  # segundos
+
+# Extração de metadados em lote (src/batch.py, --check na linha de comando)
+BATCH_WORKERS = 4  # extrações simultâneas
+BATCH_TIMEOUT = 60  # segundos por URL (por tentativa)
+BATCH_RETRIES = 2  # novas tentativas em falhas transitórias (rede, 429, tempo esgotado)
+BATCH_BACKOFF = 2.0  # espera antes da primeira nova tentativa (dobra a cada uma)
+BATCH_MAX_BACKOFF = 60.0
+
+# Sessões do yt-dlp mantidas abertas entre extrações
+SESSION_POOL_SIZE = 4
+SESSION_MAX_AGE = 30 * 60  # segundos
+
+# Modo daemon (API HTTP local)
+DAEMON_HOST = '127.0.0.1'
+DAEMON_PORT = 8765
+DAEMON_TOKEN = os.environ.get('YTD_DAEMON_TOKEN')  # se definido, exigido em "Authorization: Bearer ..."
+DAEMON_KEEP_FINISHED = 1000  # jobs finalizados mantidos para consulta
+SSE_KEEPALIVE = 15  # segundos entre comentários de keep-alive nos streams de eventos
@@ -0,0 +1,260 @@
+# ytdowloader\src\daemon.py
+
+import hmac
+import json
+import queue
+import re
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Dict, Optional
+from urllib.parse import parse_qs, urlsplit
+
+from . import config
+from .download_queue import DownloadJob, DownloadQueue
+from .log_sink import logger
+
+# Opções de download que um cliente da API pode definir por job
+CLIENT_OPTIONS = {'download_type', 'video_quality', 'audio_format', 'audio_quality', 'format',
+                  'segments', 'use_archive', 'hash_files', 'adaptive', 'probe', 'deadline', 'size_budget'}
+
+JOB_PATH_RE = re.compile(r'^/jobs/(\d+)(/events)?$')
+
+
+def job_to_dict(job: DownloadJob) -> Dict[str, Any]:
+    return {
+        'id': job.job_id,
+        'url': job.url,
+        'state': job.state.value,
+        'priority': job.priority,
+        'requests': job.requests,
+        'progress': round(job.progress, 2),
+        'error': job.error,
+        'abort': job.abort.value if job.abort else None,  # pausa/cancelamento pendente
+        'options': job.options,
+        'stats': job.stats,
+        'created_at': job.created_at,
+        'finished_at': job.finished_at,
+    }
+
+
+def event_to_dict(event) -> Dict[str, Any]:
+    return {'job': event.job_id, 'kind': event.kind, 'state': event.state.value,
+            'ts': event.ts, **event.data}
+
+
+class ApiError(Exception):
+    def __init__(self, status: int, message: str):
+        super().__init__(message)
+        self.status = status
+
+
+class DaemonServer:
+    """API HTTP local sobre uma DownloadQueue, para enviar jobs sem abrir um processo por download.
+
+    O processo mantém o YouTubeDownloader, o cache e as sessões do yt-dlp
+    aquecidos entre os jobs. Rotas:
+
+    - `POST /jobs` `{"url": ..., "options": {...}, "priority": 0}` -> job criado
+    - `GET /jobs[?state=...]`, `GET /jobs/<id>`, `DELETE /jobs/<id>` (cancela; 202 se
+      o job estiver em andamento)
+    - `GET /events` e `GET /jobs/<id>/events`: eventos em server-sent events
+    - `GET /health`, `GET /metrics` (formato Prometheus, se houver métricas)
+
+    Com `token`, toda requisição precisa de `Authorization: Bearer <token>`.
+    """
+
+    def __init__(self, download_queue: DownloadQueue, default_options: Dict[str, Any],
+                 host: str = config.DAEMON_HOST, port: int = config.DAEMON_PORT,
+                 token: Optional[str] = config.DAEMON_TOKEN, metrics=None):
+        self.download_queue = download_queue
+        self.default_options = default_options
+        self.token = token
+        self.metrics = metrics
+        self.started_at = time.time()
+        self._server = ThreadingHTTPServer((host, port), self._handler_class())
+        self._server.daemon_threads = True
+        self._stopping = False
+
+    @property
+    def address(self) -> str:
+        host, port = self._server.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def serve_forever(self) -> None:
+        logger.info(f"API do daemon em {self.address}")
+        self._server.serve_forever()
+
+    def shutdown(self) -> None:
+        self._stopping = True
+        self._server.shutdown()
+        self._server.server_close()
+
+    # Operações da API (independentes do HTTP)
+
+    def submit(self, body: Dict[str, Any]) -> DownloadJob:
+        url = body.get('url')
+        if not isinstance(url, str) or not url.startswith(('http://', 'https://')):
+            raise ApiError(400, "Campo 'url' ausente ou inválido")
+        options = body.get('options') or {}
+        if not isinstance(options, dict):
+            raise ApiError(400, "Campo 'options' deve ser um objeto")
+        unknown = set(options) - CLIENT_OPTIONS
+        if unknown:
+            raise ApiError(400, f"Opções não permitidas: {', '.join(sorted(unknown))}")
+        try:
+            priority = int(body.get('priority', 0))
+        except (TypeError, ValueError):
+            raise ApiError(400, "Campo 'priority' deve ser inteiro")
+        job = self.download_queue.submit(url, dict(self.default_options, **options), priority)
+        # Processo de longa duração: não acumular jobs finalizados indefinidamente
+        self.download_queue.prune(config.DAEMON_KEEP_FINISHED)
+        return job
+
+    def get_job(self, job_id: int) -> DownloadJob:
+        job = self.download_queue.get(job_id)
+        if job is None:
+            raise ApiError(404, f"Job {job_id} não encontrado")
+        return job
+
+    def list_jobs(self, state: Optional[str] = None):
+        jobs = self.download_queue.jobs()
+        if state:
+            jobs = [job for job in jobs if job.state.value == state]
+        return jobs
+
+    def health(self) -> Dict[str, Any]:
+        return {'status': 'ok', 'uptime': time.time() - self.started_at,
+                'jobs': self.download_queue.counts()}
+
+    def _handler_class(self):
+        daemon = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = 'HTTP/1.1'
+            server_version = 'ytdownloader'
+
+            def log_message(self, format, *args):
+                logger.debug(f"{self.address_string()} {format % args}")
+
+            def do_GET(self):
+                self._dispatch('GET')
+
+            def do_POST(self):
+                self._dispatch('POST')
+
+            def do_DELETE(self):
+                self._dispatch('DELETE')
+
+            def _dispatch(self, method):
+                parts = urlsplit(self.path)
+                path = parts.path.rstrip('/') or '/'
+                try:
+                    self._authorize()
+                    if path == '/jobs' and method == 'POST':
+                        job = daemon.submit(self._read_json())
+                        self._send_json(201, job_to_dict(job))
+                    elif path == '/jobs' and method == 'GET':
+                        state = parse_qs(parts.query).get('state', [None])[0]
+                        self._send_json(200, [job_to_dict(job) for job in daemon.list_jobs(state)])
+                    elif path == '/events' and method == 'GET':
+                        self._stream_events(None)
+                    elif path == '/health' and method == 'GET':
+                        self._send_json(200, daemon.health())
+                    elif path == '/metrics' and method == 'GET' and daemon.metrics is not None:
+                        self._send_text(200, daemon.metrics.prometheus_text(), 'text/plain; version=0.0.4')
+                    else:
+                        match = JOB_PATH_RE.match(path)
+                        if not match:
+                            raise ApiError(404, 'Rota não encontrada')
+                        job = daemon.get_job(int(match.group(1)))
+                        if match.group(2) and method == 'GET':
+                            self._stream_events(job.job_id)
+                        elif method == 'GET':
+                            self._send_json(200, job_to_dict(job))
+                        elif method == 'DELETE':
+                            if not daemon.download_queue.cancel(job.job_id):
+                                raise ApiError(409, f"Job {job.job_id} não pode ser cancelado ({job.state.value})")
+                            # Em andamento: o cancelamento é concluído no próximo progresso (evento 'cancelled')
+                            self._send_json(200 if job.state.finished else 202, job_to_dict(job))
+                        else:
+                            raise ApiError(405, 'Método não permitido')
+                except ApiError as e:
+                    # O corpo da requisição pode não ter sido lido: não reaproveitar a conexão
+                    self.close_connection = True
+                    self._send_json(e.status, {'error': str(e)})
+                except (BrokenPipeError, ConnectionResetError):
+                    pass
+                except Exception as e:
+                    logger.error(f"Erro na API: {e}")
+                    self._send_json(500, {'error': str(e)})
+
+            def _authorize(self):
+                if not daemon.token:
+                    return
+                header = self.headers.get('Authorization', '')
+                if not hmac.compare_digest(header, f"Bearer {daemon.token}"):
+                    raise ApiError(401, 'Token inválido ou ausente')
+
+            def _read_json(self):
+                length = int(self.headers.get('Content-Length') or 0)
+                if length > 1024 * 1024:
+                    raise ApiError(413, 'Corpo grande demais')
+                try:
+                    body = json.loads(self.rfile.read(length) or b'{}')
+                except ValueError:
+                    raise ApiError(400, 'JSON inválido')
+                if not isinstance(body, dict):
+                    raise ApiError(400, 'O corpo deve ser um objeto JSON')
+                return body
+
+            def _send_json(self, status, data):
+                self._send_text(status, json.dumps(data, ensure_ascii=False, default=str),
+                                'application/json; charset=utf-8')
+
+            def _send_text(self, status, text, content_type):
+                body = text.encode('utf-8')
+                self.send_response(status)
+                self.send_header('Content-Type', content_type)
+                self.send_header('Content-Length', str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def _stream_events(self, job_id):
+                """Server-sent events; com `job_id`, só os eventos dele, até ele terminar"""
+                events = daemon.download_queue.subscribe()
+                try:
+                    self.send_response(200)
+                    self.send_header('Content-Type', 'text/event-stream')
+                    self.send_header('Cache-Control', 'no-cache')
+                    self.send_header('Connection', 'close')
+                    self.end_headers()
+                    self.close_connection = True
+                    if job_id is not None:
+                        # Estado atual primeiro: o job pode já ter terminado
+                        job = daemon.get_job(job_id)
+                        self._write_event('state', {'job': job.job_id, 'kind': 'state',
+                                                    'state': job.state.value, 'ts': time.time()})
+                        if job.state.finished:
+                            return
+                    while not daemon._stopping:
+                        try:
+                            event = events.get(timeout=config.SSE_KEEPALIVE)
+                        except queue.Empty:
+                            self.wfile.write(b': keep-alive\n\n')
+                            self.wfile.flush()
+                            continue
+                        if job_id is not None and event.job_id != job_id:
+                            continue
+                        self._write_event(event.kind, event_to_dict(event))
+                        if job_id is not None and event.kind == 'state' and event.state.finished:
+                            return
+                finally:
+                    daemon.download_queue.unsubscribe(events)
+
+            def _write_event(self, kind, data):
+                self.wfile.write(f"event: {kind}\ndata: {json.dumps(data, ensure_ascii=False, default=str)}\n\n"
+                                 .encode('utf-8'))
+                self.wfile.flush()
+
+        return Handler
+
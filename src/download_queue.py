@@ -0,0 +1,600 @@
+# ytdowloader\src\download_queue.py
+
+import heapq
+import itertools
+import json
+import queue
+import threading
+import time
+import uuid
+from dataclasses import dataclass, field
+from enum import Enum
+from typing import Any, Callable, Dict, Iterable, List, Optional
+from urllib.parse import urlsplit
+
+from . import config
+from .journal import resume_options
+from .postprocess import TRANSCODE
+from .progress import ProgressAggregator
+from .urls import url_key
+
+
+class JobState(str, Enum):
+    QUEUED = 'queued'
+    PAUSED = 'paused'
+    EXTRACTING = 'extracting'
+    DOWNLOADING = 'downloading'
+    POSTPROCESSING = 'post-processing'
+    DONE = 'done'
+    FAILED = 'failed'
+    CANCELLED = 'cancelled'
+
+    @property
+    def finished(self) -> bool:
+        return self in (JobState.DONE, JobState.FAILED, JobState.CANCELLED)
+
+
+@dataclass(slots=True)
+class DownloadJob:
+    job_id: int
+    url: str
+    options: Dict[str, Any]
+    priority: int = 0
+    host: str = ''
+    state: JobState = JobState.QUEUED
+    progress: float = 0.0
+    error: Optional[str] = None
+    stats: Dict[str, Any] = field(default_factory=dict)
+    created_at: float = field(default_factory=time.time)
+    finished_at: Optional[float] = None
+    journal_id: Optional[str] = None
+    requests: int = 1  # pedidos iguais atendidos por este job
+    abort: Optional[JobState] = None  # CANCELLED/PAUSED pedido para um job em andamento
+    dedup_key: Optional[tuple] = field(default=None, repr=False)
+    on_finished: Optional[Callable[['DownloadJob'], None]] = field(default=None, repr=False)
+
+
+class JobAborted(Exception):
+    """Levantada pelo progress hook para interromper um job em andamento (o yt-dlp aborta o download)"""
+
+
+@dataclass(slots=True)
+class JobEvent:
+    """Evento publicado para os assinantes da fila"""
+    job_id: int
+    kind: str  # 'state' ou 'progress'
+    state: JobState
+    data: Dict[str, Any] = field(default_factory=dict)
+    ts: float = field(default_factory=time.time)
+
+
+def host_of(url: str) -> str:
+    """Host normalizado usado nos limites por host"""
+    host = (urlsplit(url).hostname or '').lower()
+    for prefix in ('www.', 'm.', 'music.'):
+        if host.startswith(prefix):
+            host = host[len(prefix):]
+    if host == 'youtu.be':
+        host = 'youtube.com'
+    return host
+
+
+def dedup_key(url: str, options: Dict[str, Any]) -> tuple:
+    """Mesmo vídeo (em qualquer forma de URL) com as mesmas opções -> mesma chave"""
+    return url_key(url), json.dumps(options, sort_keys=True, default=str)
+
+
+def _chained(first: Callable, second: Callable) -> Callable:
+    def callback(job):
+        try:
+            first(job)
+        finally:
+            second(job)
+    return callback
+
+
+def expected_streams(options: Dict[str, Any]) -> int:
+    """Quantos arquivos o download vai baixar antes da mesclagem ("137+140" -> 2)"""
+    if options.get('download_type', 'video') != 'video':
+        return 1
+    return str(options.get('format') or options.get('video_quality') or 'best').split('/')[0].count('+') + 1
+
+
+class DownloadQueue:
+    """Fila de downloads com pool de workers limitado, prioridades e limite por host.
+
+    Prioridades maiores saem primeiro; empates seguem a ordem de chegada.
+    Com um `postprocess_stage`, a conversão de áudio é entregue a ele e o
+    worker volta a baixar enquanto o job fica em 'post-processing'.
+    Os eventos de cada job são entregues em filas thread-safe obtidas via
+    `subscribe()`, que a GUI consome com `root.after`. O progresso não é
+    repassado a cada callback do yt-dlp: um `ProgressAggregator` junta as
+    atualizações e uma única thread publica no máximo um evento 'progress'
+    por job a cada quadro (`progress_fps`). Com um `journal`, envios, estados
+    e arquivos em download são registrados nele e `resume_journal()`
+    reenfileira o que ficou pendente numa execução anterior. Um envio igual a
+    um job ainda não finalizado (mesmo vídeo, mesmas opções) não cria outro
+    download: retorna o job existente, que passa a atender os dois pedidos.
+    Jobs podem ser pausados (`pause`/`resume`), cancelados e ter a
+    prioridade alterada (`set_priority`). Num job em andamento a pausa e o
+    cancelamento são cooperativos: o próximo progress hook interrompe o
+    download, e um job pausado assim continua os arquivos .part ao ser retomado.
+    """
+
+    def __init__(self, downloader, max_workers: int = config.MAX_CONCURRENT_DOWNLOADS,
+                 per_host_limit: int = config.MAX_DOWNLOADS_PER_HOST, postprocess_stage=None,
+                 progress_fps: float = config.PROGRESS_FPS, journal=None):
+        self.downloader = downloader
+        self.postprocess_stage = postprocess_stage
+        self.journal = journal
+        self.progress = ProgressAggregator()
+        self.progress_fps = progress_fps
+        self.max_workers = max_workers
+        self.per_host_limit = per_host_limit
+
+        self._cond = threading.Condition()
+        self._heap: List[tuple] = []
+        self._jobs: Dict[int, DownloadJob] = {}
+        self._inflight: Dict[tuple, DownloadJob] = {}
+        self._active_per_host: Dict[str, int] = {}
+        self._ids = itertools.count(1)
+        self._order = itertools.count()
+        self._heap_order: Dict[int, int] = {}  # entrada válida do heap de cada job na fila
+        self._subscribers: List[queue.Queue] = []
+        self._shutdown = False
+
+        self._workers = []
+        for i in range(max_workers):
+            worker = threading.Thread(target=self._worker, name=f'download-worker-{i}', daemon=True)
+            worker.start()
+            self._workers.append(worker)
+        self._ticker = threading.Thread(target=self._publish_progress, name='progress-ticker', daemon=True)
+        self._ticker.start()
+
+    def submit(self, url: str, options: Dict[str, Any], priority: int = 0,
+               on_finished: Optional[Callable[[DownloadJob], None]] = None,
+               journal_id: Optional[str] = None, paused: bool = False) -> DownloadJob:
+        """Enfileira um download; `on_finished(job)` é chamado quando ele termina
+
+        Se o mesmo download já estiver na fila ou em andamento, retorna esse
+        job (com `requests` incrementado) e `on_finished` é chamado no fim dele.
+        Com `paused`, o job entra pausado e só roda depois de `resume`.
+        """
+        if self._shutdown:
+            raise Exception("A fila de downloads foi encerrada")
+        key = dedup_key(url, options)
+        with self._cond:
+            shared = self._share(key, on_finished)
+        if shared is None:
+            if self.journal is not None and journal_id is None:
+                # Registrado antes de enfileirar: uma queda daqui em diante não perde o job
+                journal_id = uuid.uuid4().hex
+                self.journal.submitted(journal_id, url, options, priority)
+            with self._cond:
+                if self._shutdown:
+                    raise Exception("A fila de downloads foi encerrada")
+                shared = self._share(key, on_finished)
+                if shared is None:
+                    job = DownloadJob(job_id=next(self._ids), url=url, options=options,
+                                      priority=priority, host=host_of(url), journal_id=journal_id,
+                                      dedup_key=key, on_finished=on_finished,
+                                      state=JobState.PAUSED if paused else JobState.QUEUED)
+                    self._jobs[job.job_id] = job
+                    self._inflight[key] = job
+                    if not paused:
+                        self._push(job)
+        if shared is not None:
+            if self.journal is not None and journal_id is not None:
+                # A entrada do diário (retomada ou recém-criada) é atendida pelo job existente
+                try:
+                    self.journal.update(journal_id, state=JobState.CANCELLED.value, duplicate_of=shared.journal_id)
+                except OSError:
+                    pass
+            return shared
+        self._publish(JobEvent(job.job_id, 'state', job.state, {'url': url}))
+        return job
+
+    def resume_journal(self, keep_paused: bool = False) -> List[DownloadJob]:
+        """Reenfileira os jobs que não terminaram na execução anterior (mesmo formato e arquivos)
+
+        Com `keep_paused`, os que estavam pausados voltam pausados.
+        """
+        if self.journal is None:
+            return []
+        pending, self.journal.pending = self.journal.pending, []
+        return [self.submit(entry['url'], resume_options(entry), entry['priority'], journal_id=entry['id'],
+                            paused=keep_paused and entry.get('state') == JobState.PAUSED.value)
+                for entry in pending]
+
+    def pause(self, job_id: int) -> bool:
+        """Tira da fila um job até `resume`; um job em andamento é interrompido no próximo progresso"""
+        with self._cond:
+            job = self._jobs.get(job_id)
+            if job is not None and job.state in (JobState.EXTRACTING, JobState.DOWNLOADING):
+                if job.abort is None:
+                    job.abort = JobState.PAUSED
+                return True
+            if job is None or job.state != JobState.QUEUED:
+                return False
+            job.state = JobState.PAUSED
+            self._heap_order.pop(job_id, None)
+        self._journal(job, state=JobState.PAUSED.value)
+        self._publish(JobEvent(job_id, 'state', JobState.PAUSED))
+        return True
+
+    def resume(self, job_id: int) -> bool:
+        """Devolve um job pausado à fila (atrás dos de mesma prioridade)"""
+        with self._cond:
+            job = self._jobs.get(job_id)
+            if job is None or job.state != JobState.PAUSED or self._shutdown:
+                return False
+            job.state = JobState.QUEUED
+            self._push(job)
+        self._journal(job, state=JobState.QUEUED.value)
+        self._publish(JobEvent(job_id, 'state', JobState.QUEUED))
+        return True
+
+    def set_priority(self, job_id: int, priority: int) -> bool:
+        """Altera a prioridade de um job na fila ou pausado"""
+        with self._cond:
+            job = self._jobs.get(job_id)
+            if job is None or job.state not in (JobState.QUEUED, JobState.PAUSED):
+                return False
+            job.priority = priority
+            if job.state == JobState.QUEUED:
+                self._push(job)  # a entrada antiga do heap fica inválida
+        self._journal(job, priority=priority)
+        self._publish(JobEvent(job_id, 'priority', job.state, {'priority': priority}))
+        return True
+
+    def cancel(self, job_id: int) -> bool:
+        """Cancela um job (para todos os pedidos que ele atende)
+
+        Um job em andamento é interrompido no próximo progresso e só então
+        passa a 'cancelled'; a conversão de áudio já iniciada não é interrompida.
+        """
+        with self._cond:
+            job = self._jobs.get(job_id)
+            if job is not None and job.state in (JobState.EXTRACTING, JobState.DOWNLOADING):
+                job.abort = JobState.CANCELLED
+                return True
+            if job is None or job.state not in (JobState.QUEUED, JobState.PAUSED):
+                return False
+            self._heap_order.pop(job_id, None)
+            job.state = JobState.CANCELLED
+            job.finished_at = time.time()
+            self._forget_inflight(job)
+            self._cond.notify_all()
+        self._journal(job, state=JobState.CANCELLED.value)
+        self._finished(job)
+        self._publish(JobEvent(job_id, 'state', JobState.CANCELLED))
+        return True
+
+    def get(self, job_id: int) -> Optional[DownloadJob]:
+        with self._cond:
+            return self._jobs.get(job_id)
+
+    def jobs(self) -> List[DownloadJob]:
+        with self._cond:
+            return list(self._jobs.values())
+
+    def prune(self, keep: int) -> int:
+        """Esquece os jobs finalizados mais antigos, mantendo no máximo `keep`; retorna quantos saíram"""
+        with self._cond:
+            finished = [job for job in self._jobs.values() if job.state.finished]
+            excess = len(finished) - keep
+            if excess <= 0:
+                return 0
+            finished.sort(key=lambda job: job.finished_at or 0)
+            for job in finished[:excess]:
+                del self._jobs[job.job_id]
+            return excess
+
+    def counts(self) -> Dict[str, int]:
+        """Quantidade de jobs em cada estado"""
+        with self._cond:
+            counts = {state.value: 0 for state in JobState}
+            for job in self._jobs.values():
+                counts[job.state.value] += 1
+            return counts
+
+    def subscribe(self) -> queue.Queue:
+        """Retorna uma fila que recebe todos os JobEvent a partir de agora"""
+        events = queue.Queue()
+        with self._cond:
+            self._subscribers.append(events)
+        return events
+
+    def unsubscribe(self, events: queue.Queue) -> None:
+        with self._cond:
+            if events in self._subscribers:
+                self._subscribers.remove(events)
+
+    def wait(self, timeout: Optional[float] = None) -> bool:
+        """Bloqueia até que todos os jobs terminem (os pausados não contam)"""
+        deadline = None if timeout is None else time.monotonic() + timeout
+        with self._cond:
+            while any(not job.state.finished and job.state != JobState.PAUSED for job in self._jobs.values()):
+                remaining = None if deadline is None else deadline - time.monotonic()
+                if remaining is not None and remaining <= 0:
+                    return False
+                self._cond.wait(remaining)
+            return True
+
+    def shutdown(self, wait: bool = True) -> None:
+        """Encerra os workers; jobs ainda na fila são cancelados
+
+        O cancelamento por encerramento não vai para o diário: esses jobs
+        voltam para a fila no próximo `resume_journal()`.
+        """
+        with self._cond:
+            self._shutdown = True
+            cancelled = []
+            for job in self._jobs.values():
+                if job.state in (JobState.QUEUED, JobState.PAUSED):
+                    job.state = JobState.CANCELLED
+                    job.finished_at = time.time()
+                    cancelled.append(job)
+            self._heap.clear()
+            self._heap_order.clear()
+            self._cond.notify_all()
+        for job in cancelled:
+            self._finished(job)
+            self._publish(JobEvent(job.job_id, 'state', JobState.CANCELLED))
+        if wait:
+            for worker in self._workers:
+                worker.join()
+            self._ticker.join()
+
+    def _publish(self, event: JobEvent) -> None:
+        with self._cond:
+            subscribers = list(self._subscribers)
+        for events in subscribers:
+            events.put(event)
+
+    def _publish_progress(self) -> None:
+        """Um único timer para todos os jobs: publica os snapshots que mudaram a cada quadro"""
+        interval = 1.0 / self.progress_fps
+        while not self._shutdown:
+            time.sleep(interval)
+            for snapshot in self.progress.drain():
+                job_id = snapshot.pop('job_id')
+                with self._cond:
+                    job = self._jobs.get(job_id)
+                if job is None or job.state.finished:
+                    continue
+                job.progress = snapshot['percent']
+                self._publish(JobEvent(job_id, 'progress', job.state, snapshot))
+
+    def _next_job(self) -> Optional[DownloadJob]:
+        """Retira o job de maior prioridade cujo host ainda tem vaga (com o lock adquirido)"""
+        deferred = []
+        job = None
+        while self._heap:
+            entry = heapq.heappop(self._heap)
+            candidate = self._jobs.get(entry[2])
+            if candidate is None or candidate.state != JobState.QUEUED or self._heap_order.get(entry[2]) != entry[1]:
+                continue  # job que saiu da fila ou entrada substituída por set_priority/resume
+            if self._active_per_host.get(candidate.host, 0) >= self.per_host_limit:
+                deferred.append(entry)
+                continue
+            job = candidate
+            del self._heap_order[job.job_id]
+            break
+        for entry in deferred:
+            heapq.heappush(self._heap, entry)
+        return job
+
+    def _worker(self) -> None:
+        while True:
+            with self._cond:
+                job = self._next_job()
+                while job is None and not self._shutdown:
+                    self._cond.wait()
+                    job = self._next_job()
+                if job is None:
+                    return
+                self._active_per_host[job.host] = self._active_per_host.get(job.host, 0) + 1
+                job.state = JobState.EXTRACTING
+
+            try:
+                self._run(job)
+            finally:
+                with self._cond:
+                    self._active_per_host[job.host] -= 1
+                    self._cond.notify_all()
+
+    def _set_state(self, job: DownloadJob, state: JobState, **data) -> None:
+        with self._cond:
+            job.state = state
+            if state.finished:
+                job.finished_at = time.time()
+                self._forget_inflight(job)
+                self._cond.notify_all()
+        self._journal(job, state=state.value)
+        if state.finished:
+            self.progress.remove(job.job_id)
+            self._finished(job)
+        self._publish(JobEvent(job.job_id, 'state', state, data))
+
+    def _push(self, job: DownloadJob) -> None:
+        """Coloca o job no heap, invalidando a entrada anterior dele (com o lock adquirido)"""
+        order = next(self._order)
+        self._heap_order[job.job_id] = order
+        heapq.heappush(self._heap, (-job.priority, order, job.job_id))
+        self._cond.notify()
+
+    def _share(self, key: tuple, on_finished: Optional[Callable[[DownloadJob], None]]) -> Optional[DownloadJob]:
+        """Job não finalizado com a mesma chave, já associado ao novo pedido (com o lock adquirido)"""
+        job = self._inflight.get(key)
+        if job is None or job.state.finished:
+            return None
+        job.requests += 1
+        if on_finished is not None:
+            job.on_finished = on_finished if job.on_finished is None else _chained(job.on_finished, on_finished)
+        return job
+
+    def _forget_inflight(self, job: DownloadJob) -> None:
+        if self._inflight.get(job.dedup_key) is job:
+            del self._inflight[job.dedup_key]
+
+    def _journal(self, job: DownloadJob, **fields) -> None:
+        if self.journal is not None and job.journal_id is not None:
+            try:
+                self.journal.update(job.journal_id, **fields)
+            except OSError:
+                pass
+    
+    def _finished(self, job: DownloadJob) -> None:
+        if job.on_finished is not None:
+            try:
+                job.on_finished(job)
+            except Exception:
+                pass
+
+    def _run(self, job: DownloadJob) -> None:
+        self._publish(JobEvent(job.job_id, 'state', JobState.EXTRACTING))
+
+        aggregate_progress = self.progress.progress_hook(job.job_id)
+        aggregate_postprocessor = self.progress.postprocessor_hook(job.job_id)
+        journaled_files = set()
+
+        def progress_hook(d):
+            if job.abort is not None:
+                raise JobAborted(f"Job {job.job_id} interrompido")
+            if d['status'] == 'downloading' and job.state != JobState.DOWNLOADING:
+                self._set_state(job, JobState.DOWNLOADING)
+            if d.get('filename') and d['filename'] not in journaled_files:
+                # Arquivo e formato escolhidos: na retomada o mesmo .part é continuado
+                journaled_files.add(d['filename'])
+                self._journal(job, file=d['filename'], format_id=(d.get('info_dict') or {}).get('format_id'))
+            aggregate_progress(d)
+
+        def postprocessor_hook(d):
+            aggregate_postprocessor(d)
+            if d['status'] == 'started' and job.state != JobState.POSTPROCESSING:
+                self._set_state(job, JobState.POSTPROCESSING, postprocessor=d.get('postprocessor'))
+
+        try:
+            # Já baixado: evita até a extração
+            if job.options.get('use_archive', True):
+                archived = self.downloader.archived_download(job.url)
+                if archived is not None:
+                    job.stats = {'path': 'archived', 'filepath': archived['path']}
+                    job.progress = 100.0
+                    self._set_state(job, JobState.DONE, skipped=True, filepath=archived['path'])
+                    return
+            
+            # Conversão de áudio fora da thread de download, quando há um estágio dedicado
+            deferred = self.postprocess_stage is not None and job.options.get('download_type') == 'audio'
+            options = dict(job.options, job_id=job.job_id, priority=job.priority, defer_postprocessing=deferred)
+            
+            info = self.downloader.extract_info(job.url)
+            if job.abort is not None:
+                raise JobAborted(f"Job {job.job_id} interrompido")
+            self.progress.start(job.job_id, streams=expected_streams(options))
+            self._set_state(job, JobState.DOWNLOADING, title=info.get('title'))
+            job.stats = self.downloader.download_video(
+                job.url, options, progress_hook, info=info,
+                postprocessor_callback=postprocessor_hook)
+            
+            if deferred and job.stats.get('path') != 'archived' and job.stats.get('filepath'):
+                self._set_state(job, JobState.POSTPROCESSING, postprocessor='ExtractAudio')
+                # Caminho e bitrate do plano de áudio (sem plano: recodifica com a qualidade pedida)
+                quality = job.stats['audio_bitrate'] if 'audio_path' in job.stats else options.get('audio_quality')
+                # Bloqueia aqui se o estágio estiver cheio (back-pressure)
+                self.postprocess_stage.submit_extract_audio(
+                    job.stats['filepath'], options.get('audio_format', 'mp3'), quality,
+                    callback=lambda future: self._postprocessed(job, options, future),
+                    action=job.stats.get('audio_path', TRANSCODE))
+                return
+        except Exception as e:
+            if job.abort is not None:
+                # Pausa/cancelamento pedidos: o erro é a interrupção (mesmo embrulhada pelo yt-dlp)
+                self._aborted(job)
+                return
+            job.error = str(e)
+            self._set_state(job, JobState.FAILED, error=job.error)
+            return
+
+        job.progress = 100.0
+        self._set_state(job, JobState.DONE, audio_path=job.stats.get('audio_path'),
+                        transcode_time=job.stats.get('transcode_time'))
+    
+    def _aborted(self, job: DownloadJob) -> None:
+        """Conclui a interrupção de um job em andamento: volta pausado ou termina cancelado"""
+        if job.abort != JobState.PAUSED or self._shutdown:
+            self._set_state(job, JobState.CANCELLED)
+            return
+        with self._cond:
+            job.state = JobState.PAUSED
+            job.abort = None
+        self.progress.remove(job.job_id)
+        self._journal(job, state=JobState.PAUSED.value)
+        self._publish(JobEvent(job.job_id, 'state', JobState.PAUSED))
+    
+    def _postprocessed(self, job: DownloadJob, options: Dict[str, Any], future) -> None:
+        """Conclui um job cuja conversão terminou no PostProcessStage"""
+        try:
+            result = future.result()
+            job.stats['download_filepath'] = job.stats.get('filepath')
+            job.stats.update(result)
+            if job.stats.get('key') and options.get('use_archive', True):
+                self.downloader.record_file(job.stats['key'], job.stats.get('format_id'),
+                                            result['filepath'], options)
+        except Exception as e:
+            job.error = f"Erro no pós-processamento: {e}"
+            self._set_state(job, JobState.FAILED, error=job.error)
+            return
+        
+        job.progress = 100.0
+        self._set_state(job, JobState.DONE, audio_path=job.stats.get('audio_path'),
+                        transcode_time=job.stats.get('transcode_time'))
+
+
+class PlaylistFeeder:
+    """Alimenta a fila com entradas de playlist à medida que são enumeradas.
+
+    No máximo `lookahead` entradas ficam enfileiradas/em andamento ao mesmo
+    tempo; a próxima só é pedida ao gerador quando uma delas termina, o que
+    mantém a memória constante mesmo em canais com milhares de vídeos.
+    """
+
+    def __init__(self, download_queue: DownloadQueue, entries: Iterable[Dict[str, Any]],
+                 options: Dict[str, Any], priority: int = 0,
+                 lookahead: int = config.PLAYLIST_LOOKAHEAD):
+        self.download_queue = download_queue
+        self.options = options
+        self.priority = priority
+        self.submitted = 0
+        self.error: Optional[str] = None
+        self.done = threading.Event()
+
+        self._entries = entries
+        self._slots = threading.Semaphore(lookahead)
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._feed, name='playlist-feeder', daemon=True)
+        self._thread.start()
+
+    def stop(self) -> None:
+        """Para de enumerar (jobs já enfileirados continuam)"""
+        self._stop.set()
+
+    def _feed(self) -> None:
+        try:
+            for entry in self._entries:
+                while not self._slots.acquire(timeout=0.5):
+                    if self._stop.is_set():
+                        return
+                if self._stop.is_set():
+                    return
+                self.download_queue.submit(entry['url'], dict(self.options), self.priority,
+                                           on_finished=lambda job: self._slots.release())
+                self.submitted += 1
+        except Exception as e:
+            self.error = str(e)
+        finally:
+            close = getattr(self._entries, 'close', None)
+            if close is not None:
+                close()
+            self.done.set()
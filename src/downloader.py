@@ -1,166 +1,509 @@
 # ytdowloader\src\downloader.py
 
-import yt_dlp
 import os
 import threading
-from typing import Callable, Dict, Any
+from typing import Callable, Dict, Any, Iterator, List, Optional
+from urllib.parse import urlsplit
 import json
+import re
+import time
+from .cache import MetadataCache
+from .archive import DownloadArchive, file_sha256
+from .formats import FormatTable
+from .records import FormatRecord, VideoRecord
+from .log_sink import YtDlpLogger, logger
+from .sessions import SessionPool
+from .adaptive import FragmentTuner, ThroughputMeter, pick_format, probe_format
+from .postprocess import COPY, TRANSCODE, YTDLP_CODECS, AudioPlan, plan_audio
+from .singleflight import SingleFlight
+from .urls import canonical_url, youtube_id
+from . import bandwidth
+from . import config
+
+# Opções do yt-dlp para extração de metadados (compartilhadas pelo pool de sessões)
+EXTRACT_OPTS = {
+    'quiet': True,
+    'no_warnings': True,
+    'format_sort': ['res:2160', 'res:1440', 'res:1080', 'res:720', 'res:480', 'res:360'],
+    'extract_flat': False,
+}
+
+# URLs do googlevideo trazem o instante de expiração ("expire=1700000000" ou "/expire/1700000000/")
+EXPIRE_RE = re.compile(r'[?&/]expire[=/](\d+)')
+STREAM_MAX_AGE = 6 * 3600  # segundos, quando a URL não informa a expiração
+STREAM_EXPIRY_MARGIN = 300
+
+def load_yt_dlp():
+    """Importa o yt_dlp sob demanda (a importação carrega centenas de extratores)"""
+    import yt_dlp
+    return yt_dlp
 
 class YouTubeDownloader:
-    def __init__(self):
-        self.is_downloading = False
+    def __init__(self, cache: Optional[MetadataCache] = None, archive: Optional[DownloadArchive] = None,
+                 bandwidth_manager: Optional[bandwidth.BandwidthManager] = None,
+                 tuner: Optional[FragmentTuner] = None):
+        self._active_downloads = 0
+        self._active_lock = threading.Lock()
         self.current_progress = 0
+        self.last_download_stats: Dict[str, Any] = {}
+        self._cache = cache
+        self._archive = archive
+        self._sessions = None
+        # Extrações simultâneas do mesmo vídeo compartilham uma única ida à rede
+        self.inflight = SingleFlight()
+        self.bandwidth = bandwidth_manager or bandwidth.manager
+        self.tuner = tuner or FragmentTuner()
+        self._init_lock = threading.Lock()
+        
+    @property
+    def is_downloading(self) -> bool:
+        """Indica se há algum download em andamento"""
+        return self._active_downloads > 0
+    
+    @property
+    def cache(self) -> MetadataCache:
+        """Cache de metadados, aberto no primeiro uso"""
+        if self._cache is None:
+            with self._init_lock:
+                if self._cache is None:
+                    self._cache = self._default_cache()
+        return self._cache
+    
+    @property
+    def archive(self) -> DownloadArchive:
+        """Índice de downloads concluídos, aberto no primeiro uso"""
+        if self._archive is None:
+            with self._init_lock:
+                if self._archive is None:
+                    try:
+                        self._archive = DownloadArchive()
+                    except Exception:
+                        self._archive = DownloadArchive(':memory:')
+        return self._archive
+    
+    @property
+    def sessions(self) -> SessionPool:
+        """Instâncias de YoutubeDL reaproveitadas nas extrações"""
+        if self._sessions is None:
+            with self._init_lock:
+                if self._sessions is None:
+                    self._sessions = SessionPool(EXTRACT_OPTS)
+        return self._sessions
+    
+    def warm_up(self) -> None:
+        """Carrega o yt_dlp, abre o cache e prepara uma sessão de extração (para uso em segundo plano)"""
+        load_yt_dlp()
+        self.cache
+        self.sessions.prewarm()
+    
+    def _default_cache(self) -> MetadataCache:
+        """Cache em disco; se o diretório não for gravável, apenas em memória"""
+        try:
+            return MetadataCache()
+        except Exception:
+            return MetadataCache(':memory:')
+    
+    def video_key(self, url: str) -> Optional[str]:
+        """Chave canônica "<extrator>:<id>" da URL, sem acesso à rede"""
+        video_id = youtube_id(url)
+        if video_id:
+            return f"Youtube:{video_id}"
+        
+        yt_dlp = load_yt_dlp()
+        # O YouTube é testado primeiro para evitar percorrer todos os extratores
+        candidates = [yt_dlp.extractor.get_info_extractor('Youtube')]
+        candidates.extend(yt_dlp.extractor.gen_extractor_classes())
+        
+        for ie in candidates:
+            if ie.ie_key() == 'Generic' or not ie.suitable(url):
+                continue
+            video_id = ie.get_temp_id(url)
+            return f"{ie.ie_key()}:{video_id}" if video_id else None
+        return None
+    
+    def get_cached_info(self, url: str) -> Optional[Dict[str, Any]]:
+        """Retorna o info dict bruto em cache para a URL, se houver"""
+        key = self.video_key(url)
+        return self.cache.get(key) if key else None
+    
+    def extract_info(self, url: str, fresh: bool = False) -> Dict[str, Any]:
+        """Obtém o info dict bruto (sanitizado), usando o cache quando possível
+        
+        Chamadas simultâneas para o mesmo vídeo (mesmo em formas diferentes
+        de URL) esperam uma única extração e recebem o mesmo info dict.
+        Com `fresh`, uma extração já em andamento não é aproveitada (nova
+        tentativa depois de uma que travou).
+        """
+        key = self.video_key(url)
+        info = self.cache.get(key) if key else None
+        if info is not None:
+            return info
+        if fresh:
+            return self._extract_info(url)
+        return self.inflight.do(key or canonical_url(url), self._extract_info, url)
+    
+    def _extract_info(self, url: str) -> Dict[str, Any]:
+        try:
+            with self.sessions.session() as ydl:
+                info = ydl.sanitize_info(ydl.extract_info(url, download=False))
+        except Exception as e:
+            raise Exception(f"Erro ao obter informações: {str(e)}")
         
-    def get_video_info(self, url: str) -> Dict[str, Any]:
-        """Obtém informações do vídeo"""
+        return self._remember_info(info)
+    
+    def _remember_info(self, info: Dict[str, Any]) -> Dict[str, Any]:
+        """Guarda um info dict sanitizado no cache de metadados"""
+        if info.get('extractor_key') and info.get('id'):
+            self.cache.put(f"{info['extractor_key']}:{info['id']}", info)
+        return info
+    
+    def get_video_info(self, url: str, fresh: bool = False) -> VideoRecord:
+        """Obtém informações do vídeo (números crus; a formatação fica para a exibição)"""
+        return VideoRecord.from_info(self.extract_info(url, fresh), url)
+    
+    def get_description(self, video: VideoRecord) -> str:
+        """Descrição do vídeo, lida sob demanda do cache de metadados (ou extraída de novo)"""
+        info = self.cache.get(video.key) if video.key else None
+        if info is None:
+            info = self.extract_info(video.url)
+        return info.get('description') or 'Sem descrição'
+    
+    def iter_playlist_entries(self, url: str, max_depth: int = 2) -> Iterator[Dict[str, Any]]:
+        """Enumera as entradas de uma playlist/canal sob demanda
+        
+        Usa extração "flat" e `lazy_playlist`, então cada página da playlist só
+        é buscada quando o consumidor pede mais entradas. Cada item traz ao
+        menos 'url' (e 'id'/'title' quando o extrator informa). Uma URL de
+        vídeo avulso gera um único item.
+        """
         ydl_opts = {
             'quiet': True,
             'no_warnings': True,
-            'format_sort': ['res:2160', 'res:1440', 'res:1080', 'res:720', 'res:480', 'res:360'],
-            'extract_flat': False,
+            'extract_flat': 'in_playlist',
+            'lazy_playlist': True,
+        }
+        
+        yt_dlp = load_yt_dlp()
+        try:
+            with yt_dlp.YoutubeDL(ydl_opts) as ydl:
+                yield from self._iter_entries(ydl, url, max_depth)
+        except Exception as e:
+            raise Exception(f"Erro ao listar playlist: {str(e)}")
+    
+    def _iter_entries(self, ydl, url: str, depth: int) -> Iterator[Dict[str, Any]]:
+        result = ydl.extract_info(url, download=False, process=False)
+        
+        while result.get('_type') == 'url' and depth > 0:
+            # Redirecionamento (ex.: canal -> aba de vídeos)
+            depth -= 1
+            result = ydl.extract_info(result['url'], download=False, process=False)
+        
+        if result.get('_type') not in ('playlist', 'multi_video'):
+            yield {'url': result.get('webpage_url') or url, 'id': result.get('id'),
+                   'title': result.get('title')}
+            return
+        
+        for entry in result.get('entries') or []:
+            if not entry:
+                continue
+            entry_type = entry.get('_type', 'video')
+            if entry_type == 'playlist' and depth > 0:
+                # Abas/playlists aninhadas (ex.: canal com várias abas)
+                entry_url = entry.get('webpage_url') or entry.get('url')
+                if entry_url:
+                    yield from self._iter_entries(ydl, entry_url, depth - 1)
+                continue
+            entry_url = entry.get('url') or entry.get('webpage_url')
+            if not entry_url:
+                continue
+            if entry_type == 'url' and depth > 0 and (entry.get('ie_key') or '').endswith(('Tab', 'Playlist')):
+                # Entrada que aponta para outra playlist
+                yield from self._iter_entries(ydl, entry_url, depth - 1)
+                continue
+            yield {'url': entry_url, 'id': entry.get('id'), 'title': entry.get('title')}
+    
+    def get_available_formats(self, info: Dict) -> Dict[str, List[FormatRecord]]:
+        """Obtém formatos disponíveis: combinados por resolução e só áudio por bitrate"""
+        table = FormatTable.from_info(info)
+        return {
+            'video': [FormatRecord.from_table(table, i) for i in table.video_choices()],
+            'audio': [FormatRecord.from_table(table, i) for i in table.audio_choices()],
         }
     
+    def download_video(self, url: str, options: Dict, progress_callback: Callable = None,
+                       info: Optional[Dict[str, Any]] = None,
+                       postprocessor_callback: Callable = None) -> Dict[str, Any]:
+        """Faz download do vídeo/áudio
+        
+        Se `info` (ou uma entrada do cache) estiver disponível e suas URLs de
+        stream ainda forem válidas, o download parte direto dele, sem extrair
+        a página novamente. Retorna as medições (também guardadas em
+        `last_download_stats`). Pode ser chamado de várias threads ao mesmo tempo.
+        """
+        stats = {'path': None, 'ttfb': None, 'elapsed': None}
         
+        # Já baixado: nada a extrair nem a transferir
+        if options.get('use_archive', True):
+            archived = self.archived_download(url, info)
+            if archived is not None:
+                stats.update(path='archived', elapsed=0.0, filepath=archived['path'],
+                             format_id=archived['format_id'])
+                self.last_download_stats = stats
+                return stats
+        
+        with self._active_lock:
+            self._active_downloads += 1
+        started = time.perf_counter()
+        
+        # Daqui em diante o finally desfaz o contador e a fatia de banda, mesmo se o planejamento falhar
+        stream = None
         try:
+            def ttfb_hook(d):
+                if stats['ttfb'] is None and d.get('status') == 'downloading' and d.get('downloaded_bytes'):
+                    stats['ttfb'] = time.perf_counter() - started
+            
+            # Fatia do limite de banda global; bloquear no hook limita o próprio download
+            stream = self.bandwidth.register(url, bandwidth.priority_class(options.get('priority', 0)))
+            
+            if info is None:
+                info = self.get_cached_info(url)
+            
+            # Áudio: stream de origem e caminho (cópia, remux ou recodificação) decididos antes de baixar
+            audio_plan = None
+            if options['download_type'] == 'audio' and info is not None:
+                audio_plan = plan_audio(info, options.get('audio_format', 'mp3'), options.get('audio_quality'),
+                                        format_id=options.get('format'))
+                if audio_plan is not None:
+                    stats.update(audio_path=audio_plan.action, audio_format_id=audio_plan.format_id,
+                                 audio_bitrate=audio_plan.bitrate)
+            
+            audio_started = []
+            
+            # Modo adaptativo: conexões simultâneas (e, com prazo/orçamento, qualidade) pela vazão medida
+            adaptive = None
+            meter = None
+            if options.get('adaptive') and options['download_type'] == 'video':
+                adaptive = self._plan_adaptive(url, info, options)
+                stats['adaptive'] = adaptive
+                options = dict(options, segments=adaptive['concurrency'])
+                meter = ThroughputMeter()
+            
+            def audio_timer(d):
+                if d.get('postprocessor') != 'ExtractAudio':
+                    return
+                if d['status'] == 'started':
+                    audio_started.append(time.perf_counter())
+                elif d['status'] == 'finished' and audio_started:
+                    stats['transcode_time'] = time.perf_counter() - audio_started.pop()
+            
+            ydl_opts = self.build_download_opts(options, audio_plan)
+            ydl_opts['progress_hooks'] = [stream.progress_hook(), ttfb_hook] + ([progress_callback] if progress_callback else [])
+            if adaptive is not None:
+                ydl_opts['progress_hooks'].append(meter.hook)
+                ydl_opts['concurrent_fragment_downloads'] = adaptive['concurrency']
+                if adaptive.get('format') and not options.get('format'):
+                    ydl_opts['format'] = adaptive['format']
+            ydl_opts['postprocessor_hooks'] = [audio_timer] + ([postprocessor_callback] if postprocessor_callback else [])
+            
+            yt_dlp = load_yt_dlp()
             with yt_dlp.YoutubeDL(ydl_opts) as ydl:
-                info = ydl.extract_info(url, download=False)
-                
-                # Formatar informações
-                video_info = {
-                    'title': info.get('title', 'Desconhecido'),
-                    'duration': self.format_duration(info.get('duration', 0)),
-                    'uploader': info.get('uploader', 'Desconhecido'),
-                    'view_count': f"{info.get('view_count', 0):,}",
-                    'upload_date': self.format_date(info.get('upload_date', '')),
-                    'thumbnail': info.get('thumbnail', ''),
-                    'description': info.get('description', 'Sem descrição'),
-                    'formats': self.get_available_formats(info)
-                }
+                result = None
+                if options.get('segments', 1) > 1 and options['download_type'] == 'video':
+                    if info is None or self.stream_urls_expired(info):
+                        stats['path'] = 'extract'
+                        info = self._remember_info(ydl.sanitize_info(ydl.extract_info(url, download=False)))
+                    result = self._download_segmented(ydl, info, options, stats)
                 
-                return video_info
+                if result is not None:
+                    stats['path'] = stats['path'] or 'reuse'
+                elif info is not None and not self.stream_urls_expired(info):
+                    stats['path'] = stats['path'] or 'reuse'
+                    try:
+                        result = ydl.process_ie_result(ydl.sanitize_info(info, True), download=True)
+                    except (yt_dlp.utils.DownloadError, yt_dlp.utils.ReExtractInfo):
+                        # URLs recusadas pelo servidor: extrair novamente
+                        if info.get('extractor_key') and info.get('id'):
+                            self.cache.invalidate(f"{info['extractor_key']}:{info['id']}")
+                        stats['path'] = 'extract'
+                        result = ydl.extract_info(url, download=True)
+                else:
+                    stats['path'] = 'extract'
+                    result = ydl.extract_info(url, download=True)
                 
+            if result:
+                self._record_download(result, options, stats)
+                if audio_plan is not None and audio_plan.action == COPY and not options.get('defer_postprocessing'):
+                    stats['transcode_time'] = 0.0
+            
+            # Com limite de banda global a vazão medida é a do limite, não a da conexão
+            if meter is not None and meter.rate is not None and self.bandwidth.rate is None:
+                adaptive['measured'] = meter.rate
+                self.tuner.report(adaptive['host'], adaptive['concurrency'], meter.rate)
+            
         except Exception as e:
-            raise Exception(f"Erro ao obter informações: {str(e)}")
+            raise Exception(f"Erro no download: {str(e)}")
+        finally:
+            stats['elapsed'] = time.perf_counter() - started
+            if stream is not None:
+                stream.close()
+            self.last_download_stats = stats
+            with self._active_lock:
+                self._active_downloads -= 1
+        
+        return stats
     
-    def get_available_formats(self, info: Dict) -> Dict[str, list]:
-        """Obtém formatos disponíveis"""
-        formats = {'video': [], 'audio': []}
-        
-        if 'formats' in info:
-            for fmt in info['formats']:
-                format_note = fmt.get('format_note', 'unknown')
-                ext = fmt.get('ext', 'unknown')
-                height = fmt.get('height', 0)
-                vcodec = fmt.get('vcodec', 'none')
-                acodec = fmt.get('acodec', 'none')
-                filesize = fmt.get('filesize', fmt.get('filesize_approx', 0))
-                
-                # Filtrar formatos indesejados
-                if vcodec == 'none' and acodec == 'none':
-                    continue
-                
-                # Obter qualidade/bitrate
-                abr = fmt.get('abr', 0)
-                tbr = fmt.get('tbr', 0)
-                
-                if vcodec != 'none' and acodec != 'none':
-                    # Formato combinado (vídeo + áudio)
-                    if height:
-                        resolution = f"{height}p"
-                    elif 'x' in format_note:
-                        resolution = format_note
-                    else:
-                        resolution = format_note or 'unknown'
-                    
-                    formats['video'].append({
-                        'format_id': fmt['format_id'],
-                        'resolution': resolution,
-                        'ext': ext,
-                        'filesize': self.format_filesize(filesize),
-                        'quality': f"{resolution} ({ext})"
-                    })
-                elif acodec != 'none' and vcodec == 'none':
-                    # Apenas áudio
-                    formats['audio'].append({
-                        'format_id': fmt['format_id'],
-                        'quality': f"{int(abr)}kbps ({ext})",
-                        'ext': ext,
-                        'filesize': self.format_filesize(filesize)
-                    })
-        
-        # Ordenar formatos de vídeo por resolução
-        def get_height(res_str):
+    def _plan_adaptive(self, url: str, info: Optional[Dict[str, Any]], options: Dict) -> Dict[str, Any]:
+        """Conexões simultâneas e formato do modo adaptativo
+        
+        A concorrência vem do FragmentTuner do host (ou de uma sondagem antes
+        do job, com `probe` ou quando há prazo e ainda não há vazão medida).
+        Com `deadline` (segundos) ou `size_budget` (bytes), escolhe a maior
+        qualidade que cabe neles.
+        """
+        host = (urlsplit(url).hostname or '').lower()
+        plan = {'host': host, 'concurrency': self.tuner.concurrency(host),
+                'throughput': self.tuner.throughput(host), 'probed': False}
+        deadline, size_budget = options.get('deadline'), options.get('size_budget')
+        if info is None:
+            return plan
+        
+        if options.get('probe') or (deadline and plan['throughput'] is None):
             try:
-                if 'x' in res_str:
-                    return int(res_str.split('x')[1])
-                elif 'p' in res_str:
-                    return int(res_str.replace('p', ''))
-                else:
-                    return 0
-            except:
-                return 0
-        
-        formats['video'] = sorted(
-            self.remove_duplicate_formats(formats['video']),
-            key=lambda x: get_height(x['resolution']),
-            reverse=True  # Maior resolução primeiro
-        )
-        
-        # Ordenar formatos de áudio por bitrate
-        formats['audio'] = sorted(
-            self.remove_duplicate_formats(formats['audio']),
-            key=lambda x: int(x['quality'].split('kbps')[0]) if 'kbps' in x['quality'] else 0,
-            reverse=True
-        )
-        
-        return formats
-    
-    def remove_duplicate_formats(self, formats: list) -> list:
-        """Remove formatos duplicados"""
-        seen = set()
-        unique_formats = []
-        
-        for fmt in formats:
-            identifier = (fmt['resolution'] if 'resolution' in fmt else fmt['quality'])
-            if identifier not in seen:
-                seen.add(identifier)
-                unique_formats.append(fmt)
-        
-        return unique_formats
-    
-    def download_video(self, url: str, options: Dict, progress_callback: Callable = None) -> None:
-        """Faz download do vídeo/áudio"""
-        self.is_downloading = True
+                result = probe_format(info, max_concurrency=self.tuner.max_concurrency)
+                self.tuner.seed(host, result['concurrency'], result['rate'])
+                plan.update(concurrency=result['concurrency'], throughput=result['rate'], probed=True,
+                            probe_rates=result['rates'])
+            except Exception as e:
+                logger.warning(f"Sondagem de vazão falhou: {e}")
         
+        if deadline or size_budget:
+            choice = pick_format(info, plan['throughput'], deadline, size_budget)
+            if choice is not None:
+                plan.update(choice)
+        return plan
+    
+    def _download_segmented(self, ydl, info: Dict[str, Any], options: Dict,
+                            stats: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+        """Baixa por várias conexões quando o formato escolhido é um arquivo progressivo grande
+        
+        Retorna o info processado (com 'filepath') ou None quando o formato
+        não se aplica (streams separados, HLS/DASH, arquivos pequenos).
+        """
+        selected = ydl.process_ie_result(ydl.sanitize_info(info, True), download=False)
+        if selected.get('requested_formats') or not selected.get('url'):
+            return None
+        if selected.get('protocol') not in ('http', 'https'):
+            return None
+        size = selected.get('filesize') or selected.get('filesize_approx') or 0
+        if size and size < config.SEGMENTED_MIN_SIZE:
+            return None
+        
+        filename = ydl.prepare_filename(selected)
+        if not os.path.exists(filename):
+            from .segmented import SegmentedDownloader  # http.client só quando necessário
+            
+            downloader = SegmentedDownloader(connections=options['segments'],
+                                             progress_hooks=ydl.params.get('progress_hooks', []))
+            stats['segmented'] = downloader.download(selected['url'], filename, selected.get('http_headers'))
+        selected['filepath'] = filename
+        return selected
+    
+    def archived_download(self, url: str, info: Optional[Dict[str, Any]] = None) -> Optional[Dict[str, Any]]:
+        """Entrada do arquivo de downloads para a URL, se ela já foi baixada
+        
+        Entradas cujo arquivo registrado não existe mais são ignoradas.
+        """
+        if info is not None and info.get('extractor_key') and info.get('id'):
+            key = f"{info['extractor_key']}:{info['id']}"
+        else:
+            key = self.video_key(url)
+        if not key or key not in self.archive:
+            return None
+        entry = self.archive.get(key)
+        if entry is None or (entry['path'] and not os.path.exists(entry['path'])):
+            return None
+        return entry
+    
+    def _record_download(self, result: Dict[str, Any], options: Dict, stats: Dict[str, Any]) -> None:
+        """Anota o arquivo gerado nas estatísticas e o registra no arquivo de downloads
+        
+        Com `defer_postprocessing` o registro fica para quem fizer a conversão
+        (via `record_file`), já que o arquivo final ainda não existe.
+        """
+        downloads = result.get('requested_downloads') or [result]
+        stats['filepath'] = downloads[-1].get('filepath') or downloads[-1].get('_filename')
+        stats['format_id'] = result.get('format_id')
+        if result.get('extractor_key') and result.get('id'):
+            stats['key'] = f"{result['extractor_key']}:{result['id']}"
+        
+        if stats.get('key') and options.get('use_archive', True) and not options.get('defer_postprocessing'):
+            self.record_file(stats['key'], stats['format_id'], stats['filepath'], options)
+    
+    def record_file(self, key: str, format_id: Optional[str], filepath: Optional[str], options: Dict) -> None:
+        """Registra um arquivo concluído no arquivo de downloads"""
+        size = sha256 = None
+        if filepath and os.path.exists(filepath):
+            size = os.path.getsize(filepath)
+            if options.get('hash_files'):
+                sha256 = file_sha256(filepath)
+        self.archive.add(key, format_id, filepath, size, sha256)
+    
+    def build_download_opts(self, options: Dict, audio_plan: Optional[AudioPlan] = None) -> Dict[str, Any]:
+        """Monta as opções do yt-dlp para um download (áudio conforme o `audio_plan`, se houver)"""
         ydl_opts = {
-            'outtmpl': options.get('output_template', 'downloads/%(title)s.%(ext)s'),
-            'progress_hooks': [progress_callback] if progress_callback else [],
-            'quiet': False,
+            'outtmpl': options.get('output_template', os.path.join('downloads', config.OUTPUT_TEMPLATE)),
+            'progress_hooks': [],
+            'quiet': options.get('quiet', False),
+            # Mensagens do yt-dlp vão para o log da aplicação; o progresso chega pelos hooks
+            'logger': YtDlpLogger(options.get('job_id')),
+            'noprogress': True,
         }
         
         # Configurar formato
         if options['download_type'] == 'video':
-            if options['video_quality'] == 'best':
+            video_quality = options.get('video_quality', 'best')
+            if video_quality == 'best':
                 ydl_opts['format'] = 'best[height<=1080]'
             else:
-                ydl_opts['format'] = options['video_quality']
+                ydl_opts['format'] = video_quality
         else:
             # Download de áudio
-            ydl_opts['format'] = 'bestaudio/best'
-            ydl_opts['postprocessors'] = [{
-                'key': 'FFmpegExtractAudio',
-                'preferredcodec': options.get('audio_format', 'mp3'),
-                'preferredquality': options.get('audio_quality', '192'),
-            }]
+            ydl_opts['format'] = audio_plan.format_id if audio_plan else 'bestaudio/best'
+            codec = options.get('audio_format', 'mp3')
+            # Com defer_postprocessing a conversão fica para o PostProcessStage;
+            # na cópia o arquivo baixado já é a saída
+            if not options.get('defer_postprocessing') and not (audio_plan and audio_plan.action == COPY):
+                postprocessor = {'key': 'FFmpegExtractAudio', 'preferredcodec': YTDLP_CODECS.get(codec, codec)}
+                # No remux o FFmpegExtractAudio só copia o stream (mesmo codec); a qualidade não se aplica
+                if audio_plan is None:
+                    postprocessor['preferredquality'] = options.get('audio_quality', '192')
+                elif audio_plan.action == TRANSCODE and audio_plan.bitrate:
+                    postprocessor['preferredquality'] = str(audio_plan.bitrate)
+                ydl_opts['postprocessors'] = [postprocessor]
         
-        try:
-            with yt_dlp.YoutubeDL(ydl_opts) as ydl:
-                ydl.download([url])
-                
-        except Exception as e:
-            raise Exception(f"Erro no download: {str(e)}")
-        finally:
-            self.is_downloading = False
+        # Formato fixado (ex.: retomada pelo diário, para reaproveitar os mesmos arquivos .part)
+        if options.get('format'):
+            ydl_opts['format'] = options['format']
+        
+        return ydl_opts
+    
+    def stream_urls_expired(self, info: Dict[str, Any], margin: float = STREAM_EXPIRY_MARGIN) -> bool:
+        """Indica se as URLs de stream do info dict já expiraram (ou vão expirar em breve)"""
+        now = time.time()
+        
+        expiries = []
+        for fmt in info.get('formats') or []:
+            match = EXPIRE_RE.search(fmt.get('url') or '')
+            if match:
+                expiries.append(int(match.group(1)))
+        if expiries:
+            return min(expiries) - margin <= now
+        
+        # Sem parâmetro de expiração: usar a idade da extração
+        epoch = info.get('epoch')
+        if not epoch:
+            return True
+        return now - epoch >= STREAM_MAX_AGE - margin
     
     def format_duration(self, seconds: int) -> str:
         """Formata duração em segundos para string"""
@@ -0,0 +1,146 @@
+# ytdowloader\src\formats.py
+
+from array import array
+from typing import Any, Dict, Iterable, List, Optional
+
+# Tipos de formato (coluna `kind`)
+COMBINED = 0   # vídeo + áudio
+VIDEO_ONLY = 1
+AUDIO_ONLY = 2
+
+
+def _number(value) -> float:
+    try:
+        return float(value) if value else 0.0
+    except (TypeError, ValueError):
+        return 0.0
+
+
+def _height_from_resolution(resolution: str) -> int:
+    """Extrai a altura de "1280x720" (campo `resolution` do yt-dlp)"""
+    width, sep, height = resolution.partition('x')
+    if sep and height.isdigit():
+        return int(height)
+    return 0
+
+
+class FormatTable:
+    """Índice colunar e tipado dos formatos de um info dict.
+
+    Construído em uma única passada sobre `info['formats']`; os valores
+    numéricos ficam em `array`s e as consultas percorrem as colunas
+    diretamente, sem montar nem reinterpretar strings.
+    """
+
+    __slots__ = ('format_id', 'ext', 'kind', 'height', 'fps', 'tbr', 'abr',
+                 'filesize', 'vcodec', 'acodec', 'protocol', 'note')
+
+    def __init__(self):
+        self.format_id: List[str] = []
+        self.ext: List[str] = []
+        self.kind = array('b')
+        self.height = array('i')
+        self.fps = array('d')
+        self.tbr = array('d')
+        self.abr = array('d')
+        self.filesize = array('q')
+        self.vcodec: List[str] = []
+        self.acodec: List[str] = []
+        self.protocol: List[str] = []
+        self.note: List[str] = []
+
+    @classmethod
+    def from_info(cls, info: Dict[str, Any]) -> 'FormatTable':
+        return cls.from_formats(info.get('formats') or [])
+
+    @classmethod
+    def from_formats(cls, formats: Iterable[Dict[str, Any]]) -> 'FormatTable':
+        table = cls()
+        for fmt in formats:
+            vcodec = fmt.get('vcodec') or 'none'
+            acodec = fmt.get('acodec') or 'none'
+            has_video = vcodec != 'none'
+            has_audio = acodec != 'none'
+            if not has_video and not has_audio:
+                continue
+
+            height = fmt.get('height') or 0
+            if not height and has_video:
+                height = _height_from_resolution(fmt.get('resolution') or fmt.get('format_note') or '')
+
+            table.format_id.append(str(fmt.get('format_id', '')))
+            table.ext.append(fmt.get('ext') or 'unknown')
+            table.kind.append(COMBINED if has_video and has_audio else (VIDEO_ONLY if has_video else AUDIO_ONLY))
+            table.height.append(int(height))
+            table.fps.append(_number(fmt.get('fps')))
+            table.tbr.append(_number(fmt.get('tbr')))
+            table.abr.append(_number(fmt.get('abr')))
+            table.filesize.append(int(fmt.get('filesize') or fmt.get('filesize_approx') or 0))
+            table.vcodec.append(vcodec)
+            table.acodec.append(acodec)
+            table.protocol.append(fmt.get('protocol') or '')
+            table.note.append(fmt.get('format_note') or '')
+        return table
+
+    def __len__(self) -> int:
+        return len(self.format_id)
+
+    def indices(self, kind: Optional[int] = None) -> List[int]:
+        if kind is None:
+            return list(range(len(self)))
+        return [i for i, k in enumerate(self.kind) if k == kind]
+
+    def row(self, i: int) -> Dict[str, Any]:
+        """Linha `i` como dict (para exibição/depuração)"""
+        return {name: getattr(self, name)[i] for name in self.__slots__}
+
+    def best_under_height(self, max_height: int, kind: int = COMBINED) -> Optional[int]:
+        """Maior altura <= max_height (empate: maior tbr)"""
+        best = None
+        best_key = None
+        for i in self.indices(kind):
+            height = self.height[i]
+            if height > max_height:
+                continue
+            key = (height, self.fps[i], self.tbr[i])
+            if best_key is None or key > best_key:
+                best, best_key = i, key
+        return best
+
+    def best_audio(self, codec: Optional[str] = None, kind: int = AUDIO_ONLY) -> Optional[int]:
+        """Maior bitrate de áudio, opcionalmente restrito a um codec ("opus", "mp4a", ...)"""
+        best = None
+        for i in self.indices(kind):
+            if codec and not self.acodec[i].startswith(codec):
+                continue
+            if best is None or self.abr[i] > self.abr[best]:
+                best = i
+        return best
+
+    def smallest_above_bitrate(self, min_bitrate: float, kind: int = AUDIO_ONLY) -> Optional[int]:
+        """Menor bitrate >= min_bitrate (abr para áudio, tbr para os demais)"""
+        column = self.abr if kind == AUDIO_ONLY else self.tbr
+        best = None
+        for i in self.indices(kind):
+            rate = column[i]
+            if rate >= min_bitrate and (best is None or rate < column[best]):
+                best = i
+        return best
+
+    def video_choices(self) -> List[int]:
+        """Formatos combinados, um por resolução, da maior para a menor"""
+        by_resolution: Dict[Any, int] = {}
+        for i in self.indices(COMBINED):
+            key = self.height[i] or self.note[i]
+            if key not in by_resolution:
+                by_resolution[key] = i
+        return sorted(by_resolution.values(), key=lambda i: self.height[i], reverse=True)
+
+    def audio_choices(self) -> List[int]:
+        """Formatos só de áudio, um por (bitrate, extensão), do maior bitrate para o menor"""
+        by_quality: Dict[tuple, int] = {}
+        for i in self.indices(AUDIO_ONLY):
+            key = (int(self.abr[i]), self.ext[i])
+            if key not in by_quality:
+                by_quality[key] = i
+        return sorted(by_quality.values(), key=lambda i: int(self.abr[i]), reverse=True)
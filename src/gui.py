@@ -3,24 +3,145 @@
 import tkinter as tk
 from tkinter import ttk, scrolledtext, messagebox, filedialog
 import threading
+import queue
 import os
-from PIL import Image, ImageTk
-import requests
-from io import BytesIO
+import sys
+import json
+import time
+import importlib
 from .downloader import YouTubeDownloader
+from .download_queue import DownloadQueue, JobState
+from .thumbnails import ThumbnailLoader
+from .postprocess import PostProcessStage
+from .metrics import InstrumentedDownloader, Metrics
+from .journal import JobJournal
+from .prefetch import Prefetcher, find_urls
+from .queue_panel import QueuePanel
+from . import config
+from .bandwidth import parse_rate
+from . import log_sink
+from .log_sink import logger
+
+# Caminho do plano de áudio -> texto no log
+AUDIO_PATH_LABELS = {'copy': 'cópia sem conversão', 'remux': 'remux sem recodificar', 'transcode': 'recodificação'}
+ADAPTIVE_QUALITY_LABEL = 'Automática (pela conexão)'
 
 class YouTubeDownloaderGUI:
-    def __init__(self, root):
+    def __init__(self, root, started_at=None):
         self.root = root
+        self.started_at = started_at if started_at is not None else time.perf_counter()
+        self.startup_time = None
         self.root.title("YouTube Downloader Pro")
         self.root.geometry("800x700")
         self.root.configure(bg='#2b2b2b')
         
-        self.downloader = YouTubeDownloader()
+        # Downloader, fila, diário e demais serviços são criados em segundo plano
+        # depois que a janela aparece (ver _start_services_thread)
+        self.metrics = None
+        self.downloader = None
+        self.postprocess_stage = None
+        self.journal = None
+        self.download_queue = None
+        self.queue_events = None
+        self.prefetcher = None
+        self._prefetch_after = None
+        self.current_job_id = None
+        self.thumbnail_loader = None
         self.current_thumbnail = None
+        self.current_thumbnail_url = None
+        self.log_buffer = log_sink.setup()
+        self.log_seq = 0
         
         self.setup_styles()
         self.create_widgets()
+        self.fetch_btn.config(state='disabled')
+        self.root.after(config.LOG_FLUSH_INTERVAL_MS, self._flush_log)
+        self.root.bind('<Map>', self._on_first_map, add='+')
+        self.root.bind('<Destroy>', self._on_destroy, add='+')
+    
+    def _start_services_thread(self):
+        """Cria os serviços fora da thread da interface e depois aquece os módulos pesados"""
+        metrics = Metrics()
+        downloader = InstrumentedDownloader(YouTubeDownloader(), metrics)
+        try:
+            journal = JobJournal()  # a releitura do diário pode ser longa
+        except OSError as e:
+            self.root.after(0, self.log, f"Diário de jobs indisponível: {e}")
+            journal = None
+        postprocess_stage = PostProcessStage()
+        download_queue = DownloadQueue(downloader, postprocess_stage=postprocess_stage, journal=journal)
+        queue_events = download_queue.subscribe()
+        metrics.watch(download_queue)
+        metrics.start_exporter()
+        services = {
+            'metrics': metrics,
+            'downloader': downloader,
+            'postprocess_stage': postprocess_stage,
+            'journal': journal,
+            'download_queue': download_queue,
+            'queue_events': queue_events,
+            'prefetcher': Prefetcher(downloader),
+            'thumbnail_loader': ThumbnailLoader(),
+        }
+        self.root.after(0, self._on_services_ready, services)
+        
+        # Importar yt_dlp, PIL e requests agora, para a primeira busca não pagar a importação
+        try:
+            downloader.warm_up()
+            for module in ('PIL.Image', 'PIL.ImageTk', 'requests'):
+                importlib.import_module(module)
+        except Exception:
+            pass
+    
+    def _on_services_ready(self, services):
+        """Liga os serviços à interface e retoma os downloads pendentes da sessão anterior"""
+        for name, service in services.items():
+            setattr(self, name, service)
+        self.queue_panel.download_queue = self.download_queue
+        self.fetch_btn.config(state='normal')
+        self.root.after(100, self._poll_queue_events)
+        self.root.after(1000, self._update_bandwidth_label)
+        
+        resumed = self.download_queue.resume_journal(keep_paused=True) if self.journal else []
+        if resumed:
+            self.current_job_id = resumed[-1].job_id
+            self.log(f"{len(resumed)} download(s) da sessão anterior retomado(s)")
+        if self._prefetch_after is None and self.url_entry.get().strip():
+            self._prefetch_urls()
+    
+    def _services_pending(self):
+        """Avisa (e retorna True) se os serviços ainda estão sendo criados"""
+        if self.downloader is not None:
+            return False
+        self.log("Aguarde: inicializando o downloader...")
+        return True
+    
+    def _on_destroy(self, event):
+        if event.widget is not self.root:
+            return
+        if self.prefetcher is not None:
+            self.prefetcher.shutdown()
+        if self.thumbnail_loader is not None:
+            self.thumbnail_loader.shutdown()
+    
+    def _on_first_map(self, event):
+        """Registra o tempo até a primeira exibição da janela e cria os serviços em segundo plano"""
+        if event.widget is not self.root or self.startup_time is not None:
+            return
+        self.startup_time = time.perf_counter() - self.started_at
+        self.log(f"Janela pronta em {self.startup_time * 1000:.0f} ms")
+        
+        report_path = os.environ.get('YTD_STARTUP_REPORT')
+        if report_path:
+            with open(report_path, 'w', encoding='utf-8') as f:
+                json.dump({'first_map_ms': self.startup_time * 1000, 'mapped_at': time.time(),
+                           'frozen': getattr(sys, 'frozen', False)}, f)
+            if os.environ.get('YTD_STARTUP_EXIT'):
+                self.root.after(0, self.root.destroy)
+                return
+        
+        thread = threading.Thread(target=self._start_services_thread, daemon=True)
+        thread.start()
         
     def setup_styles(self):
         """Configura os estilos da interface"""
@@ -90,6 +211,9 @@ class YouTubeDownloaderGUI:
         
         self.url_entry = ttk.Entry(url_input_frame, font=('Arial', 10))
         self.url_entry.pack(side=tk.LEFT, fill=tk.X, expand=True, padx=(0, 5))
+        # Colar ou digitar uma URL já dispara a extração em segundo plano
+        self.url_entry.bind('<<Paste>>', self._schedule_prefetch, add='+')
+        self.url_entry.bind('<KeyRelease>', self._schedule_prefetch, add='+')
         
         self.fetch_btn = ttk.Button(url_input_frame, text="Buscar Informações", 
                                    command=self.fetch_video_info)
@@ -171,7 +295,7 @@ class YouTubeDownloaderGUI:
         ttk.Label(audio_quality_frame, text="Formato:").pack(side=tk.LEFT, padx=(20, 0))
         
         self.audio_format = ttk.Combobox(audio_quality_frame, 
-                                        values=['mp3', 'm4a', 'wav', 'ogg'], 
+                                        values=['mp3', 'm4a', 'opus', 'wav', 'ogg'], 
                                         state="readonly", width=10)
         self.audio_format.set('mp3')
         self.audio_format.pack(side=tk.LEFT, padx=(10, 0))
@@ -189,6 +313,18 @@ class YouTubeDownloaderGUI:
         ttk.Button(location_frame, text="Procurar", 
                   command=self.browse_download_location).pack(side=tk.LEFT)
         
+        # Limite de banda (vale também para downloads em andamento)
+        bandwidth_frame = ttk.Frame(self.download_frame)
+        bandwidth_frame.pack(fill=tk.X, pady=5)
+        
+        ttk.Label(bandwidth_frame, text="Limite de Banda (ex.: 500K, 2M):").pack(side=tk.LEFT)
+        
+        self.rate_entry = ttk.Entry(bandwidth_frame, width=12)
+        self.rate_entry.pack(side=tk.LEFT, padx=(10, 5))
+        
+        ttk.Button(bandwidth_frame, text="Aplicar", 
+                  command=self.apply_rate_limit).pack(side=tk.LEFT)
+        
         # Botão de download
         self.download_btn = ttk.Button(main_frame, text="Iniciar Download", 
                                       command=self.start_download, state='disabled')
@@ -204,6 +340,16 @@ class YouTubeDownloaderGUI:
         self.progress_label = ttk.Label(self.progress_frame, text="")
         self.progress_label.pack()
         
+        self.bandwidth_label = ttk.Label(self.progress_frame, text="")
+        self.bandwidth_label.pack()
+        
+        # Fila de downloads
+        queue_frame = ttk.LabelFrame(main_frame, text="Fila de downloads", padding="10")
+        queue_frame.pack(fill=tk.BOTH, expand=False, pady=10)
+        
+        self.queue_panel = QueuePanel(queue_frame, self.download_queue)
+        self.queue_panel.pack(fill=tk.BOTH, expand=True)
+        
         # Log
         log_frame = ttk.LabelFrame(main_frame, text="Log", padding="10")
         log_frame.pack(fill=tk.BOTH, expand=False, pady=10)
@@ -217,6 +363,19 @@ class YouTubeDownloaderGUI:
         self.download_frame.pack_forget()
         self.progress_frame.pack_forget()
         
+    def _schedule_prefetch(self, event=None):
+        """Agenda o prefetch para quando o usuário parar de editar a URL"""
+        if self._prefetch_after is not None:
+            self.root.after_cancel(self._prefetch_after)
+        self._prefetch_after = self.root.after(config.PREFETCH_DELAY_MS, self._prefetch_urls)
+    
+    def _prefetch_urls(self):
+        """Extrai em segundo plano as URLs do campo (as que saíram dele são canceladas)"""
+        self._prefetch_after = None
+        if self.prefetcher is None:
+            return  # _on_services_ready busca o que estiver no campo
+        self.prefetcher.prefetch(find_urls(self.url_entry.get()))
+    
     def fetch_video_info(self):
         """Busca informações do vídeo"""
         url = self.url_entry.get().strip()
@@ -224,6 +383,9 @@ class YouTubeDownloaderGUI:
             messagebox.showerror("Erro", "Por favor, insira uma URL do YouTube")
             return
         
+        if self._services_pending():
+            return
+        
         self.log("Buscando informações do vídeo...")
         self.fetch_btn.config(state='disabled')
         
@@ -236,30 +398,32 @@ class YouTubeDownloaderGUI:
         """Thread para buscar informações do vídeo"""
         try:
             video_info = self.downloader.get_video_info(url)
-            self.root.after(0, self._on_video_info_fetched, video_info)
+            # A descrição não fica no registro: vai direto para o widget
+            description = self.downloader.get_description(video_info)
+            self.root.after(0, self._on_video_info_fetched, video_info, description)
         except Exception as e:
             self.root.after(0, self._on_video_info_error, str(e))
     
-    def _on_video_info_fetched(self, video_info):
+    def _on_video_info_fetched(self, video_info, description):
         """Callback quando as informações são obtidas"""
         self.video_info = video_info
         self.fetch_btn.config(state='normal')
         
         # Atualizar interface com informações
-        self.title_label.config(text=f"Título: {video_info['title']}")
-        self.duration_label.config(text=f"Duração: {video_info['duration']}")
-        self.uploader_label.config(text=f"Canal: {video_info['uploader']}")
-        self.views_label.config(text=f"Visualizações: {video_info['view_count']}")
+        self.title_label.config(text=f"Título: {video_info.title}")
+        self.duration_label.config(text=f"Duração: {self.downloader.format_duration(video_info.duration)}")
+        self.uploader_label.config(text=f"Canal: {video_info.uploader}")
+        self.views_label.config(text=f"Visualizações: {video_info.view_count:,}")
         
         # Limpar e inserir descrição
         self.desc_text.delete(1.0, tk.END)
-        self.desc_text.insert(1.0, video_info['description'])
+        self.desc_text.insert(1.0, description)
         
         # Carregar thumbnail
-        self.load_thumbnail(video_info['thumbnail'])
+        self.load_thumbnail(video_info.thumbnail)
         
         # Configurar qualidades disponíveis
-        self.setup_quality_options(video_info['formats'])
+        self.setup_quality_options(video_info)
         
         # Mostrar frames
         self.info_frame.pack(fill=tk.X, pady=10)
@@ -277,73 +441,50 @@ class YouTubeDownloaderGUI:
     
     def load_thumbnail(self, thumbnail_url):
         """Carrega a thumbnail do vídeo"""
+        self.current_thumbnail_url = thumbnail_url
+        if not thumbnail_url:
+            return
+        
+        # Download e redimensionamento em segundo plano; só o PhotoImage é criado aqui
+        def on_loaded(url, image, error):
+            self.root.after(0, self._on_thumbnail_loaded, url, image, error)
+        
+        self.thumbnail_loader.load(thumbnail_url, on_loaded)
+    
+    def _on_thumbnail_loaded(self, url, image, error):
+        """Exibe a thumbnail carregada (ignora resultados de buscas anteriores)"""
+        if url != self.current_thumbnail_url:
+            return
+        if error is not None:
+            self.log(f"Erro ao carregar thumbnail: {str(error)}")
+            return
         try:
-            response = requests.get(thumbnail_url, timeout=10)
-            image = Image.open(BytesIO(response.content))
-            image.thumbnail((160, 120), Image.Resampling.LANCZOS)
+            from PIL import ImageTk
+            
             self.current_thumbnail = ImageTk.PhotoImage(image)
             self.thumbnail_label.config(image=self.current_thumbnail)
         except Exception as e:
             self.log(f"Erro ao carregar thumbnail: {str(e)}")
     
-    def setup_quality_options(self, formats):
+    def setup_quality_options(self, video_info):
         """Configura as opções de qualidade"""
-        # Vídeo
-        video_qualities = []
-        for fmt in formats['video']:
-            # Extrair resolução numérica para ordenação
-            res_str = fmt.get('resolution', '0p')
-            if 'x' in res_str:  # Formato como "1280x720"
-                try:
-                    height = int(res_str.split('x')[1])
-                    quality_text = f"{height}p ({fmt.get('ext', 'mp4')})"
-                except:
-                    quality_text = f"{res_str} ({fmt.get('ext', 'mp4')})"
-            elif 'p' in res_str:  # Formato como "720p"
-                try:
-                    height = int(res_str.replace('p', '').split()[0])
-                    quality_text = f"{height}p ({fmt.get('ext', 'mp4')})"
-                except:
-                    quality_text = f"{res_str} ({fmt.get('ext', 'mp4')})"
-            else:
-                quality_text = f"{res_str} ({fmt.get('ext', 'mp4')})"
-            
-            video_qualities.append({
-                'text': quality_text,
-                'format_id': fmt['format_id'],
-                'height': self.extract_height(res_str)
-            })
-        
-        # Ordenar por qualidade (maior primeiro)
-        video_qualities.sort(key=lambda x: x['height'], reverse=True)
-        
-        # Criar lista para o Combobox
-        quality_list = [q['text'] for q in video_qualities]
-        self.video_quality['values'] = quality_list
+        # Vídeo (já ordenado pela maior resolução)
+        quality_list = [fmt.label for fmt in video_info.video_formats]
+        # Opção extra no fim: conexões simultâneas ajustadas pela vazão medida
+        self.video_quality['values'] = quality_list + [ADAPTIVE_QUALITY_LABEL]
         
         # Salvar mapeamento para uso posterior
-        self.video_quality_map = {q['text']: q['format_id'] for q in video_qualities}
+        self.video_quality_map = {fmt.label: fmt.format_id for fmt in video_info.video_formats}
         
         if quality_list:
             self.video_quality.set(quality_list[0])  # Selecionar a melhor qualidade por padrão
         
         # Áudio
-        audio_qualities = [fmt['quality'] for fmt in formats['audio']]
+        audio_qualities = [fmt.label for fmt in video_info.audio_formats]
         self.audio_quality['values'] = audio_qualities
+        self.audio_quality_map = {fmt.label: fmt.abr for fmt in video_info.audio_formats}
         if audio_qualities:
             self.audio_quality.set(audio_qualities[0])
-
-    def extract_height(self, resolution_str):
-        """Extrai altura numérica da string de resolução"""
-        try:
-            if 'x' in resolution_str:
-                return int(resolution_str.split('x')[1])
-            elif 'p' in resolution_str:
-                return int(resolution_str.replace('p', '').split()[0])
-            else:
-                return 0
-        except:
-            return 0
     
     def on_download_type_change(self):
         """Altera a interface baseada no tipo de download"""
@@ -354,6 +495,32 @@ class YouTubeDownloaderGUI:
             self.video_quality_frame.pack_forget()
             self.audio_settings_frame.pack(fill=tk.X, pady=5)
     
+    def apply_rate_limit(self):
+        """Aplica o limite de banda global digitado"""
+        try:
+            rate = parse_rate(self.rate_entry.get())
+        except ValueError:
+            messagebox.showerror("Erro", "Limite inválido. Use, por exemplo, 500K ou 2M")
+            return
+        if self._services_pending():
+            return
+        self.downloader.bandwidth.set_rate(rate)
+        self.log(f"Limite de banda: {self.format_rate(rate) if rate else 'sem limite'}")
+    
+    def _update_bandwidth_label(self):
+        """Mostra a taxa medida x limite configurado"""
+        stats = self.downloader.bandwidth.stats()
+        if stats['active_streams']:
+            limit = self.format_rate(stats['configured']) if stats['configured'] else 'sem limite'
+            self.bandwidth_label.config(text=f"Banda: {self.format_rate(stats['achieved'])} (limite: {limit})")
+        else:
+            self.bandwidth_label.config(text="")
+        self.root.after(1000, self._update_bandwidth_label)
+    
+    def format_rate(self, rate):
+        """Formata bytes/s"""
+        return f"{self.downloader.format_filesize(rate)}/s"
+    
     def browse_download_location(self):
         """Abre diálogo para escolher local de download"""
         directory = filedialog.askdirectory()
@@ -370,56 +537,123 @@ class YouTubeDownloaderGUI:
         # Configurar opções
         download_options = {
             'download_type': self.download_type.get(),
-            'output_template': os.path.join(self.location_entry.get(), '%(title)s.%(ext)s'),
+            'output_template': os.path.join(self.location_entry.get(), config.OUTPUT_TEMPLATE),
         }
         
         if self.download_type.get() == 'video':
+            download_options['segments'] = config.SEGMENTED_CONNECTIONS
             # Usar o mapeamento para obter o format_id correto
             selected_quality = self.video_quality.get()
-            if selected_quality in getattr(self, 'video_quality_map', {}):
+            if selected_quality == ADAPTIVE_QUALITY_LABEL:
+                download_options['adaptive'] = True
+            elif selected_quality in getattr(self, 'video_quality_map', {}):
                 download_options['video_quality'] = self.video_quality_map[selected_quality]
             else:
                 # Fallback: procurar no formato antigo
-                for fmt in self.video_info['formats']['video']:
-                    if fmt['quality'] == selected_quality:
-                        download_options['video_quality'] = fmt['format_id']
+                for fmt in self.video_info.video_formats:
+                    if fmt.label == selected_quality:
+                        download_options['video_quality'] = fmt.format_id
                         break
         else:
             download_options['audio_format'] = self.audio_format.get()
-            # Extrair qualidade do áudio (ex: "128kbps" -> "128")
+            # Bitrate numérico do áudio selecionado (ex: "128kbps (m4a)" -> "128")
             selected_audio = self.audio_quality.get()
-            quality_value = selected_audio.split('kbps')[0].strip()
-            download_options['audio_quality'] = quality_value
-        
-        self.log("Iniciando download...")
-        self.download_btn.config(state='disabled')
+            abr = getattr(self, 'audio_quality_map', {}).get(selected_audio)
+            if abr:
+                download_options['audio_quality'] = str(abr)
+        
+        job = self.download_queue.submit(self.url_entry.get(), download_options)
+        self.current_job_id = job.job_id
+        if job.requests > 1:
+            # Mesmo vídeo com as mesmas opções já na fila: acompanha o job existente
+            self.log(f"Download #{job.job_id} já está na fila")
+            return
+        self.log(f"Download #{job.job_id} adicionado à fila")
         self.progress_bar['value'] = 0
-        
-        # Executar download em thread separada
-        thread = threading.Thread(target=self._download_thread, 
-                                 args=(self.url_entry.get(), download_options))
-        thread.daemon = True
-        thread.start()
+        self.progress_label.config(text="Na fila...")
     
-    def _download_thread(self, url, options):
-        """Thread para download"""
-        def progress_hook(d):
-            if d['status'] == 'downloading':
-                if 'total_bytes' in d and d['total_bytes']:
-                    percent = (d['downloaded_bytes'] / d['total_bytes']) * 100
-                    self.root.after(0, self._update_progress, percent, 
-                                  f"Baixando: {percent:.1f}%")
-                elif 'total_bytes_estimate' in d and d['total_bytes_estimate']:
-                    percent = (d['downloaded_bytes'] / d['total_bytes_estimate']) * 100
-                    self.root.after(0, self._update_progress, percent, 
-                                  f"Baixando (estimado): {percent:.1f}%")
-            elif d['status'] == 'finished':
-                self.root.after(0, self._download_finished, "Download concluído com sucesso!")
-        
+    def _poll_queue_events(self):
+        """Consome os eventos da fila de downloads na thread da interface, uma vez por quadro"""
+        latest_progress = {}
+        batch = []
         try:
-            self.downloader.download_video(url, options, progress_hook)
-        except Exception as e:
-            self.root.after(0, self._download_error, str(e))
+            while True:
+                event = self.queue_events.get_nowait()
+                if event.kind == 'progress':
+                    latest_progress[event.job_id] = event
+                else:
+                    latest_progress.pop(event.job_id, None)
+                    batch.append(event)
+                    if event.kind == 'state':
+                        self._on_job_state(event)
+        except queue.Empty:
+            pass
+        # Só o último snapshot de cada job é desenhado
+        for event in latest_progress.values():
+            self._on_job_progress(event)
+        batch.extend(latest_progress.values())
+        self.queue_panel.apply(batch)
+        self.root.after(int(1000 / config.PROGRESS_FPS), self._poll_queue_events)
+    
+    def _on_job_progress(self, event):
+        """Atualiza a barra de progresso do job acompanhado"""
+        if event.job_id != self.current_job_id:
+            return
+        d = event.data
+        if d['phase'] == 'merging':
+            self._update_progress(100, "Mesclando vídeo e áudio...")
+            return
+        if d['phase'] == 'post-processing':
+            self._update_progress(100, "Processando...")
+            return
+        
+        text = f"Baixando: {d['percent']:.1f}%"
+        if d['streams'] > 1:
+            text = f"Baixando stream {d['stream']}/{d['streams']}: {d['percent']:.1f}%"
+        if d.get('speed'):
+            text += f" - {self.format_rate(d['speed'])}"
+        if d.get('eta'):
+            text += f" - restam {self.downloader.format_duration(int(d['eta']))}"
+        self._update_progress(d['percent'], text)
+    
+    def _on_job_state(self, event):
+        """Reage às mudanças de estado dos jobs"""
+        tracked = event.job_id == self.current_job_id
+        if event.state == JobState.QUEUED and tracked:
+            self.progress_label.config(text="Na fila...")
+        elif event.state == JobState.EXTRACTING and tracked:
+            self.progress_label.config(text="Obtendo informações...")
+        elif event.state == JobState.POSTPROCESSING and tracked:
+            self.progress_label.config(text="Processando...")
+        elif event.state == JobState.DONE:
+            job = self.download_queue.get(event.job_id)
+            if event.data.get('skipped'):
+                self.log(f"Download #{event.job_id} ignorado: já baixado em {event.data.get('filepath')}")
+            else:
+                self.log(f"Download #{event.job_id} concluído")
+            if job.stats.get('ttfb') is not None:
+                path = 'info reaproveitado' if job.stats['path'] == 'reuse' else 'nova extração'
+                self.log(f"Tempo até o primeiro byte: {job.stats['ttfb']:.2f}s ({path})")
+            if job.stats.get('transcode_time') is not None:
+                path = AUDIO_PATH_LABELS.get(job.stats.get('audio_path'), 'conversão')
+                self.log(f"Download: {job.stats['elapsed']:.1f}s, {path}: {job.stats['transcode_time']:.1f}s")
+            if tracked:
+                self._download_finished("Download concluído com sucesso!")
+        elif event.state == JobState.FAILED:
+            if tracked:
+                self._download_error(f"#{event.job_id}: {event.data.get('error')}")
+            else:
+                # Jobs retomados, em lote ou de outras origens: sem diálogo modal (um por falha)
+                logger.error(f"Download #{event.job_id} falhou: {event.data.get('error')}")
+        elif event.state == JobState.PAUSED:
+            self.log(f"Download #{event.job_id} pausado")
+            if tracked:
+                self.progress_label.config(text=f"Pausado em {self.progress_bar['value']:.0f}%")
+        elif event.state == JobState.CANCELLED:
+            self.log(f"Download #{event.job_id} cancelado")
+            if tracked:
+                self.progress_bar['value'] = 0
+                self.progress_label.config(text="Download cancelado")
     
     def _update_progress(self, value, text):
         """Atualiza barra de progresso"""
@@ -430,19 +664,28 @@ class YouTubeDownloaderGUI:
         """Callback quando download é concluído"""
         self.progress_bar['value'] = 100
         self.progress_label.config(text=message)
-        self.download_btn.config(state='normal')
-        self.log(message)
         messagebox.showinfo("Sucesso", message)
     
     def _download_error(self, error_msg):
         """Callback em caso de erro no download"""
-        self.download_btn.config(state='normal')
         self.progress_label.config(text="Erro no download")
-        self.log(f"Erro no download: {error_msg}")
+        logger.error(f"Erro no download: {error_msg}")
         messagebox.showerror("Erro", f"Falha no download: {error_msg}")
     
     def log(self, message):
-        """Adiciona mensagem ao log"""
-        self.log_text.insert(tk.END, f"{message}\n")
-        self.log_text.see(tk.END)
-        self.root.update_idletasks()
\ No newline at end of file
+        """Adiciona mensagem ao log (pode ser chamado de qualquer thread)"""
+        logger.info(message)
+    
+    def _flush_log(self):
+        """Copia as mensagens novas do buffer para o widget, em lote, e limita o tamanho dele"""
+        self.log_seq, lines, dropped = self.log_buffer.since(self.log_seq)
+        if lines:
+            text = ''.join(f"{line}\n" for _, line in lines)
+            if dropped:
+                text = f"... {dropped} mensagens omitidas ...\n{text}"
+            self.log_text.insert(tk.END, text)
+            excess = int(self.log_text.index('end-1c').split('.')[0]) - config.LOG_WIDGET_LINES - 1
+            if excess > 0:
+                self.log_text.delete('1.0', f'{excess + 1}.0')
+            self.log_text.see(tk.END)
+        self.root.after(config.LOG_FLUSH_INTERVAL_MS, self._flush_log)
@@ -0,0 +1,136 @@
+# ytdowloader\src\journal.py
+
+import json
+import os
+import threading
+import time
+from typing import Any, Dict, Optional
+
+from . import config
+
+FINISHED_STATES = ('done', 'failed', 'cancelled')
+
+
+class JobJournal:
+    """Diário de jobs (write-ahead log em JSON lines) para sobreviver a quedas.
+
+    Cada envio, mudança de estado e arquivo em download vira uma linha
+    acrescentada ao arquivo (com fsync nos registros de envio e de fim).
+    Ao abrir, o diário é relido: jobs sem estado final ficam em `pending`
+    para serem enfileirados de novo, com o formato escolhido e os arquivos
+    registrados, e o arquivo é reescrito só com eles.
+    """
+
+    def __init__(self, path: Optional[str] = None, compact_after: int = config.JOURNAL_COMPACT_RECORDS):
+        self.path = path or config.JOURNAL_PATH
+        self.compact_after = compact_after
+        self._lock = threading.Lock()
+        self._jobs: Dict[str, Dict[str, Any]] = {}
+        self._records = 0  # registros acrescentados desde a última compactação
+
+        os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+        self._replay()
+        self.pending = [dict(job) for job in self._jobs.values()]
+        self._compact()
+
+    def submitted(self, journal_id: str, url: str, options: Dict[str, Any], priority: int = 0) -> None:
+        self._append({'op': 'submit', 'id': journal_id, 'url': url, 'options': options,
+                      'priority': priority}, sync=True)
+
+    def update(self, journal_id: str, **fields) -> None:
+        """Registra estado ('state'), prioridade ('priority') e/ou arquivo em download ('file', 'format_id')"""
+        self._append(dict(fields, op='update', id=journal_id),
+                     sync=fields.get('state') in FINISHED_STATES)
+
+    def close(self) -> None:
+        with self._lock:
+            if self._file is not None:
+                self._file.close()
+                self._file = None
+
+    def _replay(self) -> None:
+        """Reconstrói o estado dos jobs a partir do arquivo (linhas corrompidas no fim são ignoradas)"""
+        try:
+            f = open(self.path, encoding='utf-8')
+        except FileNotFoundError:
+            return
+        with f:
+            for line in f:
+                try:
+                    record = json.loads(line)
+                except ValueError:
+                    continue  # última linha incompleta após uma queda
+                self._apply(record)
+
+    def _apply(self, record: Dict[str, Any]) -> None:
+        journal_id = record.get('id')
+        if record.get('op') == 'submit':
+            self._jobs[journal_id] = {'id': journal_id, 'url': record['url'], 'options': record.get('options') or {},
+                                      'priority': record.get('priority', 0), 'state': 'queued',
+                                      'files': [], 'format_ids': [], 'submitted_at': record.get('ts')}
+            return
+        job = self._jobs.get(journal_id)
+        if job is None:
+            return
+        if record.get('state'):
+            job['state'] = record['state']
+            if record['state'] in FINISHED_STATES:
+                del self._jobs[journal_id]
+                return
+        if 'priority' in record:
+            job['priority'] = record['priority']
+        if record.get('file') and record['file'] not in job['files']:
+            job['files'].append(record['file'])
+            job['format_ids'].append(str(record['format_id']) if record.get('format_id') else None)
+
+    def _append(self, record: Dict[str, Any], sync: bool = False) -> None:
+        record['ts'] = round(time.time(), 3)
+        line = json.dumps(record, ensure_ascii=False) + '\n'
+        with self._lock:
+            self._apply(record)
+            if self._file is None:
+                return
+            self._file.write(line)
+            self._file.flush()
+            if sync:
+                os.fsync(self._file.fileno())
+            self._records += 1
+            if self._records >= self.compact_after:
+                self._compact_locked()
+
+    def _compact(self) -> None:
+        with self._lock:
+            self._file = None
+            self._compact_locked()
+
+    def _compact_locked(self) -> None:
+        """Reescreve o diário só com os jobs não finalizados (com o lock adquirido)"""
+        if self._file is not None:
+            self._file.close()
+        tmp = f"{self.path}.tmp"
+        with open(tmp, 'w', encoding='utf-8') as f:
+            for job in self._jobs.values():
+                f.write(json.dumps({'op': 'submit', 'id': job['id'], 'url': job['url'],
+                                    'options': job['options'], 'priority': job['priority'],
+                                    'ts': job['submitted_at']}, ensure_ascii=False) + '\n')
+                if job['state'] == 'paused':
+                    f.write(json.dumps({'op': 'update', 'id': job['id'], 'state': 'paused'}) + '\n')
+                for file, format_id in zip(job['files'], job['format_ids']):
+                    f.write(json.dumps({'op': 'update', 'id': job['id'], 'file': file,
+                                        'format_id': format_id}, ensure_ascii=False) + '\n')
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp, self.path)
+        self._file = open(self.path, 'a', encoding='utf-8')
+        # Só o que for acrescentado daqui em diante conta para a próxima compactação:
+        # com muitos jobs pendentes, contar também os reescritos compactaria a cada registro
+        self._records = 0
+
+
+def resume_options(entry: Dict[str, Any]) -> Dict[str, Any]:
+    """Opções para reenfileirar um job do diário com o mesmo formato (e os mesmos arquivos .part)"""
+    options = dict(entry['options'])
+    format_ids = [format_id for format_id in entry.get('format_ids') or [] if format_id]
+    if format_ids:
+        options['format'] = '+'.join(format_ids)
+    return options
@@ -0,0 +1,127 @@
+# ytdowloader\src\log_sink.py
+
+import collections
+import json
+import logging
+import logging.handlers
+import os
+import threading
+from typing import List, Optional, Tuple
+
+from . import config
+
+# Logger raiz da aplicação; módulos usam filhos dele (ex.: 'ytdownloader.yt_dlp')
+logger = logging.getLogger('ytdownloader')
+
+
+class JsonFormatter(logging.Formatter):
+    """Uma linha JSON por registro (campos extras via `extra={'job': ...}`)"""
+
+    EXTRA_FIELDS = ('job', 'url')
+
+    def format(self, record: logging.LogRecord) -> str:
+        entry = {
+            'ts': round(record.created, 3),
+            'level': record.levelname.lower(),
+            'logger': record.name,
+            'message': record.getMessage(),
+        }
+        for name in self.EXTRA_FIELDS:
+            value = getattr(record, name, None)
+            if value is not None:
+                entry[name] = value
+        if record.exc_info:
+            entry['exception'] = self.formatException(record.exc_info)
+        return json.dumps(entry, ensure_ascii=False)
+
+
+class RingBufferHandler(logging.Handler):
+    """Guarda as últimas `capacity` mensagens formatadas, numeradas em sequência.
+
+    Quem exibe o log (a GUI) guarda o último número lido e chama
+    `since(seq)` no seu próprio timer; mensagens antigas saem do buffer
+    sozinhas, então a memória não cresce com a duração da sessão.
+    """
+
+    def __init__(self, capacity: int = config.LOG_BUFFER_LINES):
+        super().__init__()
+        self.setFormatter(logging.Formatter('%(asctime)s %(message)s', datefmt='%H:%M:%S'))
+        self._records = collections.deque(maxlen=capacity)
+        self._seq = 0
+        self._buffer_lock = threading.Lock()
+
+    def emit(self, record: logging.LogRecord) -> None:
+        try:
+            line = self.format(record)
+        except Exception:
+            self.handleError(record)
+            return
+        with self._buffer_lock:
+            self._seq += 1
+            self._records.append((self._seq, record.levelno, line))
+
+    def since(self, seq: int) -> Tuple[int, List[Tuple[int, str]], int]:
+        """Mensagens depois de `seq`: (último seq, [(nível, texto)], quantas foram descartadas)"""
+        with self._buffer_lock:
+            if not self._records or self._seq <= seq:
+                return self._seq, [], 0
+            first = self._records[0][0]
+            dropped = max(first - seq - 1, 0)
+            lines = [(level, line) for n, level, line in self._records if n > seq]
+            return self._seq, lines, dropped
+
+
+class YtDlpLogger:
+    """Objeto para a opção `logger` do yt-dlp: a saída vai para o log em vez do stdout"""
+
+    def __init__(self, job: Optional[int] = None):
+        self._logger = logger.getChild('yt_dlp')
+        self._extra = {'job': job} if job is not None else None
+
+    def debug(self, message: str) -> None:
+        # O yt-dlp manda também as mensagens normais por debug(); só "[debug] ..." é debug de fato
+        if message.startswith('[debug] '):
+            self._logger.debug(message[8:], extra=self._extra)
+        else:
+            self._logger.info(message, extra=self._extra)
+
+    def info(self, message: str) -> None:
+        self._logger.info(message, extra=self._extra)
+
+    def warning(self, message: str) -> None:
+        self._logger.warning(message, extra=self._extra)
+
+    def error(self, message: str) -> None:
+        self._logger.error(message, extra=self._extra)
+
+
+_setup_lock = threading.Lock()
+_ring: Optional[RingBufferHandler] = None
+
+
+def setup(log_path: Optional[str] = config.LOG_PATH, level: int = logging.INFO) -> RingBufferHandler:
+    """Configura o logger da aplicação (uma vez por processo) e retorna o buffer em memória
+
+    Com `log_path`, os registros também vão em JSON para um arquivo rotativo.
+    """
+    global _ring
+    with _setup_lock:
+        if _ring is not None:
+            return _ring
+        logger.setLevel(level)
+        logger.propagate = False
+        _ring = RingBufferHandler()
+        logger.addHandler(_ring)
+        if log_path:
+            try:
+                os.makedirs(os.path.dirname(os.path.abspath(log_path)), exist_ok=True)
+                file_handler = logging.handlers.RotatingFileHandler(
+                    log_path, maxBytes=config.LOG_MAX_BYTES, backupCount=config.LOG_BACKUP_COUNT,
+                    encoding='utf-8', delay=True)
+            except OSError as e:
+                logger.warning(f"Log em arquivo desativado: {e}")
+            else:
+                file_handler.setFormatter(JsonFormatter())
+                logger.addHandler(file_handler)
+        return _ring
+
@@ -1,7 +1,10 @@
 # ytdowloader\src\main.py
 
-import tkinter as tk
-from .gui import YouTubeDownloaderGUI
+import time
+
+# Referência para medir o tempo até a primeira janela
+STARTED_AT = time.perf_counter()
+
 import sys
 import os
 
@@ -11,13 +14,21 @@ def main():
     if current_dir not in sys.path:
         sys.path.insert(0, current_dir)
     
+    # Com argumentos: modo headless (sem tkinter/PIL/requests)
+    if len(sys.argv) > 1:
+        from .cli import main as cli_main
+        sys.exit(cli_main(sys.argv[1:]))
+    
     try:
+        import tkinter as tk
+        from .gui import YouTubeDownloaderGUI
+        
         root = tk.Tk()
-        app = YouTubeDownloaderGUI(root)
+        app = YouTubeDownloaderGUI(root, started_at=STARTED_AT)
         root.mainloop()
     except Exception as e:
         print(f"Erro ao iniciar aplicação: {e}")
         input("Pressione Enter para sair...")
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    main()
@@ -0,0 +1,355 @@
+# ytdowloader\src\metrics.py
+
+import bisect
+import collections
+import json
+import os
+import queue
+import threading
+import time
+from typing import Any, Callable, Dict, Iterable, List, Optional
+
+from . import config
+
+# Limites dos histogramas (segundos e bytes/s)
+DURATION_BUCKETS = (0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60, 120, 300, 600, 1800)
+THROUGHPUT_BUCKETS = tuple(2 ** n * 1024 for n in range(4, 17, 2))  # 16 KiB/s .. 64 MiB/s
+
+# Durações calculadas a partir das marcações de cada job: nome -> (marcação inicial, final).
+# 'queued'/'extracting'/'downloading'/'post-processing' vêm dos estados da fila;
+# 'first_byte'/'transferred' do InstrumentedDownloader
+PHASE_DURATIONS = {
+    'queue_wait': ('queued', 'extracting'),
+    'extraction': ('extracting', 'downloading'),
+    'ttfb': ('downloading', 'first_byte'),
+    'transfer': ('first_byte', 'transferred'),
+    'postprocess': ('post-processing', 'finished'),
+    'total': ('queued', 'finished'),
+}
+
+
+def error_class(exc: BaseException) -> str:
+    """Classe "real" de um erro, atravessando os `Exception("Erro ...")` que embrulham outros"""
+    while type(exc) is Exception:
+        inner = exc.__cause__ or exc.__context__
+        if inner is None:
+            break
+        exc = inner
+    name = type(exc).__name__
+    # DownloadError do yt-dlp guarda a exceção original em exc_info
+    original = (getattr(exc, 'exc_info', None) or (None, None))[1]
+    if isinstance(original, BaseException) and original is not exc:
+        name = f"{name}/{type(original).__name__}"
+    return name
+
+
+class Histogram:
+    """Histograma cumulativo no formato do Prometheus"""
+
+    __slots__ = ('buckets', 'counts', 'count', 'sum')
+
+    def __init__(self, buckets: Iterable[float]):
+        self.buckets = tuple(buckets)
+        self.counts = [0] * len(self.buckets)
+        self.count = 0
+        self.sum = 0.0
+
+    def observe(self, value: float) -> None:
+        index = bisect.bisect_left(self.buckets, value)
+        if index < len(self.counts):
+            self.counts[index] += 1
+        self.count += 1
+        self.sum += value
+
+    def cumulative(self) -> List[tuple]:
+        """[(limite, contagem acumulada)], terminando em +Inf"""
+        total = 0
+        result = []
+        for bound, count in zip(self.buckets, self.counts):
+            total += count
+            result.append((bound, total))
+        result.append(('+Inf', self.count))
+        return result
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {'count': self.count, 'sum': self.sum,
+                'buckets': {str(bound): count for bound, count in self.cumulative()}}
+
+
+class Metrics:
+    """Medições dos jobs: horário de cada fase e agregados acumulados.
+
+    Os horários vêm dos eventos da fila (`watch`) e do `InstrumentedDownloader`
+    (primeiro byte, fim da transferência); ao fim do job as durações de cada
+    fase entram nos histogramas e o job é descartado, então a memória fica
+    limitada aos jobs em andamento mais os `recent_jobs` últimos.
+    """
+
+    def __init__(self, recent_jobs: int = 100):
+        self._lock = threading.Lock()
+        self._active: Dict[int, Dict[str, float]] = {}
+        self._recent = collections.deque(maxlen=recent_jobs)
+        self.phase_seconds = {name: Histogram(DURATION_BUCKETS) for name in PHASE_DURATIONS}
+        self.call_seconds: Dict[str, Histogram] = {}
+        self.throughput = Histogram(THROUGHPUT_BUCKETS)
+        self.jobs_total = collections.Counter()
+        self.failures_total = collections.Counter()  # (operação, classe do erro) -> quantidade
+        self.downloaded_bytes_total = 0
+        self._collectors: Dict[str, Callable[[], Dict[str, Any]]] = {}
+        self.started_at = time.time()
+
+    def add_collector(self, name: str, collector: Callable[[], Dict[str, Any]]) -> None:
+        """Valores lidos na hora do snapshot (ex.: `cache.stats`)"""
+        self._collectors[name] = collector
+
+    def mark(self, job_id: Optional[int], phase: str, when: Optional[float] = None) -> None:
+        """Registra o início de uma fase (a primeira marcação vale)"""
+        if job_id is None:
+            return
+        with self._lock:
+            phases = self._active.setdefault(job_id, {})
+            phases.setdefault(phase, time.time() if when is None else when)
+
+    def finish_job(self, job_id: int, state: str, error: Optional[str] = None,
+                   when: Optional[float] = None) -> None:
+        """Fecha o job: calcula as durações e atualiza os agregados"""
+        with self._lock:
+            phases = self._active.pop(job_id, {})
+            phases.setdefault('finished', time.time() if when is None else when)
+            self.jobs_total[state] += 1
+            durations = {}
+            for name, (start, end) in PHASE_DURATIONS.items():
+                if start in phases and end in phases:
+                    durations[name] = max(phases[end] - phases[start], 0.0)
+                    self.phase_seconds[name].observe(durations[name])
+            self._recent.append({'job': job_id, 'state': state, 'phases': phases,
+                                 'durations': durations, 'error': error})
+
+    def observe_call(self, name: str, seconds: float) -> None:
+        with self._lock:
+            histogram = self.call_seconds.get(name)
+            if histogram is None:
+                histogram = self.call_seconds[name] = Histogram(DURATION_BUCKETS)
+            histogram.observe(seconds)
+
+    def observe_transfer(self, nbytes: int, seconds: float) -> None:
+        with self._lock:
+            self.downloaded_bytes_total += nbytes
+            if nbytes and seconds > 0:
+                self.throughput.observe(nbytes / seconds)
+
+    def observe_failure(self, operation: str, exc: BaseException) -> None:
+        with self._lock:
+            self.failures_total[(operation, error_class(exc))] += 1
+
+    def watch(self, download_queue) -> threading.Thread:
+        """Acompanha os eventos de estado da fila em uma thread própria"""
+        events = download_queue.subscribe()
+
+        def consume():
+            while True:
+                try:
+                    event = events.get(timeout=1.0)
+                except queue.Empty:
+                    if getattr(download_queue, '_shutdown', False):
+                        return
+                    continue
+                if event.kind != 'state':
+                    continue
+                state = event.state.value
+                if event.state.finished:
+                    self.finish_job(event.job_id, state, event.data.get('error'), event.ts)
+                else:
+                    self.mark(event.job_id, state, event.ts)
+
+        thread = threading.Thread(target=consume, name='metrics-watch', daemon=True)
+        thread.start()
+        return thread
+
+    def snapshot(self) -> Dict[str, Any]:
+        with self._lock:
+            data = {
+                'timestamp': time.time(),
+                'uptime': time.time() - self.started_at,
+                'jobs_total': dict(self.jobs_total),
+                'jobs_active': len(self._active),
+                'failures_total': [{'operation': op, 'error': error, 'count': count}
+                                   for (op, error), count in sorted(self.failures_total.items())],
+                'downloaded_bytes_total': self.downloaded_bytes_total,
+                'phase_seconds': {name: h.to_dict() for name, h in self.phase_seconds.items()},
+                'call_seconds': {name: h.to_dict() for name, h in self.call_seconds.items()},
+                'throughput_bytes_per_second': self.throughput.to_dict(),
+                'recent_jobs': list(self._recent),
+            }
+        for name, collector in self._collectors.items():
+            try:
+                data[name] = collector()
+            except Exception as e:
+                data[name] = {'error': str(e)}
+        return data
+
+    def prometheus_text(self, prefix: str = 'ytdownloader') -> str:
+        """Snapshot no formato texto do Prometheus (textfile collector do node_exporter)"""
+        data = self.snapshot()
+        lines = []
+
+        def metric(name, kind, help_text, samples):
+            lines.append(f"# HELP {prefix}_{name} {help_text}")
+            lines.append(f"# TYPE {prefix}_{name} {kind}")
+            for suffix, labels, value in samples:
+                label_text = ','.join(f'{k}="{_escape(v)}"' for k, v in labels.items())
+                lines.append(f"{prefix}_{name}{suffix}{{{label_text}}} {_number(value)}"
+                             if label_text else f"{prefix}_{name}{suffix} {_number(value)}")
+
+        def histogram_samples(histogram, labels):
+            for bound, count in histogram['buckets'].items():
+                yield '_bucket', dict(labels, le=bound), count
+            yield '_sum', labels, histogram['sum']
+            yield '_count', labels, histogram['count']
+
+        metric('jobs_total', 'counter', 'Jobs finalizados por estado',
+               [('', {'state': state}, count) for state, count in data['jobs_total'].items()])
+        metric('jobs_active', 'gauge', 'Jobs em andamento', [('', {}, data['jobs_active'])])
+        metric('failures_total', 'counter', 'Falhas por operação e classe de erro',
+               [('', {'operation': f['operation'], 'error': f['error']}, f['count'])
+                for f in data['failures_total']])
+        metric('downloaded_bytes_total', 'counter', 'Bytes baixados',
+               [('', {}, data['downloaded_bytes_total'])])
+        metric('phase_seconds', 'histogram', 'Duração de cada fase dos jobs',
+               [s for name, h in data['phase_seconds'].items() for s in histogram_samples(h, {'phase': name})])
+        metric('call_seconds', 'histogram', 'Duração das chamadas ao YouTubeDownloader',
+               [s for name, h in data['call_seconds'].items() for s in histogram_samples(h, {'call': name})])
+        metric('throughput_bytes_per_second', 'histogram', 'Taxa média de cada transferência',
+               list(histogram_samples(data['throughput_bytes_per_second'], {})))
+
+        cache = data.get('cache')
+        if cache and 'error' not in cache:
+            metric('cache_requests_total', 'counter', 'Consultas ao cache de metadados',
+                   [('', {'result': 'memory_hit'}, cache['memory_hits']),
+                    ('', {'result': 'disk_hit'}, cache['disk_hits']),
+                    ('', {'result': 'miss'}, cache['misses'])])
+            metric('cache_hit_ratio', 'gauge', 'Taxa de acerto do cache de metadados',
+                   [('', {}, cache['hit_rate'])])
+        return '\n'.join(lines) + '\n'
+
+    def write_json(self, path: str) -> None:
+        _write_atomic(path, json.dumps(self.snapshot(), ensure_ascii=False, indent=2))
+
+    def write_textfile(self, path: str) -> None:
+        # O node_exporter pode ler o arquivo a qualquer momento: escrever e renomear
+        _write_atomic(path, self.prometheus_text())
+
+    def start_exporter(self, json_path: Optional[str] = config.METRICS_JSON_PATH,
+                       textfile_path: Optional[str] = config.METRICS_TEXTFILE_PATH,
+                       interval: float = config.METRICS_EXPORT_INTERVAL) -> threading.Event:
+        """Grava os arquivos periodicamente; retorna um Event que encerra a exportação"""
+        stop = threading.Event()
+
+        def export():
+            while True:
+                self.export(json_path, textfile_path)
+                if stop.wait(interval):
+                    self.export(json_path, textfile_path)
+                    return
+
+        threading.Thread(target=export, name='metrics-export', daemon=True).start()
+        return stop
+
+    def export(self, json_path: Optional[str], textfile_path: Optional[str]) -> None:
+        try:
+            if json_path:
+                self.write_json(json_path)
+            if textfile_path:
+                self.write_textfile(textfile_path)
+        except OSError:
+            pass
+
+
+class InstrumentedDownloader:
+    """Envolve um YouTubeDownloader medindo as chamadas sem alterar os resultados.
+
+    Os demais atributos são repassados ao downloader original, então a
+    instância pode ser usada no lugar dele (fila, GUI, CLI).
+    """
+
+    TIMED_CALLS = ('extract_info', 'get_video_info', 'get_available_formats')
+
+    def __init__(self, downloader, metrics: Metrics):
+        self._downloader = downloader
+        self.metrics = metrics
+        metrics.add_collector('cache', lambda: downloader.cache.stats())
+
+    def __getattr__(self, name):
+        attr = getattr(self._downloader, name)
+        if name in self.TIMED_CALLS:
+            return self._timed(name, attr)
+        return attr
+
+    def _timed(self, name: str, function: Callable) -> Callable:
+        def call(*args, **kwargs):
+            started = time.perf_counter()
+            try:
+                return function(*args, **kwargs)
+            except Exception as e:
+                self.metrics.observe_failure(name, e)
+                raise
+            finally:
+                self.metrics.observe_call(name, time.perf_counter() - started)
+        return call
+
+    def download_video(self, url: str, options: Dict, progress_callback: Callable = None,
+                       info: Optional[Dict[str, Any]] = None,
+                       postprocessor_callback: Callable = None) -> Dict[str, Any]:
+        job_id = options.get('job_id')
+        transfer = {'first': None, 'last': None, 'bytes': {}}
+
+        def metrics_hook(d):
+            status = d.get('status')
+            if status == 'downloading' and d.get('downloaded_bytes'):
+                if transfer['first'] is None:
+                    transfer['first'] = time.time()
+                    self.metrics.mark(job_id, 'first_byte', transfer['first'])
+            if status in ('downloading', 'finished'):
+                key = d.get('filename') or d.get('tmpfilename')
+                transfer['bytes'][key] = d.get('downloaded_bytes') or d.get('total_bytes') or 0
+            if status == 'finished':
+                transfer['last'] = time.time()
+            if progress_callback is not None:
+                progress_callback(d)
+
+        started = time.perf_counter()
+        try:
+            stats = self._downloader.download_video(url, options, metrics_hook, info=info,
+                                                    postprocessor_callback=postprocessor_callback)
+        except Exception as e:
+            self.metrics.observe_failure('download_video', e)
+            raise
+        finally:
+            self.metrics.observe_call('download_video', time.perf_counter() - started)
+
+        if transfer['first'] is not None:
+            # Fim do último stream (antes da mesclagem/conversão feitas pelo yt-dlp)
+            ended = transfer['last'] or time.time()
+            self.metrics.mark(job_id, 'transferred', ended)
+            self.metrics.observe_transfer(sum(transfer['bytes'].values()), ended - transfer['first'])
+        return stats
+
+
+def _escape(value: Any) -> str:
+    return str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+def _number(value: Any) -> str:
+    if value is None:
+        return 'NaN'
+    if isinstance(value, float):
+        return repr(value)
+    return str(value)
+
+
+def _write_atomic(path: str, text: str) -> None:
+    os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+    tmp = f"{path}.tmp"
+    with open(tmp, 'w', encoding='utf-8') as f:
+        f.write(text)
+    os.replace(tmp, path)
@@ -0,0 +1,192 @@
+# ytdowloader\src\postprocess.py
+
+import os
+import shutil
+import subprocess
+import threading
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, List, Optional
+
+from . import config
+from .formats import AUDIO_ONLY, FormatTable
+
+# Codec de saída -> (extensão, argumentos do ffmpeg), como o FFmpegExtractAudio do yt-dlp
+AUDIO_CODECS = {
+    'mp3': ('mp3', ['-c:a', 'libmp3lame']),
+    'm4a': ('m4a', ['-c:a', 'aac', '-f', 'ipod']),
+    'opus': ('opus', ['-c:a', 'libopus']),
+    'ogg': ('ogg', ['-c:a', 'libvorbis']),
+    'wav': ('wav', ['-c:a', 'pcm_s16le']),
+}
+
+# Codec de saída -> prefixos de `acodec` da fonte que podem ir para a saída sem recodificar
+COPYABLE_SOURCES = {
+    'mp3': ('mp3',),
+    'm4a': ('mp4a', 'aac'),
+    'opus': ('opus',),
+    'ogg': ('vorbis',),
+    'wav': (),
+}
+
+# Argumentos do ffmpeg para trocar só o contêiner
+REMUX_ARGS = {
+    'm4a': ['-c:a', 'copy', '-f', 'ipod'],
+}
+
+# Nome do codec no FFmpegExtractAudio do yt-dlp, quando difere do nosso
+YTDLP_CODECS = {'ogg': 'vorbis'}
+
+# Caminhos do plano de áudio
+COPY = 'copy'            # o arquivo baixado já é a saída
+REMUX = 'remux'          # mesmo codec, outro contêiner (ffmpeg -c:a copy)
+TRANSCODE = 'transcode'  # recodificação inevitável
+
+
+@dataclass(frozen=True)
+class AudioPlan:
+    """Fonte e caminho escolhidos para um download de áudio"""
+    format_id: str
+    action: str
+    codec: str
+    source_codec: str
+    source_abr: int
+    bitrate: Optional[int] = None  # kbps da recodificação (nunca acima da fonte)
+
+
+def plan_audio(info: Dict[str, Any], codec: str, quality: Optional[str] = None,
+               format_id: Optional[str] = None) -> Optional[AudioPlan]:
+    """Escolhe o stream de áudio e o caminho (cópia, remux ou recodificação) para `codec`
+
+    Streams cujo codec já é o pedido vencem qualquer outro, mesmo com
+    bitrate menor: copiar não perde qualidade, recodificar sempre perde.
+    Entre eles fica o menor bitrate que atende `quality` (o maior, se
+    nenhum atender ou sem `quality`). Sem stream compatível, recodifica o de maior bitrate,
+    com bitrate de saída limitado ao da fonte. Com `format_id` (formato
+    fixado), só decide o caminho para ele. Retorna None quando o vídeo não
+    tem streams só de áudio.
+    """
+    table = FormatTable.from_info(info)
+    candidates = table.indices(AUDIO_ONLY)
+    if format_id is not None:
+        candidates = [i for i in candidates if table.format_id[i] == str(format_id)]
+    if not candidates or codec not in AUDIO_CODECS:
+        return None
+    target = int(quality) if quality and str(quality).isdigit() else 0
+
+    compatible = [i for i in candidates if table.acodec[i].startswith(COPYABLE_SOURCES[codec])]
+    if compatible:
+        enough = [i for i in compatible if table.abr[i] >= target] if target else []
+        i = min(enough, key=lambda i: table.abr[i]) if enough else max(compatible, key=lambda i: table.abr[i])
+        ext, _ = AUDIO_CODECS[codec]
+        action = COPY if table.ext[i] == ext else REMUX
+        return AudioPlan(table.format_id[i], action, codec, table.acodec[i], int(table.abr[i]))
+
+    i = max(candidates, key=lambda i: table.abr[i])
+    source_abr = int(table.abr[i])
+    bitrate = None
+    if codec != 'wav':
+        bitrate = min(target or source_abr, source_abr) if source_abr else (target or None)
+    return AudioPlan(table.format_id[i], TRANSCODE, codec, table.acodec[i], source_abr, bitrate)
+
+
+class PostProcessError(Exception):
+    pass
+
+
+def find_ffmpeg() -> str:
+    ffmpeg = shutil.which('ffmpeg')
+    if not ffmpeg:
+        raise PostProcessError("ffmpeg não encontrado no PATH")
+    return ffmpeg
+
+
+def extract_audio_command(ffmpeg: str, source: str, output: str, codec: str,
+                          quality: Optional[str]) -> List[str]:
+    """Linha de comando do ffmpeg para converter `source` no codec pedido"""
+    _, codec_args = AUDIO_CODECS[codec]
+    command = [ffmpeg, '-y', '-loglevel', 'error', '-i', source, '-vn'] + codec_args
+    if quality and codec != 'wav':
+        command += ['-b:a', f"{quality}k"]
+    return command + [output]
+
+
+def remux_audio_command(ffmpeg: str, source: str, output: str, codec: str) -> List[str]:
+    """Linha de comando do ffmpeg para trocar o contêiner sem recodificar"""
+    return [ffmpeg, '-y', '-loglevel', 'error', '-i', source, '-vn'] + REMUX_ARGS.get(codec, ['-c:a', 'copy']) + [output]
+
+
+def extract_audio(source: str, codec: str, quality: Optional[str] = None,
+                  keep_source: bool = False, action: str = TRANSCODE) -> Dict[str, Any]:
+    """Leva o arquivo baixado ao formato de áudio pedido pelo caminho `action` do plano
+
+    Retorna o caminho de saída, o caminho usado (`audio_path`) e o tempo
+    gasto (`transcode_time`).
+    """
+    if codec not in AUDIO_CODECS:
+        raise PostProcessError(f"Formato de áudio não suportado: {codec}")
+    ext, _ = AUDIO_CODECS[codec]
+    started = time.perf_counter()
+    if action == COPY and source.endswith(f".{ext}"):
+        return {'filepath': source, 'audio_path': COPY, 'transcode_time': 0.0}
+    if action == COPY:
+        action = REMUX
+    output = f"{os.path.splitext(source)[0]}.{ext}"
+    if os.path.abspath(output) == os.path.abspath(source):
+        output = f"{os.path.splitext(source)[0]}.converted.{ext}"
+
+    tmp_output = f"{os.path.splitext(output)[0]}.temp.{ext}"
+    if action == REMUX:
+        command = remux_audio_command(find_ffmpeg(), source, tmp_output, codec)
+    else:
+        command = extract_audio_command(find_ffmpeg(), source, tmp_output, codec, quality)
+    result = subprocess.run(command, capture_output=True, text=True)
+    if result.returncode != 0:
+        if os.path.exists(tmp_output):
+            os.remove(tmp_output)
+        raise PostProcessError(f"ffmpeg falhou: {result.stderr.strip()[-500:]}")
+    os.replace(tmp_output, output)
+    if not keep_source:
+        os.remove(source)
+    return {'filepath': output, 'audio_path': action, 'transcode_time': time.perf_counter() - started}
+
+
+class PostProcessStage:
+    """Estágio de pós-processamento separado dos downloads.
+
+    As conversões rodam em processos do ffmpeg, até `max_workers` ao mesmo
+    tempo (padrão: número de núcleos), enquanto as threads de download
+    voltam a baixar. `submit` bloqueia quando já existem `max_pending`
+    arquivos brutos esperando ou em conversão, para que uma rede rápida não
+    acumule arquivos sem limite no disco.
+    """
+
+    def __init__(self, max_workers: int = config.POSTPROCESS_WORKERS,
+                 max_pending: int = config.POSTPROCESS_MAX_PENDING):
+        self.max_workers = max_workers
+        self.max_pending = max_pending
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix='postprocess')
+        self._slots = threading.BoundedSemaphore(max_pending)
+
+    def submit(self, function: Callable, *args, callback: Optional[Callable[[Future], None]] = None,
+               **kwargs) -> Future:
+        """Agenda `function(*args, **kwargs)`; bloqueia enquanto o estágio estiver cheio"""
+        self._slots.acquire()
+        try:
+            future = self._executor.submit(function, *args, **kwargs)
+        except Exception:
+            self._slots.release()
+            raise
+        future.add_done_callback(lambda _: self._slots.release())
+        if callback is not None:
+            future.add_done_callback(callback)
+        return future
+
+    def submit_extract_audio(self, source: str, codec: str, quality: Optional[str] = None,
+                             callback: Optional[Callable[[Future], None]] = None,
+                             action: str = TRANSCODE) -> Future:
+        return self.submit(extract_audio, source, codec, quality, callback=callback, action=action)
+
+    def shutdown(self, wait: bool = True) -> None:
+        self._executor.shutdown(wait=wait)
@@ -0,0 +1,106 @@
+# ytdowloader\src\prefetch.py
+
+import re
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Dict, Iterable, List
+
+from . import config
+from .log_sink import logger
+from .urls import canonical_url, url_key, youtube_id
+
+URL_RE = re.compile(r'https?://\S+')
+
+
+def find_urls(text: str) -> List[str]:
+    """URLs http(s) contidas num texto colado (uma ou várias, separadas por espaço ou linha)"""
+    return URL_RE.findall(text)
+
+
+class Prefetcher:
+    """Extração especulativa de metadados enquanto o usuário ainda não pediu.
+
+    `prefetch(urls)` agenda a extração das URLs de vídeo em segundo plano;
+    o resultado vai para o cache de metadados do downloader, e como a
+    extração passa pelo single-flight de `extract_info`, uma busca explícita
+    feita durante o prefetch espera por ele em vez de repetir a extração.
+    Um novo `prefetch` substitui o anterior: o que ainda não começou e não
+    está na nova lista é cancelado (o que já começou termina e fica no cache).
+    No máximo `max_workers` extrações rodam ao mesmo tempo e no máximo
+    `max_urls` URLs são agendadas por chamada.
+    """
+
+    def __init__(self, downloader, max_workers: int = config.PREFETCH_WORKERS,
+                 max_urls: int = config.PREFETCH_MAX_URLS):
+        self.downloader = downloader
+        self.max_workers = max_workers
+        self.max_urls = max_urls
+        self.started = 0
+        self.completed = 0
+        self.cancelled = 0
+        self.failed = 0
+        # Reentrante: cancel() e submit() podem chamar _done na mesma thread, com o lock adquirido
+        self._lock = threading.RLock()
+        self._executor = None
+        self._futures: Dict[str, Future] = {}
+
+    def prefetch(self, urls: Iterable[str]) -> int:
+        """Agenda as URLs (substituindo o pedido anterior); retorna quantas foram agendadas agora"""
+        wanted = {}
+        for url in urls:
+            key = url_key(url)
+            if key not in wanted and len(wanted) < self.max_urls:
+                wanted[key] = url
+        scheduled = 0
+        with self._lock:
+            for key, future in list(self._futures.items()):
+                if key not in wanted and future.cancel():
+                    self.cancelled += 1
+                    self._futures.pop(key, None)
+            if self._executor is None:
+                self._executor = ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix='prefetch')
+            for key, url in wanted.items():
+                if key in self._futures:
+                    continue
+                future = self._executor.submit(self._extract, url)
+                future.add_done_callback(lambda f, key=key: self._done(key, f))
+                self._futures[key] = future
+                scheduled += 1
+        return scheduled
+
+    def cancel(self) -> None:
+        """Cancela o que ainda não começou"""
+        self.prefetch(())
+
+    def shutdown(self) -> None:
+        with self._lock:
+            executor, self._executor = self._executor, None
+        if executor is not None:
+            executor.shutdown(wait=False, cancel_futures=True)
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            return {'started': self.started, 'completed': self.completed, 'cancelled': self.cancelled,
+                    'failed': self.failed, 'pending': len(self._futures)}
+
+    def _extract(self, url: str) -> None:
+        video_id = youtube_id(url)
+        if video_id is None and self.downloader.video_key(url) is None:
+            return  # página genérica ou playlist: só extrai quando o usuário pedir
+        with self._lock:
+            self.started += 1
+        # Vídeo do YouTube pela URL canônica: um "&list=" na URL não vira extração da playlist
+        self.downloader.extract_info(canonical_url(url) if video_id else url)
+
+    def _done(self, key: str, future: Future) -> None:
+        with self._lock:
+            if self._futures.get(key) is future:
+                del self._futures[key]
+            if future.cancelled():
+                return
+            error = future.exception()
+            if error is None:
+                self.completed += 1
+                return
+            self.failed += 1
+        logger.debug(f"Prefetch falhou: {error}")
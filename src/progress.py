@@ -0,0 +1,160 @@
+# ytdowloader\src\progress.py
+
+import threading
+import time
+from typing import Any, Dict, List, Optional
+
+# Fases de um job durante a transferência
+DOWNLOADING = 'downloading'
+MERGING = 'merging'
+POSTPROCESSING = 'post-processing'
+
+
+class JobProgress:
+    """Estado de progresso agregado de um job (vários streams + mesclagem + pós-processamento)"""
+
+    __slots__ = ('job_id', 'phase', 'streams', 'stream', 'filename', 'downloaded', 'total',
+                 'speed', 'eta', 'postprocessor', 'dirty', '_sample_bytes', '_sample_time')
+
+    def __init__(self, job_id: int, streams: int = 1):
+        self.job_id = job_id
+        self.phase = DOWNLOADING
+        self.streams = max(streams, 1)
+        self.stream = 0
+        self.filename = None
+        self.downloaded = 0
+        self.total = None
+        self.speed = None
+        self.eta = None
+        self.postprocessor = None
+        self.dirty = False
+        self._sample_bytes = 0
+        self._sample_time = None
+
+    @property
+    def percent(self) -> float:
+        """Progresso geral: cada stream vale uma fração igual; mesclagem/pós-processamento = 100%"""
+        if self.phase != DOWNLOADING:
+            return 100.0
+        fraction = self.downloaded / self.total if self.total else 0.0
+        return min((self.stream + fraction) / self.streams * 100, 100.0)
+
+    def snapshot(self) -> Dict[str, Any]:
+        return {
+            'phase': self.phase,
+            'percent': self.percent,
+            'stream': self.stream + 1,
+            'streams': self.streams,
+            'downloaded_bytes': self.downloaded,
+            'total_bytes': self.total,
+            'speed': self.speed,
+            'eta': self.eta,
+            'filename': self.filename,
+            'postprocessor': self.postprocessor,
+        }
+
+
+class ProgressAggregator:
+    """Junta os callbacks de progresso do yt-dlp e entrega no máximo um snapshot por job a cada `drain()`.
+
+    Os hooks só atualizam números sob um lock (custo constante por chamada);
+    quem desenha a interface chama `drain()` no seu próprio ritmo (um único
+    timer para todos os jobs) e recebe apenas os jobs que mudaram. A
+    velocidade é suavizada por média móvel exponencial e o ETA é calculado
+    a partir dela.
+    """
+
+    MIN_SAMPLE_INTERVAL = 0.2  # segundos entre amostras de velocidade
+
+    def __init__(self, smoothing: float = 0.3):
+        self.smoothing = smoothing
+        self._lock = threading.Lock()
+        self._jobs: Dict[int, JobProgress] = {}
+
+    def start(self, job_id: int, streams: int = 1) -> None:
+        with self._lock:
+            self._jobs[job_id] = JobProgress(job_id, streams)
+
+    def remove(self, job_id: int) -> None:
+        with self._lock:
+            self._jobs.pop(job_id, None)
+
+    def progress_hook(self, job_id: int):
+        """Hook no contrato dos `progress_hooks` do yt-dlp"""
+        return lambda d: self.update(job_id, d)
+
+    def postprocessor_hook(self, job_id: int):
+        """Hook no contrato dos `postprocessor_hooks` do yt-dlp"""
+        def hook(d):
+            if d.get('status') == 'started':
+                name = d.get('postprocessor') or ''
+                self.set_phase(job_id, MERGING if name == 'Merger' else POSTPROCESSING, name)
+        return hook
+
+    def update(self, job_id: int, d: Dict[str, Any]) -> None:
+        now = time.monotonic()
+        with self._lock:
+            job = self._jobs.get(job_id)
+            if job is None:
+                job = self._jobs[job_id] = JobProgress(job_id)
+
+            filename = d.get('filename')
+            if filename and job.filename and filename != job.filename and job.phase == DOWNLOADING:
+                # Novo arquivo: próximo stream (vídeo e áudio separados)
+                if job.stream + 1 >= job.streams:
+                    job.streams = job.stream + 2
+                job.stream += 1
+                job.downloaded = 0
+                job.total = None
+                job._sample_time = None
+            job.filename = filename or job.filename
+
+            status = d.get('status')
+            if status == 'downloading':
+                job.phase = DOWNLOADING
+                job.downloaded = d.get('downloaded_bytes') or 0
+                job.total = d.get('total_bytes') or d.get('total_bytes_estimate') or job.total
+                self._sample_speed(job, now)
+            elif status == 'finished':
+                job.downloaded = d.get('downloaded_bytes') or d.get('total_bytes') or job.downloaded
+                job.total = job.total or job.downloaded
+                if job.stream + 1 >= job.streams:
+                    # Último stream baixado: o que vier agora é mesclagem/pós-processamento
+                    job.phase = MERGING if job.streams > 1 else POSTPROCESSING
+                    job.eta = 0
+            job.dirty = True
+
+    def set_phase(self, job_id: int, phase: str, postprocessor: Optional[str] = None) -> None:
+        with self._lock:
+            job = self._jobs.get(job_id)
+            if job is None:
+                job = self._jobs[job_id] = JobProgress(job_id)
+            job.phase = phase
+            job.postprocessor = postprocessor
+            job.dirty = True
+
+    def drain(self) -> List[Dict[str, Any]]:
+        """Snapshots dos jobs que mudaram desde a última chamada"""
+        with self._lock:
+            changed = []
+            for job in self._jobs.values():
+                if job.dirty:
+                    job.dirty = False
+                    snapshot = job.snapshot()
+                    snapshot['job_id'] = job.job_id
+                    changed.append(snapshot)
+            return changed
+
+    def _sample_speed(self, job: JobProgress, now: float) -> None:
+        if job._sample_time is None:
+            job._sample_time, job._sample_bytes = now, job.downloaded
+            return
+        elapsed = now - job._sample_time
+        if elapsed < self.MIN_SAMPLE_INTERVAL:
+            return
+        instant = max(job.downloaded - job._sample_bytes, 0) / elapsed
+        job.speed = instant if job.speed is None else (
+            self.smoothing * instant + (1 - self.smoothing) * job.speed)
+        job._sample_time, job._sample_bytes = now, job.downloaded
+        if job.speed and job.total:
+            job.eta = max(job.total - job.downloaded, 0) / job.speed
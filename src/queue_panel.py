@@ -0,0 +1,306 @@
+# ytdowloader\src\queue_panel.py
+
+import tkinter as tk
+from tkinter import ttk
+from typing import Dict, Iterable, List, Optional, Set
+
+from .download_queue import JobState
+
+COLUMNS = ('job_id', 'state', 'progress', 'priority', 'title')
+HEADINGS = {'job_id': '#', 'state': 'Estado', 'progress': 'Progresso', 'priority': 'Prioridade', 'title': 'Título'}
+COLUMN_WIDTHS = {'job_id': 60, 'state': 110, 'progress': 80, 'priority': 80, 'title': 360}
+STATE_LABELS = {
+    JobState.QUEUED: 'Na fila',
+    JobState.PAUSED: 'Pausado',
+    JobState.EXTRACTING: 'Obtendo info',
+    JobState.DOWNLOADING: 'Baixando',
+    JobState.POSTPROCESSING: 'Processando',
+    JobState.DONE: 'Concluído',
+    JobState.FAILED: 'Falhou',
+    JobState.CANCELLED: 'Cancelado',
+}
+STATE_ORDER = {state: n for n, state in enumerate(JobState)}  # ordenação pela coluna de estado
+ALL_STATES = 'Todos'
+
+
+class QueueRow:
+    """Uma linha da tabela da fila (só o que é exibido)"""
+
+    __slots__ = ('job_id', 'state', 'progress', 'priority', 'title')
+
+    def __init__(self, job_id: int, state: JobState = JobState.QUEUED, priority: int = 0, title: str = ''):
+        self.job_id = job_id
+        self.state = state
+        self.progress = 0.0
+        self.priority = priority
+        self.title = title
+
+    def values(self) -> tuple:
+        return (f"#{self.job_id}", STATE_LABELS.get(self.state, self.state.value),
+                f"{self.progress:.0f}%", self.priority, self.title)
+
+
+class QueueModel:
+    """Estado da tabela da fila, alimentado em lote pelos eventos do DownloadQueue.
+
+    Mantém uma linha por job, a ordenação e o filtro por estado. A lista
+    visível (ids na ordem exibida) só é recalculada quando algo que afeta a
+    ordem ou o filtro muda; `changed` acumula os jobs cujos valores mudaram
+    desde o último `take_changed`, para a view atualizar só essas linhas.
+    """
+
+    def __init__(self):
+        self.rows: Dict[int, QueueRow] = {}
+        self.sort_column = 'job_id'
+        self.reverse = False
+        self.state_filter: Optional[JobState] = None
+        self.changed: Set[int] = set()
+        self._view: Optional[List[int]] = None
+
+    def load(self, jobs: Iterable) -> None:
+        """Preenche a partir de DownloadJobs existentes"""
+        for job in jobs:
+            row = self.rows[job.job_id] = QueueRow(job.job_id, job.state, job.priority, job.url)
+            row.progress = job.progress
+        self._view = None
+
+    def apply(self, events: Iterable) -> int:
+        """Aplica um lote de JobEvents; retorna quantos alteraram alguma linha"""
+        applied = 0
+        for event in events:
+            row = self.rows.get(event.job_id)
+            if row is None:
+                row = self.rows[event.job_id] = QueueRow(event.job_id, event.state,
+                                                         title=event.data.get('url', ''))
+                self._view = None
+            if event.kind == 'progress':
+                if row.state.finished or row.progress == event.data.get('percent', row.progress):
+                    continue
+                row.progress = event.data['percent']
+                if self.sort_column == 'progress':
+                    self._view = None
+            elif event.kind == 'priority':
+                row.priority = event.data['priority']
+                if self.sort_column == 'priority':
+                    self._view = None
+            else:
+                if event.data.get('title'):
+                    row.title = event.data['title']
+                    if self.sort_column == 'title':
+                        self._view = None
+                if event.state != row.state:
+                    row.state = event.state
+                    if event.state == JobState.DONE:
+                        row.progress = 100.0
+                    if self.state_filter is not None or self.sort_column == 'state':
+                        self._view = None
+            self.changed.add(event.job_id)
+            applied += 1
+        return applied
+
+    def sort(self, column: str, reverse: Optional[bool] = None) -> None:
+        """Ordena pela coluna; sem `reverse`, clicar de novo na mesma coluna inverte a ordem"""
+        if reverse is None:
+            reverse = not self.reverse if column == self.sort_column else False
+        self.sort_column, self.reverse = column, reverse
+        self._view = None
+
+    def set_filter(self, state: Optional[JobState]) -> None:
+        self.state_filter = state
+        self._view = None
+
+    def view(self) -> List[int]:
+        """Ids dos jobs que passam no filtro, na ordem exibida"""
+        if self._view is None:
+            rows = self.rows.values()
+            if self.state_filter is not None:
+                rows = [row for row in rows if row.state == self.state_filter]
+            if self.sort_column == 'title':
+                key = lambda row: (row.title.casefold(), row.job_id)
+            elif self.sort_column == 'state':
+                key = lambda row: (STATE_ORDER[row.state], row.job_id)
+            else:
+                column = self.sort_column
+                key = lambda row: (getattr(row, column), row.job_id)
+            self._view = [row.job_id for row in sorted(rows, key=key, reverse=self.reverse)]
+        return self._view
+
+    def window(self, start: int, count: int) -> List[QueueRow]:
+        """As linhas visíveis a partir da posição `start`"""
+        return [self.rows[job_id] for job_id in self.view()[start:start + count]]
+
+    def take_changed(self) -> Set[int]:
+        changed, self.changed = self.changed, set()
+        return changed
+
+    def counts(self) -> Dict[JobState, int]:
+        counts = dict.fromkeys(JobState, 0)
+        for row in self.rows.values():
+            counts[row.state] += 1
+        return counts
+
+
+class QueuePanel(ttk.Frame):
+    """Tabela da fila de downloads que aguenta milhares de jobs.
+
+    O Treeview tem um número fixo de itens (as linhas que cabem na tela);
+    a rolagem só troca qual trecho da lista do `QueueModel` eles mostram, e
+    cada item só é reconfigurado quando o valor exibido muda. A seleção é
+    guardada por id de job, então sobrevive à rolagem, ao filtro e à
+    reordenação. As ações em lote (pausar, retomar, cancelar, prioridade)
+    valem para todos os jobs selecionados, visíveis ou não.
+    """
+
+    def __init__(self, master, download_queue, rows: int = 12, **kwargs):
+        super().__init__(master, **kwargs)
+        self.download_queue = download_queue  # pode ser ligada depois (a GUI cria a fila em segundo plano)
+        self.model = QueueModel()
+        self.rows = rows
+        self.offset = 0
+        self.selected: Set[int] = set()
+        self._slots = [f"slot{n}" for n in range(rows)]
+        self._slot_jobs: List[Optional[int]] = [None] * rows
+        self._slot_values: List[Optional[tuple]] = [None] * rows
+
+        toolbar = ttk.Frame(self)
+        toolbar.pack(fill=tk.X, pady=(0, 5))
+        ttk.Label(toolbar, text="Estado:").pack(side=tk.LEFT)
+        self.filter_var = tk.StringVar(value=ALL_STATES)
+        state_filter = ttk.Combobox(toolbar, textvariable=self.filter_var, state='readonly', width=14,
+                                    values=[ALL_STATES] + [STATE_LABELS[state] for state in JobState])
+        state_filter.pack(side=tk.LEFT, padx=(5, 10))
+        state_filter.bind('<<ComboboxSelected>>', self._on_filter)
+        for text, command in (("Pausar", self.pause_selected), ("Retomar", self.resume_selected),
+                              ("Cancelar", self.cancel_selected),
+                              ("Prioridade +", lambda: self.change_priority(1)),
+                              ("Prioridade -", lambda: self.change_priority(-1))):
+            ttk.Button(toolbar, text=text, command=command).pack(side=tk.LEFT, padx=2)
+        self.summary_label = ttk.Label(toolbar, text="")
+        self.summary_label.pack(side=tk.RIGHT)
+
+        table = ttk.Frame(self)
+        table.pack(fill=tk.BOTH, expand=True)
+        self.tree = ttk.Treeview(table, columns=COLUMNS, show='headings', height=rows, selectmode='extended')
+        for column in COLUMNS:
+            self.tree.heading(column, text=HEADINGS[column], command=lambda c=column: self.sort_by(c))
+            self.tree.column(column, width=COLUMN_WIDTHS[column], stretch=column == 'title',
+                             anchor=tk.W if column == 'title' else tk.CENTER)
+        for slot in self._slots:
+            self.tree.insert('', tk.END, iid=slot)
+            self.tree.detach(slot)
+        self.tree.pack(side=tk.LEFT, fill=tk.BOTH, expand=True)
+        self.scrollbar = ttk.Scrollbar(table, orient='vertical', command=self._on_scroll)
+        self.scrollbar.pack(side=tk.RIGHT, fill=tk.Y)
+
+        self.tree.bind('<<TreeviewSelect>>', self._on_select)
+        # O bind_all da janela rola o canvas; "break" mantém a roda do mouse na tabela
+        self.tree.bind('<MouseWheel>', lambda e: self._scroll_by(-int(e.delta / 120) * 3))
+        self.tree.bind('<Button-4>', lambda e: self._scroll_by(-3))
+        self.tree.bind('<Button-5>', lambda e: self._scroll_by(3))
+        self._update_headings()
+
+    def apply(self, events: List) -> None:
+        """Aplica um lote de eventos da fila e redesenha (chamado na thread da interface)"""
+        if events and self.model.apply(events):
+            self.render()
+
+    def render(self) -> None:
+        """Mostra o trecho visível, mexendo só nos itens cujo conteúdo mudou"""
+        view = self.model.view()
+        self.offset = max(0, min(self.offset, len(view) - self.rows))
+        window = self.model.window(self.offset, self.rows)
+        changed = self.model.take_changed()
+        selection = []
+        for n, slot in enumerate(self._slots):
+            row = window[n] if n < len(window) else None
+            if row is None:
+                if self._slot_jobs[n] is not None:
+                    self.tree.detach(slot)
+                    self._slot_jobs[n] = self._slot_values[n] = None
+                continue
+            if self._slot_jobs[n] is None:
+                self.tree.move(slot, '', n)
+            if self._slot_jobs[n] != row.job_id or row.job_id in changed:
+                values = row.values()
+                if values != self._slot_values[n]:
+                    self.tree.item(slot, values=values)
+                    self._slot_values[n] = values
+                self._slot_jobs[n] = row.job_id
+            if row.job_id in self.selected:
+                selection.append(slot)
+        if set(selection) != set(self.tree.selection()):
+            self.tree.selection_set(selection)
+        if view:
+            self.scrollbar.set(self.offset / len(view), min(1.0, (self.offset + self.rows) / len(view)))
+        else:
+            self.scrollbar.set(0.0, 1.0)
+        self._update_summary(len(view))
+
+    def sort_by(self, column: str) -> None:
+        self.model.sort(column)
+        self._update_headings()
+        self.render()
+
+    def pause_selected(self) -> int:
+        return self._bulk(lambda job_id: self.download_queue.pause(job_id))
+
+    def resume_selected(self) -> int:
+        return self._bulk(lambda job_id: self.download_queue.resume(job_id))
+
+    def cancel_selected(self) -> int:
+        return self._bulk(lambda job_id: self.download_queue.cancel(job_id))
+
+    def change_priority(self, delta: int) -> int:
+        def bump(job_id):
+            job = self.download_queue.get(job_id)
+            return job is not None and self.download_queue.set_priority(job_id, job.priority + delta)
+        return self._bulk(bump)
+
+    def _bulk(self, action) -> int:
+        """Aplica a ação aos jobs selecionados; o resultado chega depois pelos eventos da fila"""
+        return sum(1 for job_id in sorted(self.selected) if action(job_id))
+
+    def _on_select(self, event=None) -> None:
+        slots = set(self.tree.selection())
+        for slot, job_id in zip(self._slots, self._slot_jobs):
+            if job_id is None:
+                continue
+            if slot in slots:
+                self.selected.add(job_id)
+            else:
+                self.selected.discard(job_id)
+
+    def _on_filter(self, event=None) -> None:
+        label = self.filter_var.get()
+        state = next((s for s, text in STATE_LABELS.items() if text == label), None)
+        self.model.set_filter(state)
+        self.offset = 0
+        self.render()
+
+    def _on_scroll(self, *args) -> None:
+        total = len(self.model.view())
+        if args[0] == 'moveto':
+            self.offset = int(float(args[1]) * total)
+        elif args[0] == 'scroll':
+            step = self.rows if args[2] == 'pages' else 1
+            self.offset += int(args[1]) * step
+        self.render()
+
+    def _scroll_by(self, rows: int) -> str:
+        self.offset += rows
+        self.render()
+        return 'break'
+
+    def _update_headings(self) -> None:
+        for column in COLUMNS:
+            arrow = ''
+            if column == self.model.sort_column:
+                arrow = ' ▼' if self.model.reverse else ' ▲'
+            self.tree.heading(column, text=HEADINGS[column] + arrow)
+
+    def _update_summary(self, visible: int) -> None:
+        counts = self.model.counts()
+        active = counts[JobState.EXTRACTING] + counts[JobState.DOWNLOADING] + counts[JobState.POSTPROCESSING]
+        self.summary_label.config(text=f"{len(self.model.rows)} jobs, {visible} exibidos | "
+                                       f"{counts[JobState.QUEUED]} na fila, {active} ativos, "
+                                       f"{counts[JobState.PAUSED]} pausados")
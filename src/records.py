@@ -0,0 +1,78 @@
+# ytdowloader\src\records.py
+
+import sys
+from dataclasses import dataclass
+from typing import Any, Dict, Optional, Tuple
+
+from .formats import AUDIO_ONLY, FormatTable
+
+
+@dataclass(frozen=True, slots=True)
+class FormatRecord:
+    """Formato escolhível na interface; valores numéricos, texto só na exibição"""
+    format_id: str
+    ext: str
+    kind: int
+    height: int = 0
+    abr: int = 0
+    filesize: int = 0
+    note: str = ''
+
+    @property
+    def resolution(self) -> str:
+        return f"{self.height}p" if self.height else (self.note or 'unknown')
+
+    @property
+    def label(self) -> str:
+        """Texto da opção na lista de qualidades ("720p (mp4)", "128kbps (m4a)")"""
+        if self.kind == AUDIO_ONLY:
+            return f"{self.abr}kbps ({self.ext})"
+        return f"{self.resolution} ({self.ext})"
+
+    @classmethod
+    def from_table(cls, table: FormatTable, i: int) -> 'FormatRecord':
+        return cls(
+            format_id=sys.intern(table.format_id[i]),
+            ext=sys.intern(table.ext[i]),
+            kind=table.kind[i],
+            height=table.height[i],
+            abr=int(table.abr[i]),
+            filesize=table.filesize[i],
+            note='' if table.height[i] else sys.intern(table.note[i]),
+        )
+
+
+@dataclass(frozen=True, slots=True)
+class VideoRecord:
+    """Metadados de um vídeo mantidos em memória (fila, playlists, GUI).
+
+    Não guarda a descrição nem o info dict bruto: a descrição é lida sob
+    demanda do cache de metadados em disco (`YouTubeDownloader.get_description`).
+    """
+    key: Optional[str]
+    url: str
+    title: str
+    duration: int = 0
+    uploader: str = ''
+    view_count: int = 0
+    upload_date: str = ''
+    thumbnail: str = ''
+    video_formats: Tuple[FormatRecord, ...] = ()
+    audio_formats: Tuple[FormatRecord, ...] = ()
+
+    @classmethod
+    def from_info(cls, info: Dict[str, Any], url: Optional[str] = None) -> 'VideoRecord':
+        table = FormatTable.from_info(info)
+        key = f"{info['extractor_key']}:{info['id']}" if info.get('extractor_key') and info.get('id') else None
+        return cls(
+            key=key,
+            url=url or info.get('webpage_url') or '',
+            title=info.get('title') or 'Desconhecido',
+            duration=int(info.get('duration') or 0),
+            uploader=info.get('uploader') or 'Desconhecido',
+            view_count=int(info.get('view_count') or 0),
+            upload_date=info.get('upload_date') or '',
+            thumbnail=info.get('thumbnail') or '',
+            video_formats=tuple(FormatRecord.from_table(table, i) for i in table.video_choices()),
+            audio_formats=tuple(FormatRecord.from_table(table, i) for i in table.audio_choices()),
+        )
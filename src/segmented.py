@@ -0,0 +1,275 @@
+# ytdowloader\src\segmented.py
+
+import http.client
+import json
+import os
+import queue
+import threading
+import time
+from typing import Any, Callable, Dict, List, Optional, Tuple
+from urllib.parse import urljoin, urlsplit
+
+from . import config
+
+# Sufixo do arquivo temporário: não usa o ".part" do yt-dlp, que trataria o
+# arquivo pré-alocado (esparso) como um download retomável
+TMP_SUFFIX = '.seg.part'
+
+
+class SegmentError(Exception):
+    pass
+
+
+class _Connection:
+    """Conexão HTTP persistente de um worker (reaberta quando o host muda ou cai)"""
+
+    def __init__(self, timeout: float):
+        self.timeout = timeout
+        self._conn = None
+        self._origin = None
+
+    def request(self, url: str, headers: Dict[str, str], max_redirects: int = 5):
+        for _ in range(max_redirects + 1):
+            parts = urlsplit(url)
+            origin = (parts.scheme, parts.netloc)
+            if self._conn is None or self._origin != origin:
+                self.close()
+                conn_class = http.client.HTTPSConnection if parts.scheme == 'https' else http.client.HTTPConnection
+                self._conn = conn_class(parts.netloc, timeout=self.timeout)
+                self._origin = origin
+            path = parts.path or '/'
+            if parts.query:
+                path = f"{path}?{parts.query}"
+            try:
+                self._conn.request('GET', path, headers=headers)
+                response = self._conn.getresponse()
+            except (OSError, http.client.HTTPException):
+                self.close()
+                raise
+            if response.status in (301, 302, 303, 307, 308) and response.getheader('Location'):
+                response.read()
+                url = urljoin(url, response.getheader('Location'))
+                continue
+            return url, response
+        raise SegmentError("Redirecionamentos demais")
+
+    def close(self):
+        if self._conn is not None:
+            self._conn.close()
+            self._conn = None
+
+
+class SegmentedDownloader:
+    """Baixa um arquivo progressivo em faixas de bytes por várias conexões.
+
+    O arquivo `.seg.part` é pré-alocado e cada faixa é gravada no seu offset.
+    Faixas que falham são repetidas individualmente, e as concluídas ficam
+    registradas em `<arquivo>.seg.part.segments.json`, o que permite retomar
+    depois de uma queda. O progresso é reportado com o mesmo contrato dos
+    `progress_hooks` do yt-dlp.
+    """
+
+    def __init__(self, connections: int = config.SEGMENTED_CONNECTIONS,
+                 segment_size: int = config.SEGMENT_SIZE, max_retries: int = 5, timeout: float = 30,
+                 progress_hooks: Optional[List[Callable]] = None):
+        self.connections = connections
+        self.segment_size = segment_size
+        self.max_retries = max_retries
+        self.timeout = timeout
+        self.progress_hooks = progress_hooks or []
+
+        self._lock = threading.Lock()
+        self._downloaded = 0
+        self._started = 0.0
+
+    def probe(self, url: str, headers: Optional[Dict[str, str]] = None) -> Tuple[str, Optional[int], bool]:
+        """Retorna (url final, tamanho total, aceita Range)"""
+        conn = _Connection(self.timeout)
+        try:
+            final_url, response = conn.request(url, dict(headers or {}, Range='bytes=0-0'))
+            response.read()
+            if response.status == 206:
+                content_range = response.getheader('Content-Range') or ''
+                total = content_range.rpartition('/')[2]
+                return final_url, (int(total) if total.isdigit() else None), True
+            if response.status == 200:
+                length = response.getheader('Content-Length')
+                return final_url, (int(length) if length and length.isdigit() else None), False
+            raise SegmentError(f"HTTP {response.status}")
+        finally:
+            conn.close()
+
+    def download(self, url: str, filename: str, headers: Optional[Dict[str, str]] = None) -> Dict[str, Any]:
+        """Baixa `url` para `filename` e retorna estatísticas do download"""
+        headers = dict(headers or {})
+        self._started = time.monotonic()
+        url, total, ranges = self.probe(url, headers)
+        if not total or not ranges or total <= self.segment_size:
+            return self._download_single(url, filename, headers, total)
+
+        tmp_filename = filename + TMP_SUFFIX
+        map_filename = f"{tmp_filename}.segments.json"
+        segments = [(start, min(start + self.segment_size, total) - 1)
+                    for start in range(0, total, self.segment_size)]
+
+        done = self._load_map(map_filename, total)
+        if not os.path.exists(tmp_filename):
+            done = set()
+        resumed = len(done)
+        os.makedirs(os.path.dirname(os.path.abspath(filename)), exist_ok=True)
+        with open(tmp_filename, 'r+b' if os.path.exists(tmp_filename) else 'wb') as f:
+            f.truncate(total)
+
+        self._downloaded = sum(segments[i][1] - segments[i][0] + 1 for i in done)
+        pending = queue.Queue()
+        for index in range(len(segments)):
+            if index not in done:
+                pending.put((index, 0))
+
+        errors = []
+        workers = [threading.Thread(target=self._worker,
+                                    args=(url, headers, tmp_filename, map_filename, total,
+                                          segments, pending, done, errors), daemon=True)
+                   for _ in range(min(self.connections, pending.qsize()))]
+        for worker in workers:
+            worker.start()
+        for worker in workers:
+            worker.join()
+
+        if errors:
+            raise SegmentError(errors[0])
+
+        os.replace(tmp_filename, filename)
+        if os.path.exists(map_filename):
+            os.remove(map_filename)
+        self._report('finished', filename, tmp_filename, total)
+        return {'filename': filename, 'total_bytes': total, 'segments': len(segments),
+                'resumed_segments': resumed,
+                'elapsed': time.monotonic() - self._started}
+
+    def _worker(self, url, headers, tmp_filename, map_filename, total, segments, pending, done, errors):
+        conn = _Connection(self.timeout)
+        try:
+            with open(tmp_filename, 'r+b') as f:
+                while not errors:
+                    try:
+                        index, attempt = pending.get_nowait()
+                    except queue.Empty:
+                        return
+                    start, end = segments[index]
+                    try:
+                        self._fetch_segment(conn, url, headers, f, start, end, tmp_filename, total)
+                    except (OSError, http.client.HTTPException, SegmentError) as e:
+                        conn.close()
+                        if attempt + 1 >= self.max_retries:
+                            errors.append(f"Falha na faixa {start}-{end}: {e}")
+                            return
+                        time.sleep(min(2 ** attempt * 0.5, 10))
+                        pending.put((index, attempt + 1))
+                        continue
+                    with self._lock:
+                        done.add(index)
+                        self._save_map(map_filename, total, done)
+        except Exception as e:
+            # Erro inesperado (ex.: disco, hook): interrompe as demais conexões
+            errors.append(str(e))
+        finally:
+            conn.close()
+
+    def _fetch_segment(self, conn, url, headers, f, start, end, tmp_filename, total):
+        _, response = conn.request(url, dict(headers, Range=f'bytes={start}-{end}'))
+        if response.status != 206:
+            response.read()
+            raise SegmentError(f"HTTP {response.status} para a faixa {start}-{end}")
+        position = start
+        received = 0
+        try:
+            while True:
+                chunk = response.read(64 * 1024)
+                if not chunk:
+                    break
+                f.seek(position)
+                f.write(chunk)
+                position += len(chunk)
+                received += len(chunk)
+                self._add_progress(len(chunk), tmp_filename, total)
+        except BaseException:
+            # Faixa incompleta será baixada de novo: desfazer a contagem
+            self._add_progress(-received, tmp_filename, total, report=False)
+            raise
+        if position != end + 1:
+            self._add_progress(-received, tmp_filename, total, report=False)
+            raise SegmentError(f"Faixa {start}-{end} incompleta")
+        f.flush()
+
+    def _download_single(self, url, filename, headers, total):
+        """Fallback para servidores sem suporte a Range"""
+        tmp_filename = filename + TMP_SUFFIX
+        os.makedirs(os.path.dirname(os.path.abspath(filename)), exist_ok=True)
+        self._downloaded = 0
+        conn = _Connection(self.timeout)
+        try:
+            _, response = conn.request(url, headers)
+            if response.status != 200:
+                raise SegmentError(f"HTTP {response.status}")
+            with open(tmp_filename, 'wb') as f:
+                while True:
+                    chunk = response.read(64 * 1024)
+                    if not chunk:
+                        break
+                    f.write(chunk)
+                    self._add_progress(len(chunk), tmp_filename, total)
+        finally:
+            conn.close()
+        os.replace(tmp_filename, filename)
+        self._report('finished', filename, tmp_filename, self._downloaded)
+        return {'filename': filename, 'total_bytes': self._downloaded, 'segments': 1,
+                'resumed_segments': 0, 'elapsed': time.monotonic() - self._started}
+
+    def _add_progress(self, nbytes, tmp_filename, total, report=True):
+        with self._lock:
+            self._downloaded += nbytes
+            d = self._progress('downloading', None, tmp_filename, total) if report else None
+        # Hooks fora do lock: um hook que espera (limite de banda) não trava as outras conexões
+        if d is not None:
+            self._call_hooks(d)
+
+    def _report(self, status, filename, tmp_filename, total):
+        with self._lock:
+            d = self._progress(status, filename, tmp_filename, total)
+        self._call_hooks(d)
+
+    def _call_hooks(self, d: Dict[str, Any]) -> None:
+        for hook in self.progress_hooks:
+            hook(d)
+
+    def _progress(self, status, filename, tmp_filename, total) -> Dict[str, Any]:
+        """Dict de progresso no formato dos progress_hooks do yt-dlp (com o lock adquirido)"""
+        elapsed = time.monotonic() - self._started
+        speed = self._downloaded / elapsed if elapsed > 0 else None
+        return {
+            'status': status,
+            'downloaded_bytes': self._downloaded,
+            'total_bytes': total,
+            'filename': filename or tmp_filename[:-len(TMP_SUFFIX)],
+            'tmpfilename': tmp_filename,
+            'elapsed': elapsed,
+            'speed': speed,
+            'eta': int((total - self._downloaded) / speed) if speed and total else None,
+        }
+
+    def _load_map(self, map_filename: str, total: int) -> set:
+        try:
+            with open(map_filename, encoding='utf-8') as f:
+                data = json.load(f)
+        except (OSError, ValueError):
+            return set()
+        if data.get('total') != total or data.get('segment_size') != self.segment_size:
+            return set()
+        return set(data.get('done', []))
+
+    def _save_map(self, map_filename: str, total: int, done: set) -> None:
+        tmp = f"{map_filename}.tmp"
+        with open(tmp, 'w', encoding='utf-8') as f:
+            json.dump({'total': total, 'segment_size': self.segment_size, 'done': sorted(done)}, f)
+        os.replace(tmp, map_filename)
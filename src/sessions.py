@@ -0,0 +1,84 @@
+# ytdowloader\src\sessions.py
+
+import contextlib
+import threading
+import time
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+from . import config
+
+
+class SessionPool:
+    """Instâncias de YoutubeDL reaproveitadas entre chamadas com as mesmas opções.
+
+    Criar um YoutubeDL, inicializar o extrator e abrir conexões custa caro
+    a cada chamada; aqui as instâncias ociosas ficam guardadas (no máximo
+    `max_idle`) e são reutilizadas, mantendo extratores inicializados e
+    conexões HTTP abertas. Cada instância é usada por uma thread por vez.
+    Instâncias mais velhas que `max_age` são descartadas, para renovar
+    cookies e o player do YouTube.
+    """
+
+    def __init__(self, params: Dict[str, Any], max_idle: int = config.SESSION_POOL_SIZE,
+                 max_age: float = config.SESSION_MAX_AGE):
+        self.params = params
+        self.max_idle = max_idle
+        self.max_age = max_age
+        self.created = 0
+        self.reused = 0
+        self._lock = threading.Lock()
+        self._idle: List[Tuple[float, Any]] = []
+
+    @contextlib.contextmanager
+    def session(self) -> Iterator[Any]:
+        """Empresta um YoutubeDL (devolvido ao pool ao sair do bloco)"""
+        created_at, ydl = self._acquire()
+        try:
+            yield ydl
+        finally:
+            self._release(created_at, ydl)
+
+    def prewarm(self, ie_key: Optional[str] = 'Youtube') -> None:
+        """Cria uma instância e inicializa o extrator antes do primeiro uso"""
+        with self.session() as ydl:
+            if ie_key:
+                ydl.get_info_extractor(ie_key)
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            return {'created': self.created, 'reused': self.reused, 'idle': len(self._idle)}
+
+    def close(self) -> None:
+        with self._lock:
+            idle, self._idle = self._idle, []
+        for _, ydl in idle:
+            ydl.close()
+
+    def _acquire(self) -> Tuple[float, Any]:
+        now = time.monotonic()
+        expired = []
+        with self._lock:
+            while self._idle:
+                created_at, ydl = self._idle.pop()
+                if now - created_at < self.max_age:
+                    self.reused += 1
+                    break
+                expired.append(ydl)
+            else:
+                created_at, ydl = None, None
+        for old in expired:
+            old.close()
+        if ydl is None:
+            from .downloader import load_yt_dlp
+            ydl = load_yt_dlp().YoutubeDL(dict(self.params))
+            created_at = now
+            with self._lock:
+                self.created += 1
+        return created_at, ydl
+
+    def _release(self, created_at: float, ydl: Any) -> None:
+        with self._lock:
+            if len(self._idle) < self.max_idle:
+                self._idle.append((created_at, ydl))
+                return
+        ydl.close()
@@ -0,0 +1,49 @@
+# ytdowloader\src\singleflight.py
+
+import threading
+from concurrent.futures import Future
+from typing import Any, Callable, Dict, Hashable
+
+
+class SingleFlight:
+    """Junta chamadas simultâneas com a mesma chave numa única execução.
+
+    A primeira thread a pedir uma chave executa a função; as que chegam
+    enquanto ela está em andamento esperam e recebem o mesmo resultado (ou
+    a mesma exceção). Nada fica guardado depois que a chamada termina:
+    o cache de resultados é responsabilidade de quem chama.
+    """
+
+    def __init__(self):
+        self.calls = 0
+        self.shared = 0
+        self._lock = threading.Lock()
+        self._inflight: Dict[Hashable, Future] = {}
+
+    def do(self, key: Hashable, function: Callable[..., Any], *args, **kwargs) -> Any:
+        with self._lock:
+            future = self._inflight.get(key)
+            leader = future is None
+            if leader:
+                future = self._inflight[key] = Future()
+                self.calls += 1
+            else:
+                self.shared += 1
+        if not leader:
+            return future.result()
+
+        try:
+            result = function(*args, **kwargs)
+        except BaseException as e:
+            future.set_exception(e)
+            raise
+        else:
+            future.set_result(result)
+            return result
+        finally:
+            with self._lock:
+                del self._inflight[key]
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            return {'calls': self.calls, 'shared': self.shared, 'inflight': len(self._inflight)}
@@ -0,0 +1,115 @@
+# ytdowloader\src\thumbnails.py
+
+import hashlib
+import os
+import threading
+from collections import OrderedDict
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Callable, Tuple
+
+from . import config
+
+
+class ThumbnailLoader:
+    """Baixa, decodifica e redimensiona thumbnails fora da thread da interface.
+
+    Usa uma única `requests.Session` (keep-alive) para todos os downloads e
+    guarda as imagens já redimensionadas em um LRU em memória e em PNGs no
+    disco. O callback recebe `(url, imagem PIL, erro)` na thread do worker;
+    a criação do `PhotoImage` fica a cargo da GUI, na thread do Tk.
+    """
+
+    def __init__(self, cache_dir: str = config.THUMBNAIL_CACHE_DIR,
+                 size: Tuple[int, int] = config.THUMBNAIL_SIZE,
+                 memory_entries: int = config.THUMBNAIL_MEMORY_ENTRIES, max_workers: int = 2):
+        self.cache_dir = cache_dir
+        self.size = size
+        self.memory_entries = memory_entries
+        self.max_workers = max_workers
+
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix='thumbnail')
+        self._lock = threading.Lock()
+        self._memory: "OrderedDict[str, object]" = OrderedDict()
+        self._session = None
+
+    def load(self, url: str, callback: Callable) -> Future:
+        """Agenda o carregamento de `url` e chama `callback(url, image, error)` ao terminar"""
+        def task():
+            try:
+                image = self.get(url)
+            except Exception as e:
+                callback(url, None, e)
+            else:
+                callback(url, image, None)
+        return self._executor.submit(task)
+
+    def get(self, url: str):
+        """Retorna a thumbnail redimensionada (bloqueante)"""
+        with self._lock:
+            image = self._memory.get(url)
+            if image is not None:
+                self._memory.move_to_end(url)
+                return image
+
+        from PIL import Image
+
+        path = self._disk_path(url)
+        if os.path.exists(path):
+            image = Image.open(path)
+            image.load()
+        else:
+            image = self._download(url)
+            self._save(image, path)
+
+        self._remember(url, image)
+        return image
+
+    def shutdown(self) -> None:
+        self._executor.shutdown(wait=False, cancel_futures=True)
+        if self._session is not None:
+            self._session.close()
+
+    def _download(self, url: str):
+        from io import BytesIO
+        from PIL import Image
+
+        response = self._get_session().get(url, timeout=10)
+        response.raise_for_status()
+        image = Image.open(BytesIO(response.content))
+        image.thumbnail(self.size, Image.Resampling.LANCZOS)
+        return image
+
+    def _get_session(self):
+        """Sessão HTTP compartilhada, criada no primeiro uso"""
+        with self._lock:
+            if self._session is None:
+                import requests
+                from requests.adapters import HTTPAdapter
+
+                session = requests.Session()
+                adapter = HTTPAdapter(pool_connections=4, pool_maxsize=self.max_workers)
+                session.mount('https://', adapter)
+                session.mount('http://', adapter)
+                self._session = session
+            return self._session
+
+    def _disk_path(self, url: str) -> str:
+        digest = hashlib.sha1(url.encode('utf-8')).hexdigest()
+        return os.path.join(self.cache_dir, f"{digest}_{self.size[0]}x{self.size[1]}.png")
+
+    def _save(self, image, path: str) -> None:
+        # Falhas de disco não impedem a exibição
+        try:
+            os.makedirs(self.cache_dir, exist_ok=True)
+            tmp_path = f"{path}.{threading.get_ident()}.tmp"
+            image.save(tmp_path, format='PNG')
+            os.replace(tmp_path, path)
+        except OSError:
+            pass
+
+    def _remember(self, url: str, image) -> None:
+        with self._lock:
+            self._memory[url] = image
+            self._memory.move_to_end(url)
+            while len(self._memory) > self.memory_entries:
+                self._memory.popitem(last=False)
@@ -0,0 +1,66 @@
+# ytdowloader\src\urls.py
+
+import re
+from typing import Optional
+from urllib.parse import parse_qsl, urlencode, urlsplit, urlunsplit
+
+YOUTUBE_HOSTS = {'youtube.com', 'www.youtube.com', 'm.youtube.com', 'music.youtube.com',
+                 'youtube-nocookie.com', 'www.youtube-nocookie.com'}
+VIDEO_ID_RE = re.compile(r'^[0-9A-Za-z_-]{11}$')
+# Caminhos com o id do vídeo no segmento seguinte (/shorts/<id>, /embed/<id>, ...)
+ID_PATH_PREFIXES = ('shorts', 'embed', 'live', 'v', 'e')
+
+# Parâmetros que não mudam o conteúdo (rastreamento, origem do compartilhamento)
+TRACKING_PARAMS = {'si', 'feature', 'pp', 'fbclid', 'gclid', 'igshid', 'ab_channel', 'app', 'ref', 'source'}
+
+
+def youtube_id(url: str) -> Optional[str]:
+    """Id do vídeo do YouTube em qualquer forma de URL (watch, youtu.be, shorts, embed, live)"""
+    try:
+        parts = urlsplit(url.strip())
+    except ValueError:
+        return None
+    host = (parts.hostname or '').lower()
+    segments = [s for s in parts.path.split('/') if s]
+    candidate = None
+    if host == 'youtu.be':
+        candidate = segments[0] if segments else None
+    elif host in YOUTUBE_HOSTS:
+        if segments[:1] == ['watch']:
+            candidate = dict(parse_qsl(parts.query)).get('v')
+        elif len(segments) >= 2 and segments[0] in ID_PATH_PREFIXES:
+            candidate = segments[1]
+    return candidate if candidate and VIDEO_ID_RE.match(candidate) else None
+
+
+def canonical_url(url: str) -> str:
+    """Forma canônica da URL, para que variações do mesmo conteúdo sejam reconhecidas.
+
+    Vídeos do YouTube viram `https://www.youtube.com/watch?v=<id>`; nas demais
+    URLs o host é normalizado, o fragmento removido e os parâmetros de
+    rastreamento (utm_*, si, feature, ...) descartados.
+    """
+    url = url.strip()
+    video_id = youtube_id(url)
+    if video_id:
+        return f"https://www.youtube.com/watch?v={video_id}"
+    try:
+        parts = urlsplit(url)
+        port = parts.port
+    except ValueError:
+        return url
+    if not parts.netloc:
+        return url
+    host = (parts.hostname or '').lower()
+    if host in YOUTUBE_HOSTS:
+        host = 'www.youtube.com'
+    netloc = host if port is None else f"{host}:{port}"
+    query = urlencode(sorted((k, v) for k, v in parse_qsl(parts.query, keep_blank_values=True)
+                             if k not in TRACKING_PARAMS and not k.startswith('utm_')))
+    return urlunsplit(((parts.scheme or 'https').lower(), netloc, parts.path or '/', query, ''))
+
+
+def url_key(url: str) -> str:
+    """Chave de deduplicação sem acesso à rede: "Youtube:<id>" ou a URL canônica"""
+    video_id = youtube_id(url)
+    return f"Youtube:{video_id}" if video_id else canonical_url(url)